@@ -9,6 +9,10 @@ import openpyxl
 import pandas as pd
 from datetime import datetime
 import os
+import sqlite3
+
+# Banco de cenários gravado por scripts/run_update.py (em base_dir/cache)
+SCENARIO_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "scenarios.db")
 
 # Configuração da página
 st.set_page_config(
@@ -93,6 +97,15 @@ def read_dre_data(wb):
         val = ws.cell(7, col).value
         faturamento.append(float(val) if val and isinstance(val, (int, float)) else 0)
     
+    # Ler CSV (linhas 12 a 14) e Custos Fixos (linha 18)
+    csv = []
+    custos_fixos = []
+    for col in range(3, 15):
+        vals = [ws.cell(row, col).value for row in range(12, 15)]
+        csv.append(sum(float(v) for v in vals if isinstance(v, (int, float))))
+        val = ws.cell(18, col).value
+        custos_fixos.append(float(val) if val and isinstance(val, (int, float)) else 0)
+    
     # Ler LAIR (linha 48)
     lair = []
     for col in range(3, 15):
@@ -108,6 +121,8 @@ def read_dre_data(wb):
     return {
         'months': months,
         'faturamento': faturamento,
+        'csv': csv,
+        'custos_fixos': custos_fixos,
         'lair': lair,
         'lucro_liquido': lucro_liquido
     }
@@ -139,9 +154,38 @@ def read_cashflow_data(wb):
     }
 
 
-@st.cache_data
 def read_scenarios(wb):
-    """Lê cenários."""
+    """Lê cenários do banco de cenários ou, se não existir, da planilha."""
+    if os.path.exists(SCENARIO_DB):
+        try:
+            # The modification time refreshes the cache after each update
+            return read_scenario_store(SCENARIO_DB, os.path.getmtime(SCENARIO_DB))
+        except sqlite3.Error as e:
+            st.warning(f"⚠️ Banco de cenários ilegível ({e}); usando a planilha Scenarios")
+    return read_scenarios_sheet(wb)
+
+
+@st.cache_data
+def read_scenario_store(db_path, modified_at):
+    """Lê definições e último resultado de cada cenário do banco SQLite."""
+    from src.scenario_store import ScenarioStore
+    
+    with ScenarioStore(db_path) as store:
+        runs = store.latest_runs()
+        return [
+            {
+                'name': name,
+                'description': scenario['description'],
+                'deltas': scenario['deltas'],
+                'metrics': runs[name]['metrics'] if name in runs else {},
+            }
+            for name, scenario in store.load_scenarios().items()
+        ]
+
+
+@st.cache_data
+def read_scenarios_sheet(wb):
+    """Lê cenários da planilha Scenarios."""
     try:
         ws = wb['Scenarios']
         scenarios = []
@@ -169,6 +213,48 @@ def read_scenarios(wb):
         ]
 
 
+@st.cache_data
+def read_product_store(file_path, modified_at):
+    """Lê a DRE por Produto para o armazenamento colunar de produtos (uma cópia por sessão)."""
+    from src.assumptions import AssumptionsManager
+    from src.products import ProductDREAnalyzer
+    
+    wb = openpyxl.load_workbook(file_path, data_only=True)
+    if "DRE por Produto" not in wb.sheetnames:
+        return None
+    analyzer = ProductDREAnalyzer(AssumptionsManager())
+    analyzer.read_product_dre(wb["DRE por Produto"])
+    return analyzer.store
+
+
+@st.cache_resource
+def get_scenario_cache():
+    """Cache de resultados de cenários compartilhado entre execuções e sessões."""
+    from src.scenario_cache import ScenarioCache
+    
+    return ScenarioCache(max_entries=512)
+
+
+def compare_scenarios(scenarios, dre_data):
+    """Estima cada cenário sobre os totais da DRE, reaproveitando resultados em cache."""
+    from src.assumptions import AssumptionsManager
+    from src.scenarios import ScenarioManager
+    
+    manager = ScenarioManager(AssumptionsManager(), cache=get_scenario_cache())
+    for scenario in scenarios:
+        if scenario.get('deltas') is not None:
+            manager.scenarios[scenario['name']] = {
+                'description': scenario['description'],
+                'deltas': scenario['deltas'],
+            }
+    
+    return manager.get_scenario_comparison({
+        'revenue': sum(dre_data['faturamento']),
+        'csv': sum(dre_data['csv']),
+        'fixed_costs': sum(dre_data['custos_fixos']),
+    })
+
+
 def format_currency(value):
     """Formata valor como moeda brasileira."""
     if value is None or value == 0:
@@ -206,12 +292,13 @@ def main():
         dre_data = read_dre_data(wb)
         cashflow_data = read_cashflow_data(wb)
         scenarios = read_scenarios(wb)
+        product_store = read_product_store(file_path, os.path.getmtime(file_path))
     
     # Sidebar
     st.sidebar.title("🎯 Navegação")
     page = st.sidebar.radio(
         "Selecione a página:",
-        ["📈 Visão Geral", "💰 Análise Financeira", "📊 Cenários", "⚙️ Premissas"]
+        ["📈 Visão Geral", "💰 Análise Financeira", "🏷️ Produtos", "📊 Cenários", "⚙️ Premissas"]
     )
     
     st.sidebar.markdown("---")
@@ -228,8 +315,10 @@ def main():
         show_overview(dre_data, cashflow_data, assumptions)
     elif page == "💰 Análise Financeira":
         show_financial_analysis(dre_data, cashflow_data)
+    elif page == "🏷️ Produtos":
+        show_products(product_store)
     elif page == "📊 Cenários":
-        show_scenarios(scenarios, assumptions)
+        show_scenarios(scenarios, assumptions, dre_data)
     elif page == "⚙️ Premissas":
         show_assumptions(assumptions)
 
@@ -395,7 +484,50 @@ def show_financial_analysis(dre_data, cashflow_data):
         st.line_chart(df_margens.set_index('Mês'))
 
 
-def show_scenarios(scenarios, assumptions):
+def show_products(product_store):
+    """Mostra o ranking de produtos."""
+    st.header("🏷️ Ranking de Produtos")
+    
+    if not product_store or len(product_store) == 0:
+        st.warning("Dados de produtos não disponíveis")
+        return
+    
+    metrics = {
+        "Receita Líquida": 'receita_liquida',
+        "Margem Bruta": 'margem_bruta',
+        "MB%": 'margem_bruta_pct',
+    }
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        metric = st.selectbox("Ordenar por:", list(metrics))
+    with col2:
+        if len(product_store) > 1:
+            n = st.slider("Quantidade de produtos:", 1, min(50, len(product_store)), min(10, len(product_store)))
+        else:
+            n = 1
+    
+    # Seleção parcial: apenas os N melhores são ordenados
+    ranking = product_store.ranking
+    rows = ranking.top_rows(n, metrics[metric])
+    values = {label: ranking.scores(key)[rows] for label, key in metrics.items()}
+    names = product_store.names
+    
+    df_produtos = pd.DataFrame({
+        'Produto': [names[row] for row in rows],
+        'Receita Líquida': [format_currency(v) for v in values["Receita Líquida"]],
+        'Margem Bruta': [format_currency(v) for v in values["Margem Bruta"]],
+        'MB%': [f"{v:.1f}%" for v in values["MB%"]],
+    })
+    st.dataframe(df_produtos, use_container_width=True)
+    
+    st.bar_chart(pd.DataFrame({
+        'Produto': df_produtos['Produto'],
+        metric: values[metric],
+    }).set_index('Produto'))
+
+
+def show_scenarios(scenarios, assumptions, dre_data):
     """Mostra cenários de análise."""
     st.header("📊 Cenários de Análise")
     
@@ -428,25 +560,56 @@ def show_scenarios(scenarios, assumptions):
     # Mostrar detalhes (simplificado)
     st.subheader(f"Detalhes: {selected_scenario}")
     
-    growth_rates = {
-        'Base': 15,
-        'Otimista': 20,
-        'Pessimista': 5,
-        'Conservador': 10
-    }
-    
-    growth = growth_rates.get(selected_scenario, 15)
+    scenario = next(s for s in scenarios if s['name'] == selected_scenario)
+    deltas = scenario.get('deltas')
+    
+    if deltas is not None:
+        growth = deltas.get('growth_rate_2025', assumptions.get('growth_rate', 15) / 100) * 100
+        price_adj = f"{(deltas.get('price_adjustment', 1.0) - 1) * 100:+.0f}%"
+        commission = f"{deltas.get('commission_pct', 0.10) * 100:.0f}%"
+    else:
+        growth_rates = {
+            'Base': 15,
+            'Otimista': 20,
+            'Pessimista': 5,
+            'Conservador': 10
+        }
+        growth = growth_rates.get(selected_scenario, 15)
+        price_adj = {'Otimista': '+10%', 'Pessimista': '-5%'}.get(selected_scenario, '0%')
+        commission = {'Otimista': '12%', 'Pessimista': '8%'}.get(selected_scenario, '10%')
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Taxa de Crescimento", f"{growth}%")
+        st.metric("Taxa de Crescimento", f"{growth:.0f}%")
     with col2:
-        price_adj = {'Otimista': '+10%', 'Pessimista': '-5%'}.get(selected_scenario, '0%')
         st.metric("Ajuste de Preços", price_adj)
     with col3:
-        commission = {'Otimista': '12%', 'Pessimista': '8%'}.get(selected_scenario, '10%')
         st.metric("Comissões", commission)
+    
+    # Resultados do modelo completo gravados no banco de cenários
+    metrics = scenario.get('metrics')
+    if metrics:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("LAIR", format_currency(metrics.get('lair', 0)))
+        with col2:
+            st.metric("Margem LAIR", f"{metrics.get('margem_lair_pct', 0):.1f}%")
+        with col3:
+            st.metric("Saldo Mínimo", format_currency(metrics.get('min_balance', 0)))
+    
+    # Estimativa rápida sobre os totais da DRE (em cache entre recarregamentos)
+    if dre_data:
+        estimate = compare_scenarios(scenarios, dre_data).get(selected_scenario)
+        if estimate:
+            st.caption("Estimativa sobre os totais da DRE")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Receita", format_currency(estimate['revenue']))
+            with col2:
+                st.metric("Lucro Bruto", format_currency(estimate['lucro_bruto']))
+            with col3:
+                st.metric("LAIR estimado", format_currency(estimate['lair']))
 
 
 def show_assumptions(assumptions):
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmarks
+
+Times the array-based engines on large synthetic inputs. Kept out of the
+unit tests so a loaded machine cannot fail them; run it by hand or in a
+dedicated job. Exits with status 1 when a benchmark exceeds its budget.
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.payroll_table import PayrollTable
+from src.payroll_projection import PayrollProjection
+from src.product_store import ProductStore
+
+
+def bench_payroll_table():
+    """Load 20,000 employees and compute the grouped and monthly roll-ups."""
+    rng = np.random.default_rng(7)
+    n = 20000
+    departments = rng.choice(['Clínica', 'Comercial', 'Administrativo'], n).tolist()
+    salary = rng.uniform(1000, 9000, n)
+
+    table = PayrollTable()
+    table.extend([f'E{i:05d}' for i in range(n)], salary, salary * 0.3, 500.0,
+                 department=departments,
+                 branch=rng.choice(['Lisboa', 'Porto', 'Braga', 'Faro'], n).tolist(),
+                 variable=[d == 'Comercial' for d in departments],
+                 start_month=rng.integers(1, 13, n),
+                 end_month=np.where(rng.random(n) < 0.2, rng.integers(1, 13, n), PayrollTable.OPEN_END))
+    table.group_totals('branch')
+    table.monthly_cost(12, by='department')
+    table.summary()
+
+
+def bench_payroll_projection():
+    """Project 12,000 employees over 36 months with raises, on both bases."""
+    rng = np.random.default_rng(3)
+    n = 12000
+    table = PayrollTable()
+    table.extend([f'E{i}' for i in range(n)], rng.uniform(1500, 9000, n), 0, 400,
+                 department=rng.choice(['Clínica', 'Comercial', 'Apoio'], n).tolist(),
+                 branch=rng.choice(['Lisboa', 'Porto', 'Faro'], n).tolist(),
+                 start_month=rng.integers(1, 37, n),
+                 end_month=np.where(rng.random(n) < 0.1, rng.integers(1, 37, n), PayrollTable.OPEN_END))
+
+    projection = PayrollProjection(table, months=36, charges_rates=np.full(36, 0.358))
+    projection.add_raise(1, 0.06, every_year=True)
+    projection.add_raise(13, 0.02, branch='Porto')
+    projection.monthly('cash')
+    projection.monthly('accrual', by='branch')
+
+
+def bench_product_store():
+    """Load 5,000 procedure codes and compute the category roll-ups and metrics."""
+    rng = np.random.default_rng(11)
+    n = 5000
+    store = ProductStore()
+    store.set_products([f'P{i:05d}' for i in range(n)], ProductStore.LINES,
+                       rng.uniform(0, 1000, (n, len(ProductStore.LINES))),
+                       rng.choice(['Odonto e Estética', 'Cursos', 'Implante Capilar'], n).tolist())
+    store.aggregate()
+    store.metrics()
+
+
+def bench_product_ranking():
+    """Keep the top 10 of 200,000 products through 200 single-product updates."""
+    rng = np.random.default_rng(8)
+    n = 200000
+    store = ProductStore()
+    names = [f'P{i:06d}' for i in range(n)]
+    store.set_products(names, ['receita_liquida', 'csv'], rng.uniform(0, 1e6, (n, 2)))
+    ranking = store.ranking
+    ranking.top(10)
+    for _ in range(200):
+        store.set_products([names[rng.integers(n)]], ['receita_liquida'], [[rng.uniform(0, 2e6)]])
+        ranking.top(10)
+
+
+# (name, function, budget in seconds)
+BENCHMARKS = [
+    ("Payroll table, 20k employees", bench_payroll_table, 1.0),
+    ("Payroll projection, 12k employees x 36 months", bench_payroll_projection, 1.0),
+    ("Product store, 5k products", bench_product_store, 0.5),
+    ("Product ranking, 200k products x 200 updates", bench_product_ranking, 2.0),
+]
+
+
+def main():
+    """Run every benchmark and report it against its budget."""
+    slow = 0
+    for name, bench, budget in BENCHMARKS:
+        t0 = time.perf_counter()
+        bench()
+        elapsed = time.perf_counter() - t0
+        status = "✓" if elapsed <= budget else "⚠"
+        slow += elapsed > budget
+        print(f"{status} {name}: {elapsed:.3f}s (budget {budget:.1f}s)")
+
+    sys.exit(1 if slow else 0)
+
+
+if __name__ == "__main__":
+    main()
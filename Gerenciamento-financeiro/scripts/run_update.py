@@ -16,13 +16,22 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.io import ExcelWorkbookManager
 from src.assumptions import AssumptionsManager
-from src.labeling import LabelDetector
+from src.labeling import LabelDetector, get_month_number
 from src.dre import DREManager
 from src.products import ProductDREAnalyzer
 from src.payroll import PayrollManager
 from src.cashflow import CashFlowManager
+from src.daily_cashflow import DailyCashFlowEngine
+from src.financing import FinancingSolver
 from src.scenarios import ScenarioManager
+from src.pipeline import ScenarioPipeline
+from src.scenario_store import ScenarioStore
+from src.scenario_cache import canonical_key
 from src.dashboard import DashboardManager
+from src.layout_cache import LayoutCache
+
+# Monthly rent, the only fixed cost assumed until the DRE values are read
+MONTHLY_RENT = 3000
 
 
 def main():
@@ -38,6 +47,8 @@ def main():
     output_file = os.path.join(base_dir, "Orçamento Empresarial - Instituto Areluna - modelo-v1.xlsx")
     log_dir = os.path.join(base_dir, "logs")
     log_file = os.path.join(log_dir, f"budget_update_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    layout_cache_file = os.path.join(base_dir, "cache", "layout_cache.json")
+    scenario_db_file = os.path.join(base_dir, "cache", "scenarios.db")
     
     print(f"Input file: {input_file}")
     print(f"Output file: {output_file}")
@@ -66,13 +77,17 @@ def main():
     
     # Step 3: Analyze DRE structure
     print("Step 3: Analyzing DRE structure...")
-    try:
-        dre_ws = wbm.get_sheet("DRE Grencial Instituto ")
-    except ValueError:
-        dre_ws = wbm.get_sheet("DRE Grencial Instituto")
+    # The sheet is misspelled "DRE Grencial" in the workbook
+    dre_ws = wbm.get_sheet("DRE Gerencial Instituto", fuzzy=True)
+    
+    # Snapshot the sheet once; every reader below queries the grid
+    dre_grid = wbm.get_grid(dre_ws)
     
-    dre_manager = DREManager(assumptions)
-    dre_structure = dre_manager.analyze_dre_structure(dre_ws)
+    # Sheet structure detected on a previous run is reused while the layout is unchanged
+    layout_cache = LayoutCache(layout_cache_file)
+    
+    dre_manager = DREManager(assumptions, layout_cache)
+    dre_structure = dre_manager.analyze_dre_structure(dre_grid)
     print(f"✓ Found {len(dre_structure)} key DRE elements")
     print()
     
@@ -81,7 +96,7 @@ def main():
     try:
         product_ws = wbm.get_sheet("DRE por Produto")
         product_analyzer = ProductDREAnalyzer(assumptions)
-        product_data = product_analyzer.read_product_dre(product_ws)
+        product_data = product_analyzer.read_product_dre(wbm.get_grid(product_ws))
         
         if product_data:
             print(f"✓ Analyzed {len(product_data)} products")
@@ -91,6 +106,14 @@ def main():
             print(f"✓ Aggregated into {len(category_summary)} categories:")
             for category, data in category_summary.items():
                 print(f"  - {category}: Receita Líquida = R$ {data['receita_liquida']:,.2f}")
+            
+            # Distribute category totals over the DRE months
+            if dre_manager.month_cols:
+                written = product_analyzer.write_aggregated_to_dre(
+                    wbm, dre_ws, dre_manager.month_row, dre_manager.month_cols)
+                if written:
+                    dre_grid = wbm.get_grid(dre_ws)
+                    print(f"✓ Wrote product values to {len(written)} DRE rows")
         else:
             print("⚠ No product data found")
             product_data = None
@@ -104,39 +127,65 @@ def main():
     try:
         payroll_ws = wbm.get_sheet("Cargos e Salários ")
         payroll_manager = PayrollManager()
-        payroll_manager.read_payroll_data(payroll_ws)
+        payroll_roles = payroll_manager.read_payroll_data(wbm.get_grid(payroll_ws))
         
         fixed, variable = payroll_manager.classify_fixed_variable()
         print(f"✓ Total payroll: R$ {payroll_manager.total_payroll:,.2f}")
         print(f"  - Fixed: R$ {fixed:,.2f}")
         print(f"  - Variable: R$ {variable:,.2f}")
         
+        # Monthly projection with 13th salary, vacation bonus and encargos
+        payroll_projection = payroll_manager.project(months=12)
+        print(f"  - Projected with 13th and vacation bonus: R$ {payroll_projection.monthly().sum():,.2f}/year")
+        
+        # The DRE carries the projected month instead of the flat payroll total.
+        # These are values: the template's ='Cargos e Salários '!$H$17 link is
+        # replaced, so later edits to the payroll sheet reach the DRE only when
+        # this script runs again. An empty payroll sheet keeps the link.
+        payroll_row = dre_manager.label_detector.find_labels(
+            dre_grid, ['folha_pagamento'],
+            search_area=(dre_manager.month_row, dre_manager.month_row + 100, 1, 3)
+        ).get('folha_pagamento') if dre_manager.month_cols else None
+        if payroll_row and payroll_manager.total_payroll > 0:
+            sorted_month_cols = dict(sorted(dre_manager.month_cols.items(),
+                                            key=lambda x: get_month_number(x[0])))
+            payroll_manager.link_monthly_to_dre(wbm, dre_ws, payroll_row[0], sorted_month_cols,
+                                                payroll_projection.monthly())
+            dre_grid = wbm.get_grid(dre_ws)
+        
         # Update payroll sheet with formulas
         payroll_manager.update_payroll_sheet(wbm, payroll_ws)
         print("✓ Payroll formulas updated")
     except Exception as e:
         print(f"⚠ Could not process payroll: {e}")
+        payroll_roles = None
+        payroll_projection = None
     print()
     
     # Step 6: Calculate cash flow
     print("Step 6: Calculating cash flow with AR/AP terms...")
-    cashflow_manager = CashFlowManager(assumptions)
+    cashflow_manager = CashFlowManager(assumptions, layout_cache)
     
     try:
-        cf_start_row = cashflow_manager.find_cashflow_section(dre_ws)
+        cf_start_row = cashflow_manager.find_cashflow_section(dre_grid)
         if cf_start_row:
-            cashflow_manager.analyze_cashflow_structure(dre_ws, cf_start_row)
+            cashflow_manager.analyze_cashflow_structure(dre_grid, cf_start_row)
             
             # Prepare DRE data for cash flow calculation
             # (In a full implementation, would read actual values from DRE)
             dre_monthly_data = {
                 'faturamento': [0] * 12,
                 'csv': [0] * 12,
-                'custos_fixos': [3000] * 12,  # At least rent
+                'custos_fixos': [MONTHLY_RENT] * 12,
                 'custos_variaveis': [0] * 12,
                 'impostos': [0] * 12,
             }
             
+            # Payroll leaves the bank when it is paid (13th in Nov/Dec, vacation bonus ahead)
+            if payroll_projection is not None:
+                payroll_cash = payroll_projection.dre_lines('cash')['custos_fixos']
+                dre_monthly_data['custos_fixos'] = (payroll_cash + MONTHLY_RENT).tolist()
+            
             cashflow_data = cashflow_manager.calculate_monthly_cashflow(dre_monthly_data)
             
             summary = cashflow_manager.get_cashflow_summary(cashflow_data)
@@ -144,26 +193,80 @@ def main():
             print(f"  - Net cash flow: R$ {summary['net_cashflow']:,.2f}")
             print(f"  - Ending balance: R$ {summary['ending_balance']:,.2f}")
             print(f"  - Minimum balance: R$ {summary['min_balance']:,.2f}")
+            print(f"  - Carried into next year: R$ {sum(cashflow_data['carryover_inflows']):,.2f} in, "
+                  f"R$ {sum(cashflow_data['carryover_outflows']):,.2f} out")
+            
+            # Day-level projection shows dips hidden inside the months
+            daily_engine = DailyCashFlowEngine(assumptions, initial_balance=cashflow_manager.initial_balance)
+            daily_data = daily_engine.calculate_daily_cashflow(dre_monthly_data)
+            print(f"  - Minimum daily balance: R$ {min(daily_data['min_daily_balance']):,.2f}")
             
             # Check liquidity risk
             risky_months = cashflow_manager.check_liquidity_risk(cashflow_data, minimum_balance=50000)
             if risky_months:
                 print(f"  ⚠ Liquidity risk in {len(risky_months)} months")
+                
+                # Financing that keeps the balance above the threshold
+                solver = FinancingSolver(floor=50000)
+                need = solver.minimum_initial_balance(cashflow_data)
+                credit = solver.solve_credit_line(cashflow_data)
+                print(f"  - Additional initial cash needed: R$ {need['additional_cash']:,.2f}")
+                print(f"  - Or credit line: peak R$ {credit['peak_debt']:,.2f}, "
+                      f"interest R$ {credit['total_interest']:,.2f}")
+            
+            # Same check over simulated revenue, collection and cost paths
+            risk = cashflow_manager.simulate_liquidity_risk(
+                dre_monthly_data, n_paths=10000, minimum_balance=50000, seed=2025
+            )
+            print(f"  - Probability of falling below R$ 50,000.00: {risk['any_breach_probability']:.1%}")
         else:
             print("⚠ Could not find cash flow section")
             cashflow_data = None
     except Exception as e:
         print(f"⚠ Could not calculate cash flow: {e}")
         cashflow_data = None
+    
+    layout_cache.save()
     print()
     
     # Step 7: Create Scenarios
     print("Step 7: Creating scenario analysis...")
     scenario_manager = ScenarioManager(assumptions)
+    
+    # Scenarios added to the store are run too; the defaults defined in code
+    # are only written to the store when missing there
+    scenario_store = ScenarioStore(scenario_db_file)
+    for scenario_name, scenario in scenario_store.load_scenarios().items():
+        scenario_manager.scenarios.setdefault(scenario_name, scenario)
+    scenario_store.seed_scenarios(scenario_manager)
+    
     scenario_manager.create_scenarios_sheet(wbm)
     print(f"✓ Created {len(scenario_manager.get_scenario_list())} scenarios:")
     for scenario_name in scenario_manager.get_scenario_list():
         print(f"  - {scenario_name}")
+    
+    # Full model per scenario, one process per core
+    try:
+        pipeline = ScenarioPipeline(scenario_manager, initial_balance=cashflow_manager.initial_balance)
+        # The payroll table carries the fixed/variable flags set in step 5; the
+        # sheet's DRE totals are formulas, so products and payroll are added to them
+        pipeline.load_inputs(dre_manager.load_matrix(dre_grid), product_data,
+                             payroll_manager.table if payroll_roles is not None else None,
+                             payroll_projection=payroll_projection, add_components=True)
+        scenario_results = pipeline.run()
+        print("✓ Full-model scenario results:")
+        for scenario_name, metrics in scenario_results.items():
+            print(f"  - {scenario_name}: LAIR = R$ {metrics['lair']:,.2f}, "
+                  f"minimum balance = R$ {metrics['min_balance']:,.2f}")
+        
+        # Record the definitions that ran; unchanged inputs add no new runs
+        data_version = canonical_key(pipeline.meta, pipeline.arrays)
+        recorded = scenario_store.record_runs(scenario_results, data_version,
+                                              scenarios=scenario_manager.scenarios, skip_recorded=True)
+        print(f"✓ Scenario results stored ({recorded} new, {scenario_store.count_runs()} runs)")
+    except Exception as e:
+        print(f"⚠ Could not run scenario pipeline: {e}")
+    scenario_store.close()
     print()
     
     # Step 8: Create Dashboard
@@ -174,8 +277,8 @@ def main():
     dashboard_dre_data = {
         'faturamento': [0] * 12,
         'lucro_bruto': [0] * 12,
-        'lair': [-3000] * 12,  # Negative due to fixed costs
-        'lucro_liquido': [-3000] * 12,
+        'lair': [-MONTHLY_RENT] * 12,  # Negative due to fixed costs
+        'lucro_liquido': [-MONTHLY_RENT] * 12,
     }
     
     dashboard_manager.create_dashboard_sheet(
@@ -4,8 +4,175 @@ Assumptions Module for Budget Model
 Creates and manages the Assumptions sheet with all key parameters.
 """
 
-from typing import Dict, List, Any
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple
 import json
+from .bktree import TypoMatcher
+from .labeling import compile_vocabulary, normalize_text
+
+
+def freeze(value: Any) -> Any:
+    """
+    Make a read-only copy of a JSON-like value.
+    
+    Dictionaries become single-layer LayeredAssumptions and lists are stored
+    as tuples (LayeredAssumptions reads them back as list copies). Values
+    that are already LayeredAssumptions are shared as they are, so freezing
+    a dictionary built from frozen parts only copies the top level.
+    
+    Args:
+        value: Value to freeze
+        
+    Returns:
+        Read-only value
+    """
+    if isinstance(value, LayeredAssumptions):
+        return value
+    if isinstance(value, Mapping):
+        return LayeredAssumptions._from_layers((_freeze_layer(value),))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def _freeze_layer(values: Mapping) -> MappingProxyType:
+    """Freeze the values of one layer into a read-only mapping."""
+    return MappingProxyType({key: freeze(item) for key, item in values.items()})
+
+
+def thaw(value: Any) -> Any:
+    """
+    Make a plain, mutable copy of a frozen value (e.g. for JSON).
+    
+    Args:
+        value: Value to thaw
+        
+    Returns:
+        Nested dictionaries and lists
+    """
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class LayeredAssumptions(Mapping):
+    """
+    Immutable assumptions resolved through a chain of layers.
+    
+    The first layer is the base; each overlay only stores the keys it
+    changes and shares everything else with the layers below. Nested
+    mappings (e.g. 'ar_terms') are merged key by key across layers, so an
+    overlay can change one entry of a nested mapping. Lists are read back
+    as fresh copies, so callers get lists as with plain dictionaries but
+    cannot change the shared values.
+    """
+    
+    __slots__ = ('_layers', '_views')
+    
+    def __init__(self, base: Mapping = MappingProxyType({}), *overlays: Mapping):
+        """
+        Initialize the layers.
+        
+        Args:
+            base: Base values (a LayeredAssumptions is shared, not copied)
+            *overlays: Overlays applied on top of the base, in order
+        """
+        if isinstance(base, LayeredAssumptions):
+            layers = base._layers
+        else:
+            layers = (_freeze_layer(base),)
+        self._layers: Tuple[Mapping, ...] = layers + tuple(_freeze_layer(overlay) for overlay in overlays)
+        self._views: Optional[Dict[str, "LayeredAssumptions"]] = None
+    
+    @classmethod
+    def _from_layers(cls, layers: Tuple[Mapping, ...]) -> "LayeredAssumptions":
+        layered = cls.__new__(cls)
+        layered._layers = layers
+        layered._views = None
+        return layered
+    
+    @property
+    def depth(self) -> int:
+        """Number of layers, base included."""
+        return len(self._layers)
+    
+    def __getitem__(self, key: str) -> Any:
+        found = [layer[key] for layer in reversed(self._layers) if key in layer]
+        if not found:
+            raise KeyError(key)
+        
+        # Nested mappings are merged down to the first plain value
+        chain = []
+        for value in found:
+            if not isinstance(value, LayeredAssumptions):
+                break
+            chain.append(value)
+        if len(chain) < 2:
+            value = found[0]
+            return thaw(value) if isinstance(value, tuple) else value
+        
+        if self._views is None:
+            self._views = {}
+        view = self._views.get(key)
+        if view is None:
+            view = LayeredAssumptions._from_layers(
+                tuple(layer for nested in reversed(chain) for layer in nested._layers))
+            self._views[key] = view
+        return view
+    
+    def __iter__(self):
+        seen = set()
+        for layer in self._layers:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+    
+    def __len__(self) -> int:
+        return len(set().union(*self._layers))
+    
+    def __repr__(self) -> str:
+        return f"LayeredAssumptions({self.to_dict()!r}, depth={self.depth})"
+    
+    def __reduce__(self):
+        # Read-only proxies cannot be pickled; rebuild from plain values
+        return (LayeredAssumptions, (self.to_dict(),))
+    
+    def with_overlay(self, overlay: Optional[Mapping] = None, **changes) -> "LayeredAssumptions":
+        """
+        Add a layer on top of this one.
+        
+        Args:
+            overlay: Values to override (nested mappings override key by key)
+            **changes: Further top-level values to override
+            
+        Returns:
+            New LayeredAssumptions sharing every existing layer
+        """
+        values = dict(overlay or {})
+        values.update(changes)
+        return LayeredAssumptions._from_layers(self._layers + (_freeze_layer(values),))
+    
+    def replace(self, **changes) -> "LayeredAssumptions":
+        """
+        Change top-level values of the top layer without adding a layer.
+        
+        Args:
+            **changes: Top-level values to set
+            
+        Returns:
+            New LayeredAssumptions (unchanged values are shared)
+        """
+        top = dict(self._layers[-1])
+        top.update({key: freeze(value) for key, value in changes.items()})
+        return LayeredAssumptions._from_layers(self._layers[:-1] + (MappingProxyType(top),))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Resolve every layer into plain nested dictionaries and lists."""
+        return thaw(self)
 
 
 class AssumptionsManager:
@@ -34,6 +201,7 @@ class AssumptionsManager:
         "Ortodontia": "Odonto e Estética",
         "Curso de Capacitação": "Cursos",
         "Implante Capilar": "Implante Capilar",
+        "Implanta Capilar": "Implante Capilar",  # Spelling used in DRE por Produto
     }
     
     def __init__(self):
@@ -60,12 +228,34 @@ class AssumptionsManager:
             "marketing_defaults": {
                 "marketing_pct_revenue": 0.05  # 5% of revenue
             },
-            "product_to_category_map": self.DEFAULT_PRODUCT_MAPPING.copy()
+            "product_to_category_map": self.DEFAULT_PRODUCT_MAPPING
         }
+        self._product_typos: Optional[TypoMatcher] = None
+        self._indexed_mapping: Optional[Dict[str, str]] = None
+    
+    @property
+    def assumptions(self) -> LayeredAssumptions:
+        """
+        Current assumptions (read-only).
+        
+        Change them through the set_* methods; scenario variants are built
+        with assumptions.with_overlay, which shares the base values.
+        """
+        return self._assumptions
+    
+    @assumptions.setter
+    def assumptions(self, values: Mapping):
+        if not isinstance(values, LayeredAssumptions):
+            values = LayeredAssumptions(values)
+        self._assumptions = values
+    
+    def _update(self, **changes):
+        """Replace top-level assumptions, sharing everything else."""
+        self._assumptions = self._assumptions.replace(**changes)
     
     def set_growth_rate(self, rate: float):
         """Set annual growth rate."""
-        self.assumptions["growth_rate_2025"] = rate
+        self._update(growth_rate_2025=rate)
     
     def set_seasonality(self, weights: List[float]):
         """
@@ -82,12 +272,12 @@ class AssumptionsManager:
             # Normalize if not summing to 1
             weights = [w / total for w in weights]
         
-        self.assumptions["monthly_seasonality"] = weights
+        self._update(monthly_seasonality=weights)
     
     def set_tax_rates(self, sales_tax: float, income_tax: float):
         """Set tax rates."""
-        self.assumptions["tax_rates"]["sales_tax"] = sales_tax
-        self.assumptions["tax_rates"]["income_tax"] = income_tax
+        self._update(tax_rates={**self.assumptions["tax_rates"],
+                                "sales_tax": sales_tax, "income_tax": income_tax})
     
     def set_ar_terms(self, days: List[int], weights: List[float]):
         """Set accounts receivable terms."""
@@ -98,8 +288,7 @@ class AssumptionsManager:
         if abs(total - 1.0) > 0.01:
             weights = [w / total for w in weights]
         
-        self.assumptions["ar_terms"]["days"] = days
-        self.assumptions["ar_terms"]["weights"] = weights
+        self._update(ar_terms={**self.assumptions["ar_terms"], "days": days, "weights": weights})
     
     def set_ap_terms(self, days: List[int], weights: List[float]):
         """Set accounts payable terms."""
@@ -110,16 +299,64 @@ class AssumptionsManager:
         if abs(total - 1.0) > 0.01:
             weights = [w / total for w in weights]
         
-        self.assumptions["ap_terms"]["days"] = days
-        self.assumptions["ap_terms"]["weights"] = weights
+        self._update(ap_terms={**self.assumptions["ap_terms"], "days": days, "weights": weights})
     
     def add_product_mapping(self, product: str, category: str):
         """Add or update product to category mapping."""
-        self.assumptions["product_to_category_map"][product] = category
+        self.add_product_mappings({product: category})
     
-    def get_category_for_product(self, product: str) -> str:
-        """Get category for a product."""
-        return self.assumptions["product_to_category_map"].get(product, "Odonto e Estética")
+    def add_product_mappings(self, mappings: Mapping[str, str]):
+        """
+        Add or update many product to category mappings at once.
+        
+        The mapping is copied once per call, so bulk loads should go through
+        here rather than add_product_mapping.
+        
+        Args:
+            mappings: Dictionary of product -> category
+        """
+        self._update(product_to_category_map={**self.assumptions["product_to_category_map"],
+                                              **mappings})
+        self._product_typos = None
+    
+    def get_category_for_product(self, product: str, fuzzy: bool = False) -> str:
+        """
+        Get category for a product.
+        
+        With fuzzy, names missing from the mapping are resolved to the closest
+        mapped product within a couple of typos (logged) before falling back
+        to the default.
+        """
+        mapping = self.assumptions["product_to_category_map"]
+        if product in mapping:
+            return mapping[product]
+        
+        if fuzzy:
+            match = self.match_product(product)
+            if match is not None:
+                print(f"Warning: Product '{product}' not mapped, using the category of '{match}'")
+                return mapping[match]
+        return "Odonto e Estética"
+    
+    def match_product(self, product: str, max_typos: int = 2) -> Optional[str]:
+        """
+        Find the mapped product name closest to a (possibly misspelled) name.
+        
+        Args:
+            product: Product name as written in the sheet
+            max_typos: Upper bound on edits
+            
+        Returns:
+            Product name from the mapping, or None if nothing is close enough
+        """
+        mapping = self.assumptions["product_to_category_map"]
+        # Rebuild the index when the mapping was replaced or resized
+        if (self._product_typos is None or self._indexed_mapping is not mapping
+                or len(self._product_typos.keys) != len(mapping)):
+            self._product_typos = compile_vocabulary({name: [name] for name in mapping})
+            self._indexed_mapping = mapping
+        
+        return self._product_typos.best(normalize_text(product), max_typos)
     
     def create_assumptions_sheet(self, workbook_manager):
         """
@@ -238,7 +475,7 @@ class AssumptionsManager:
     def save_to_json(self, file_path: str):
         """Save assumptions to JSON file."""
         with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.assumptions, f, ensure_ascii=False, indent=2)
+            json.dump(self.assumptions.to_dict(), f, ensure_ascii=False, indent=2)
     
     def load_from_json(self, file_path: str):
         """Load assumptions from JSON file."""
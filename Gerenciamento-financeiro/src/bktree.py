@@ -0,0 +1,252 @@
+"""
+Typo-Tolerant Matching Module
+
+BK-tree over a vocabulary of normalized names, so that spelling mistakes
+("periodotologia", "cirurigia oral") can be resolved by edit distance
+without comparing the query against every entry.
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    from Levenshtein import distance as _levenshtein_distance
+except ImportError:  # pragma: no cover - python-Levenshtein is in requirements.txt
+    _levenshtein_distance = None
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Levenshtein distance between two strings.
+
+    Uses python-Levenshtein when available, falling back to a
+    pure-Python dynamic programming implementation.
+
+    Args:
+        a: First string
+        b: Second string
+
+    Returns:
+        Minimum number of insertions, deletions and substitutions
+    """
+    if _levenshtein_distance is not None:
+        return _levenshtein_distance(a, b)
+
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ch_a in enumerate(a, 1):
+        current = [i]
+        for j, ch_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ch_a != ch_b),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def typo_budget(length: int, max_typos: int) -> int:
+    """
+    Number of edits tolerated for a word of a given length.
+
+    One edit per four characters, capped at max_typos, so short labels
+    such as "lb" or "csv" are only ever matched exactly.
+
+    Args:
+        length: Length of the shorter of the two strings
+        max_typos: Upper bound on the edits
+
+    Returns:
+        Allowed edit distance
+    """
+    return max(0, min(max_typos, length // 4))
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree: a metric index over strings.
+
+    Each node keeps its children keyed by their distance to the node, so a
+    search within distance k only descends into children whose key lies in
+    [d - k, d + k] (triangle inequality).
+    """
+
+    def __init__(self, words: Iterable[str] = (),
+                 distance: Callable[[str, str], int] = edit_distance):
+        """
+        Build the tree.
+
+        Args:
+            words: Initial words
+            distance: Metric used to compare words
+        """
+        self.distance = distance
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        self._size = 0
+
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> bool:
+        """
+        Insert a word.
+
+        Args:
+            word: Word to insert
+
+        Returns:
+            True if the word was new
+        """
+        if self._root is None:
+            self._root = (word, {})
+            self._size = 1
+            return True
+
+        node_word, children = self._root
+        while True:
+            d = self.distance(word, node_word)
+            if d == 0:
+                return False
+            child = children.get(d)
+            if child is None:
+                children[d] = (word, {})
+                self._size += 1
+                return True
+            node_word, children = child
+
+    def search(self, query: str, max_distance: int) -> List[Tuple[int, str]]:
+        """
+        Find every word within an edit distance of the query.
+
+        Args:
+            query: Word to look up
+            max_distance: Largest distance accepted
+
+        Returns:
+            List of (distance, word) sorted by distance, then word
+        """
+        if self._root is None or max_distance < 0:
+            return []
+
+        found = []
+        stack = [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            d = self.distance(query, node_word)
+            if d <= max_distance:
+                found.append((d, node_word))
+            for child_d in range(max(1, d - max_distance), d + max_distance + 1):
+                child = children.get(child_d)
+                if child is not None:
+                    stack.append(child)
+
+        found.sort()
+        return found
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, word: str) -> bool:
+        return bool(self.search(word, 0))
+
+    def __iter__(self) -> Iterator[str]:
+        if self._root is None:
+            return
+        stack = [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            yield node_word
+            stack.extend(children.values())
+
+
+class TypoCandidate(NamedTuple):
+    """A vocabulary entry close to a query."""
+    key: str
+    term: str
+    distance: int
+
+
+class TypoMatcher:
+    """
+    Resolves misspelled names against a vocabulary.
+
+    Terms and queries must already be normalized (see labeling.normalize_text).
+    Candidates are ranked by distance, then by the order in which keys were
+    registered.
+    """
+
+    def __init__(self, vocabulary: Dict[str, Iterable[str]], max_typos: int = 2):
+        """
+        Index the vocabulary.
+
+        Args:
+            vocabulary: Dictionary of key -> normalized terms naming it
+            max_typos: Default upper bound on edits per lookup
+        """
+        self.max_typos = max_typos
+        self.keys: List[str] = list(vocabulary)
+        # term -> indexes of the keys using it
+        self.term_keys: Dict[str, List[int]] = {}
+
+        for key_order, key in enumerate(self.keys):
+            for term in vocabulary[key]:
+                if not term:
+                    continue
+                owners = self.term_keys.setdefault(term, [])
+                if key_order not in owners:
+                    owners.append(key_order)
+
+        self.tree = BKTree(self.term_keys)
+
+    def suggest(self, text: str, max_typos: Optional[int] = None,
+                limit: Optional[int] = 5) -> List[TypoCandidate]:
+        """
+        Rank the vocabulary entries closest to a text.
+
+        Args:
+            text: Normalized text to look up
+            max_typos: Upper bound on edits (defaults to the matcher setting)
+            limit: Maximum number of candidates (None for all)
+
+        Returns:
+            List of TypoCandidate, best first
+        """
+        if not text:
+            return []
+        if max_typos is None:
+            max_typos = self.max_typos
+
+        ranked = []
+        for distance, term in self.tree.search(text, typo_budget(len(text), max_typos)):
+            if distance > typo_budget(min(len(text), len(term)), max_typos):
+                continue
+            for key_order in self.term_keys[term]:
+                ranked.append((distance, key_order, term))
+
+        ranked.sort()
+        seen = set()
+        candidates = []
+        for distance, key_order, term in ranked:
+            if key_order in seen:
+                continue
+            seen.add(key_order)
+            candidates.append(TypoCandidate(self.keys[key_order], term, distance))
+            if limit is not None and len(candidates) >= limit:
+                break
+
+        return candidates
+
+    def best(self, text: str, max_typos: Optional[int] = None) -> Optional[str]:
+        """
+        Get the closest key to a text.
+
+        Args:
+            text: Normalized text to look up
+            max_typos: Upper bound on edits (defaults to the matcher setting)
+
+        Returns:
+            Key name, or None if nothing is close enough
+        """
+        candidates = self.suggest(text, max_typos, limit=1)
+        return candidates[0].key if candidates else None
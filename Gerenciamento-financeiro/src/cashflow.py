@@ -4,8 +4,13 @@ Cash Flow Module with AR/AP Terms
 Implements cash flow projections with accounts receivable and payable timing.
 """
 
+from collections.abc import Mapping
 from typing import Dict, List, Tuple, Optional
-from .labeling import LabelDetector
+import numpy as np
+from .labeling import LabelDetector, get_month_number, compile_labels
+from .matcher import EXACT, CONTAINED
+from .grid import as_grid
+from .layout_cache import LayoutCache
 
 
 class CashFlowManager:
@@ -13,14 +18,38 @@ class CashFlowManager:
     Manages cash flow calculations with payment/collection terms.
     """
     
-    def __init__(self, assumptions_manager):
+    # Row labels of the cash flow section (first match in this order wins)
+    CASHFLOW_LABELS = {
+        'entradas': ['Entradas'],
+        'receita_vendas': ['Receita com Venda'],
+        'aporte_socios': ['Aporte'],
+        'csv_saida': ['Custo dos Serviços'],
+        'custos_fixos_saida': ['Custos Fixos'],
+        'custos_variaveis_saida': ['Custos Variáveis'],
+        'impostos_saida': ['Impostos'],
+        'financeiras_saida': ['Despesas Financeiras'],
+        'investimentos_saida': ['Investimentos'],
+        'retirada_socios': ['Retirada'],
+        'saidas_totais': ['Saidas Totais'],
+        'saldo_mensal': ['Saldo Mensal'],
+        'saldo_acumulado': ['Saldo Acumulado'],
+        'saldo_inicial': ['Saldo Inicial'],
+    }
+    CASHFLOW_LABEL_MATCHER = compile_labels(CASHFLOW_LABELS)
+    
+    # DRE lines feeding the cash flow
+    CASHFLOW_LINES = ('faturamento', 'csv', 'custos_fixos', 'custos_variaveis', 'impostos')
+    
+    def __init__(self, assumptions_manager, layout_cache: Optional[LayoutCache] = None):
         """
         Initialize cash flow manager.
         
         Args:
             assumptions_manager: AssumptionsManager instance
+            layout_cache: Optional LayoutCache to reuse a previously detected structure
         """
         self.assumptions = assumptions_manager
+        self.layout_cache = layout_cache
         self.label_detector = LabelDetector()
         self.cashflow_structure = {}
         self.initial_balance = 100000.0  # Default
@@ -30,17 +59,22 @@ class CashFlowManager:
         Find the cash flow section in the worksheet.
         
         Args:
-            worksheet: DRE worksheet containing cash flow
+            worksheet: DRE worksheet (or its SheetGrid) containing cash flow
             
         Returns:
             Starting row of cash flow section
         """
-        for row in range(1, worksheet.max_row + 1):
-            for col in range(1, 10):
-                cell = worksheet.cell(row=row, column=col)
-                if cell.value and "Fluxo de Caixa" in str(cell.value):
-                    print(f"Found cash flow section at row {row}")
-                    return row
+        grid = as_grid(worksheet)
+        
+        cached = self._cached_layout(grid)
+        if cached is not None:
+            print(f"Using cached cash flow section at row {cached['start_row']}")
+            return cached['start_row']
+        
+        for row, col, cell_text in grid.iter_text(1, grid.max_row, 1, 9):
+            if "Fluxo de Caixa" in cell_text:
+                print(f"Found cash flow section at row {row}")
+                return row
         
         return None
     
@@ -49,174 +83,203 @@ class CashFlowManager:
         Analyze cash flow structure.
         
         Args:
-            worksheet: Worksheet containing cash flow
+            worksheet: Worksheet (or its SheetGrid) containing cash flow
             cashflow_start_row: Starting row of cash flow section
             
         Returns:
             Dictionary with structure information
         """
-        # Find key rows in cash flow section
-        search_end = min(cashflow_start_row + 50, worksheet.max_row)
-        
-        key_labels = {
-            'Entradas': 'entradas',
-            'Receita com Venda': 'receita_vendas',
-            'Aporte': 'aporte_socios',
-            'Custo dos Serviços': 'csv_saida',
-            'Custos Fixos': 'custos_fixos_saida',
-            'Custos Variáveis': 'custos_variaveis_saida',
-            'Impostos': 'impostos_saida',
-            'Despesas Financeiras': 'financeiras_saida',
-            'Investimentos': 'investimentos_saida',
-            'Retirada': 'retirada_socios',
-            'Saidas Totais': 'saidas_totais',
-            'Saldo Mensal': 'saldo_mensal',
-            'Saldo Acumulado': 'saldo_acumulado',
-            'Saldo Inicial': 'saldo_inicial',
-        }
-        
-        for row in range(cashflow_start_row, search_end):
-            cell = worksheet.cell(row=row, column=2)
-            if not cell.value:
-                continue
+        grid = as_grid(worksheet)
+        
+        cached = self._cached_layout(grid)
+        if cached is not None and cached['start_row'] == cashflow_start_row:
+            self.cashflow_structure = dict(cached['rows'])
+        else:
+            # Find key rows in cash flow section
+            search_end = min(cashflow_start_row + 50, grid.max_row)
             
-            cell_text = str(cell.value).strip()
+            # Rows containing a label; the first label in CASHFLOW_LABELS order wins
+            for row, hits in self.label_detector.classify_column(
+                    grid, 2, cashflow_start_row, search_end - 1,
+                    matcher=self.CASHFLOW_LABEL_MATCHER, kinds=(EXACT, CONTAINED)):
+                self.cashflow_structure[hits[0].key] = row
             
-            for label, key in key_labels.items():
-                if label.lower() in cell_text.lower():
-                    self.cashflow_structure[key] = row
-                    break
+            if self.layout_cache is not None:
+                check_cells = [(row, 2) for row in self.cashflow_structure.values()]
+                self.layout_cache.put(grid, 'cashflow', {
+                    'start_row': cashflow_start_row,
+                    'rows': self.cashflow_structure,
+                }, check_cells)
         
         # Get initial balance value
         saldo_inicial_row = self.cashflow_structure.get('saldo_inicial')
         if saldo_inicial_row:
             # Value is typically in the row below
-            value_cell = worksheet.cell(row=saldo_inicial_row + 1, column=2)
-            if value_cell.value and isinstance(value_cell.value, (int, float)):
-                self.initial_balance = float(value_cell.value)
+            value = grid.number(saldo_inicial_row + 1, 2)
+            if value:
+                self.initial_balance = value
         
         print(f"Cash flow structure: {self.cashflow_structure}")
         print(f"Initial balance: {self.initial_balance:,.2f}")
         
         return self.cashflow_structure
     
-    def apply_ar_terms(self, monthly_revenue: List[float]) -> List[List[float]]:
+    def _cached_layout(self, grid) -> Optional[Dict]:
+        """Get the cached cash flow layout of a sheet, if still valid."""
+        if self.layout_cache is None:
+            return None
+        return self.layout_cache.get(grid, 'cashflow')
+    
+    def get_term_kernel(self, terms_key: str) -> np.ndarray:
         """
-        Apply accounts receivable terms to distribute cash inflows.
+        Build the monthly timing kernel of a payment/collection terms table.
+        
+        kernel[k] is the share of a month's amount settled k months later
+        (30 days = 1 month); terms falling in the same month are added up.
         
         Args:
-            monthly_revenue: List of 12 monthly revenue values
+            terms_key: 'ar_terms' or 'ap_terms'
             
         Returns:
-            2D list where each row is a month and columns are cash-in timing
+            float64 array of weights indexed by month delay
         """
-        ar_days = self.assumptions.assumptions["ar_terms"]["days"]
-        ar_weights = self.assumptions.assumptions["ar_terms"]["weights"]
-        
-        # Convert days to months (simplified: 30 days = 1 month)
-        ar_months = [days // 30 for days in ar_days]
-        
-        # Initialize 12x12 matrix for cash inflows
-        cash_inflows = [[0.0 for _ in range(12)] for _ in range(12)]
+        terms = self.assumptions.assumptions[terms_key]
+        return term_kernel(terms["days"], terms["weights"])
+    
+    def apply_ar_terms(self, monthly_revenue: List[float]) -> List[float]:
+        """
+        Apply accounts receivable terms to distribute cash inflows.
         
-        # Distribute each month's revenue according to terms
-        for sale_month in range(12):
-            revenue = monthly_revenue[sale_month]
+        Args:
+            monthly_revenue: Monthly revenue values (any number of months)
             
-            for delay_months, weight in zip(ar_months, ar_weights):
-                cash_month = sale_month + delay_months
-                
-                # Handle year-end carryover (simplified - just cap at Dec)
-                if cash_month < 12:
-                    cash_inflows[cash_month][sale_month] = revenue * weight
-        
-        # Sum across sale months to get total cash-in per month
-        monthly_cash_in = [sum(month_inflows) for month_inflows in cash_inflows]
-        
-        return monthly_cash_in
+        Returns:
+            Monthly cash-in values within the horizon (see
+            distribute_terms for the amounts collected after it)
+        """
+        cash_in, _ = distribute_terms(monthly_revenue, self.get_term_kernel("ar_terms"))
+        return cash_in.tolist()
     
     def apply_ap_terms(self, monthly_expenses: List[float]) -> List[float]:
         """
         Apply accounts payable terms to distribute cash outflows.
         
         Args:
-            monthly_expenses: List of 12 monthly expense values
+            monthly_expenses: Monthly expense values (any number of months)
             
         Returns:
-            List of 12 monthly cash-out values
+            Monthly cash-out values within the horizon (see
+            distribute_terms for the amounts paid after it)
         """
-        ap_days = self.assumptions.assumptions["ap_terms"]["days"]
-        ap_weights = self.assumptions.assumptions["ap_terms"]["weights"]
-        
-        # Convert days to months
-        ap_months = [days // 30 for days in ap_days]
-        
-        # Initialize cash outflows
-        cash_outflows = [0.0 for _ in range(12)]
-        
-        # Distribute each month's expenses according to terms
-        for expense_month in range(12):
-            expense = monthly_expenses[expense_month]
-            
-            for delay_months, weight in zip(ap_months, ap_weights):
-                cash_month = expense_month + delay_months
-                
-                if cash_month < 12:
-                    cash_outflows[cash_month] += expense * weight
-        
-        return cash_outflows
+        cash_out, _ = distribute_terms(monthly_expenses, self.get_term_kernel("ap_terms"))
+        return cash_out.tolist()
     
-    def calculate_monthly_cashflow(self, dre_data: Dict[str, List[float]]) -> Dict[str, List[float]]:
+    def calculate_monthly_cashflow(
+        self,
+        dre_data: Dict[str, List[float]],
+        carry_in: Optional[Dict[str, List[float]]] = None
+    ) -> Dict[str, List[float]]:
         """
         Calculate monthly cash flow with AR/AP terms.
         
+        The horizon is the length of the DRE series (12 months by default).
+        Collections and payments falling after the horizon are returned as
+        'carryover_inflows' / 'carryover_outflows' (index 0 = first month
+        after the horizon) and can be passed as carry_in of the next period.
+        
         Args:
             dre_data: Dictionary with monthly DRE values
+            carry_in: Optional previous result (or dict) with 'carryover_inflows'
+                      and 'carryover_outflows' settling in this period
             
         Returns:
             Dictionary with cash flow calculations
         """
-        # Extract monthly values from DRE
-        monthly_revenue = dre_data.get('faturamento', [0] * 12)
-        monthly_csv = dre_data.get('csv', [0] * 12)
-        monthly_fixed = dre_data.get('custos_fixos', [0] * 12)
-        monthly_variable = dre_data.get('custos_variaveis', [0] * 12)
-        monthly_taxes = dre_data.get('impostos', [0] * 12)
+        batch = self.calculate_cashflow_batch(
+            {line: [values] for line, values in dre_data.items() if line in self.CASHFLOW_LINES},
+            initial_balances=self.initial_balance,
+            carry_in=carry_in,
+        )
+        return {key: values[0].tolist() for key, values in batch.items()}
+    
+    def calculate_cashflow_batch(
+        self,
+        dre_batch: Dict[str, np.ndarray],
+        ar_terms=None,
+        ap_terms=None,
+        initial_balances=None,
+        carry_in: Optional[Dict[str, np.ndarray]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calculate the cash flow of many scenarios in one vectorized call.
+        
+        Args:
+            dre_batch: Dictionary with DRE line -> array of shape
+                       (scenarios, months); a (months,) series is shared
+                       by every scenario
+            ar_terms: None (assumptions), one {'days', 'weights'} dict, a
+                      list with one dict per scenario (weights used as given),
+                      or a (scenarios, delays) kernel array
+            ap_terms: Same as ar_terms, for payables
+            initial_balances: Scalar or (scenarios,) array (defaults to
+                              initial_balance)
+            carry_in: Optional dict with 'carryover_inflows' and
+                      'carryover_outflows' arrays from a previous period
+            
+        Returns:
+            Dictionary with the keys of calculate_monthly_cashflow, each an
+            array of shape (scenarios, months) or (scenarios, carry-over months)
+        """
+        arrays = {
+            line: np.atleast_2d(np.asarray(dre_batch[line], dtype=np.float64))
+            for line in self.CASHFLOW_LINES if line in dre_batch
+        }
+        lengths = {values.shape[-1] for values in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"DRE series have different lengths: {sorted(lengths)}")
+        horizon = lengths.pop() if lengths else 12
+        
+        if initial_balances is None:
+            initial_balances = self.initial_balance
+        initial_balances = np.asarray(initial_balances, dtype=np.float64).reshape(-1, 1)
+        
+        ar_kernel = self._batch_kernel(ar_terms, "ar_terms")
+        ap_kernel = self._batch_kernel(ap_terms, "ap_terms")
+        
+        scenarios = max([len(values) for values in arrays.values()] +
+                        [len(initial_balances)] +
+                        [len(k) for k in (ar_kernel, ap_kernel) if k.ndim == 2])
+        shape = (scenarios, horizon)
+        
+        def series(line):
+            return np.broadcast_to(arrays.get(line, 0.0), shape)
         
         # Apply AR terms to revenue
-        cash_inflows = self.apply_ar_terms(monthly_revenue)
+        cash_inflows, carry_inflows = distribute_terms(series('faturamento'), ar_kernel)
         
         # Apply AP terms to expenses
-        cash_outflows_csv = self.apply_ap_terms(monthly_csv)
-        cash_outflows_fixed = self.apply_ap_terms(monthly_fixed)
-        cash_outflows_variable = self.apply_ap_terms(monthly_variable)
+        cash_outflows_csv, carry_csv = distribute_terms(series('csv'), ap_kernel)
+        cash_outflows_fixed, carry_fixed = distribute_terms(series('custos_fixos'), ap_kernel)
+        cash_outflows_variable, carry_variable = distribute_terms(series('custos_variaveis'), ap_kernel)
+        carry_outflows = carry_csv + carry_fixed + carry_variable
         
         # Taxes typically paid in same month (accrual)
-        cash_outflows_taxes = monthly_taxes.copy()
+        cash_outflows_taxes = series('impostos').copy()
         
         # Total outflows
-        total_outflows = []
-        for i in range(12):
-            total = (cash_outflows_csv[i] + 
-                    cash_outflows_fixed[i] + 
-                    cash_outflows_variable[i] + 
-                    cash_outflows_taxes[i])
-            total_outflows.append(total)
+        total_outflows = (cash_outflows_csv + cash_outflows_fixed +
+                          cash_outflows_variable + cash_outflows_taxes)
         
-        # Monthly and accumulated balances
-        monthly_balance = []
-        accumulated_balance = [self.initial_balance]
+        # Amounts from the previous period settling in this one
+        if carry_in:
+            cash_inflows, carry_inflows = _settle_carry_in(
+                cash_inflows, carry_inflows, carry_in.get('carryover_inflows', []))
+            total_outflows, carry_outflows = _settle_carry_in(
+                total_outflows, carry_outflows, carry_in.get('carryover_outflows', []))
         
-        for i in range(12):
-            monthly = cash_inflows[i] - total_outflows[i]
-            monthly_balance.append(monthly)
-            
-            if i == 0:
-                accum = self.initial_balance + monthly
-            else:
-                accum = accumulated_balance[i] + monthly
-            
-            accumulated_balance.append(accum)
+        # Monthly and accumulated balances
+        monthly_balance = cash_inflows - total_outflows
+        accumulated_balance = initial_balances + np.cumsum(monthly_balance, axis=-1)
         
         return {
             'cash_inflows': cash_inflows,
@@ -226,9 +289,26 @@ class CashFlowManager:
             'cash_outflows_taxes': cash_outflows_taxes,
             'total_outflows': total_outflows,
             'monthly_balance': monthly_balance,
-            'accumulated_balance': accumulated_balance[1:],  # Skip initial
+            'accumulated_balance': accumulated_balance,
+            'carryover_inflows': carry_inflows,
+            'carryover_outflows': carry_outflows,
         }
     
+    def _batch_kernel(self, terms, terms_key: str) -> np.ndarray:
+        """Kernel of shape (K,) for shared terms or (scenarios, K) for per-scenario terms."""
+        if terms is None:
+            return self.get_term_kernel(terms_key)
+        if isinstance(terms, np.ndarray):
+            return terms
+        if isinstance(terms, Mapping):
+            return term_kernel(terms["days"], terms["weights"])
+        
+        kernels = [term_kernel(t["days"], t["weights"]) for t in terms]
+        stacked = np.zeros((len(kernels), max(len(k) for k in kernels)))
+        for i, kernel in enumerate(kernels):
+            stacked[i, :len(kernel)] = kernel
+        return stacked
+    
     def write_cashflow_to_sheet(self, workbook_manager, worksheet, 
                                cashflow_data: Dict[str, List[float]], month_cols: Dict[str, int]):
         """
@@ -246,8 +326,7 @@ class CashFlowManager:
         
         # Sort months
         sorted_months = sorted(month_cols.items(), 
-                              key=lambda x: self.label_detector.MONTHS_PT.index(
-                                  self.label_detector.normalize_text(x[0])))
+                              key=lambda x: get_month_number(x[0]))
         
         # Write cash inflows
         if 'receita_vendas' in self.cashflow_structure:
@@ -314,4 +393,136 @@ class CashFlowManager:
                 risky_months.append((i, balance))
         
         return risky_months
+    
+    def simulate_liquidity_risk(self, dre_data: Dict[str, List[float]], n_paths: int = 10000,
+                                minimum_balance: float = 50000.0, seed: Optional[int] = None,
+                                workers: int = 1, distributions: Optional[Dict] = None) -> Dict:
+        """
+        Monte Carlo form of check_liquidity_risk.
+        
+        Args:
+            dre_data: Dictionary with monthly DRE values (base projection)
+            n_paths: Number of simulated cash paths
+            minimum_balance: Minimum safe balance
+            seed: Seed for reproducible runs
+            workers: Processes to shard the paths across
+            distributions: Overrides of LiquiditySimulator.DEFAULT_DISTRIBUTIONS
+            
+        Returns:
+            Summary from LiquiditySimulator.simulate
+        """
+        from .montecarlo import LiquiditySimulator
+        
+        simulator = LiquiditySimulator(self, distributions)
+        return simulator.simulate(dre_data, n_paths, minimum_balance, seed, workers)
+    
+    def get_cashflow_summary_batch(self, batch: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Get summary statistics for a batch of cash flows.
+        
+        Args:
+            batch: Result of calculate_cashflow_batch
+            
+        Returns:
+            Dictionary with the keys of get_cashflow_summary, each a
+            (scenarios,) array
+        """
+        accumulated = batch['accumulated_balance']
+        return {
+            'total_inflows': batch['cash_inflows'].sum(axis=-1),
+            'total_outflows': batch['total_outflows'].sum(axis=-1),
+            'net_cashflow': batch['monthly_balance'].sum(axis=-1),
+            'ending_balance': accumulated[..., -1],
+            'min_balance': accumulated.min(axis=-1),
+            'max_balance': accumulated.max(axis=-1),
+            'months_negative': (batch['monthly_balance'] < 0).sum(axis=-1),
+        }
+    
+    def check_liquidity_risk_batch(self, batch: Dict[str, np.ndarray],
+                                   minimum_balance=50000.0) -> np.ndarray:
+        """
+        Flag months with liquidity risk for a batch of cash flows.
+        
+        Args:
+            batch: Result of calculate_cashflow_batch
+            minimum_balance: Scalar or (scenarios,) minimum safe balance
+            
+        Returns:
+            Boolean array of shape (scenarios, months); use .any(axis=1) for
+            scenarios at risk and .sum(axis=1) for the number of risky months
+        """
+        minimum_balance = np.asarray(minimum_balance, dtype=np.float64)
+        if minimum_balance.ndim:
+            minimum_balance = minimum_balance.reshape(-1, 1)
+        return batch['accumulated_balance'] < minimum_balance
+
 
+def term_kernel(days: List[int], weights: List[float]) -> np.ndarray:
+    """
+    Build a monthly timing kernel from payment/collection terms.
+    
+    Args:
+        days: Settlement delay of each term in days (30 days = 1 month)
+        weights: Share of the amount settled with each delay
+        
+    Returns:
+        float64 array where kernel[k] is the share settled k months later
+    """
+    if not days:
+        return np.ones(1)
+    months = np.asarray(days, dtype=np.int64) // 30
+    if (months < 0).any():
+        raise ValueError("Term days must not be negative")
+    return np.bincount(months, weights=np.asarray(weights, dtype=np.float64))
+
+
+def distribute_terms(amounts, kernel: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convolve monthly amounts with a timing kernel.
+    
+    Works on the last axis, so a batch of series (e.g. scenarios x months)
+    is distributed in one call. A 2-D kernel (scenarios x delays) gives each
+    series its own terms.
+    
+    Args:
+        amounts: Monthly amounts, shape (..., months)
+        kernel: Timing kernel from term_kernel, shape (delays,) or (..., delays)
+        
+    Returns:
+        Tuple of (settled within the horizon, shape (..., months);
+        spill-over after the horizon, shape (..., len(kernel) - 1))
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    kernel = np.asarray(kernel, dtype=np.float64)
+    horizon = amounts.shape[-1]
+    delays = kernel.shape[-1]
+    
+    batch_shape = np.broadcast_shapes(amounts.shape[:-1], kernel.shape[:-1])
+    full = np.zeros(batch_shape + (horizon + delays - 1,))
+    for delay in range(delays):
+        weight = kernel[..., delay]
+        if np.any(weight):
+            full[..., delay:delay + horizon] += np.expand_dims(weight, -1) * amounts
+    
+    return full[..., :horizon], full[..., horizon:]
+
+
+def _settle_carry_in(series: np.ndarray, carryover: np.ndarray,
+                     carry_in) -> Tuple[np.ndarray, np.ndarray]:
+    """Add amounts from a previous period, pushing any excess to the carry-over."""
+    carry_in = np.asarray(carry_in, dtype=np.float64)
+    horizon = series.shape[-1]
+    
+    series = series.copy()
+    settled = carry_in[..., :horizon]
+    series[..., :settled.shape[-1]] += settled
+    
+    excess = carry_in[..., horizon:]
+    if excess.shape[-1]:
+        size = max(carryover.shape[-1], excess.shape[-1])
+        merged = np.zeros(series.shape[:-1] + (size,))
+        merged[..., :carryover.shape[-1]] += carryover
+        merged[..., :excess.shape[-1]] += excess
+        carryover = merged
+    
+    return series, carryover
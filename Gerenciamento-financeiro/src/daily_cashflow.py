@@ -0,0 +1,203 @@
+"""
+Daily Cash Flow Module
+
+Projects cash at day granularity: DRE lines are booked on the days they are
+actually incurred, AR/AP terms shift them by their real day offsets, and the
+result is rolled up to the same monthly keys as CashFlowManager.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Union
+import numpy as np
+
+
+class DailyCashFlowEngine:
+    """
+    Day-granularity cash flow projection.
+
+    Each DRE line is booked either spread evenly over the days of its month
+    (None) or on a fixed day of the month (1-31, clipped to the month length).
+    Fixed days falling on a weekend roll forward to the next business day.
+    """
+
+    # Day of the month each line is incurred (None = spread over the month)
+    DEFAULT_PAYMENT_CALENDAR: Dict[str, Optional[int]] = {
+        'faturamento': None,
+        'csv': None,
+        'custos_fixos': 5,
+        'custos_variaveis': None,
+        'impostos': 20,
+        'folha_pagamento': 5,
+        'aluguel': 10,
+    }
+
+    # Output bucket of each line; lines not listed here are ignored
+    LINE_OUTPUTS = {
+        'faturamento': 'cash_inflows',
+        'csv': 'cash_outflows_csv',
+        'custos_fixos': 'cash_outflows_fixed',
+        'folha_pagamento': 'cash_outflows_fixed',
+        'aluguel': 'cash_outflows_fixed',
+        'custos_variaveis': 'cash_outflows_variable',
+        'impostos': 'cash_outflows_taxes',
+    }
+
+    # Lines settled on their due date instead of through AP terms
+    UNTERMED_LINES = ('impostos',)
+
+    def __init__(self, assumptions_manager, start_date: date = date(2025, 1, 1),
+                 initial_balance: float = 100000.0,
+                 payment_calendar: Optional[Dict[str, Optional[int]]] = None,
+                 roll_weekends: bool = True):
+        """
+        Initialize the engine.
+
+        Args:
+            assumptions_manager: AssumptionsManager instance
+            start_date: First day of the projection (first day of a month)
+            initial_balance: Cash at the start of the projection
+            payment_calendar: Overrides of DEFAULT_PAYMENT_CALENDAR
+            roll_weekends: Move fixed-day payments off weekends
+        """
+        if start_date.day != 1:
+            raise ValueError("Projection must start on the first day of a month")
+
+        self.assumptions = assumptions_manager
+        self.start_date = start_date
+        self.initial_balance = initial_balance
+        self.payment_calendar = dict(self.DEFAULT_PAYMENT_CALENDAR)
+        if payment_calendar:
+            self.payment_calendar.update(payment_calendar)
+        self.roll_weekends = roll_weekends
+
+    def day_kernel(self, terms_key: str) -> np.ndarray:
+        """
+        Build the daily timing kernel of a terms table.
+
+        Args:
+            terms_key: 'ar_terms' or 'ap_terms'
+
+        Returns:
+            float64 array where kernel[d] is the share settled d days later
+        """
+        terms = self.assumptions.assumptions[terms_key]
+        days = np.asarray(terms["days"], dtype=np.int64)
+        if len(days) == 0:
+            return np.ones(1)
+        if (days < 0).any():
+            raise ValueError("Term days must not be negative")
+        return np.bincount(days, weights=np.asarray(terms["weights"], dtype=np.float64))
+
+    def _calendar(self, months: int):
+        """Day offsets of every month start and the month of every day."""
+        start = np.datetime64(self.start_date, 'M')
+        month_starts = (start + np.arange(months + 1)).astype('datetime64[D]')
+        first_day = month_starts[0]
+        offsets = (month_starts - first_day).astype(np.int64)
+        days_in_month = np.diff(offsets)
+        day_month = np.repeat(np.arange(months), days_in_month)
+        return first_day, offsets, days_in_month, day_month
+
+    def _book(self, amounts: np.ndarray, day: Optional[int], first_day,
+              offsets: np.ndarray, days_in_month: np.ndarray,
+              day_month: np.ndarray, length: int) -> np.ndarray:
+        """Place monthly amounts on the days they are incurred."""
+        booked = np.zeros(length)
+        horizon_days = len(day_month)
+
+        if day is None:
+            booked[:horizon_days] = (amounts / days_in_month)[day_month]
+            return booked
+
+        due = offsets[:-1] + np.minimum(day, days_in_month) - 1
+        if self.roll_weekends:
+            due_dates = first_day + due
+            due = (np.busday_offset(due_dates, 0, roll='forward') - first_day).astype(np.int64)
+        np.add.at(booked, due, amounts)
+        return booked
+
+    def calculate_daily_cashflow(
+        self,
+        dre_data: Dict[str, List[float]]
+    ) -> Dict[str, Union[List[float], np.ndarray]]:
+        """
+        Project cash day by day and roll it up by month.
+
+        Args:
+            dre_data: Dictionary with monthly DRE values (any number of months,
+                      e.g. 36 for a 3-year projection)
+
+        Returns:
+            Dictionary with the monthly keys of
+            CashFlowManager.calculate_monthly_cashflow, plus:
+              - 'min_daily_balance': lowest daily balance of each month
+              - 'daily_dates', 'daily_inflows', 'daily_outflows',
+                'daily_balance': NumPy arrays, one entry per day
+        """
+        lines = [line for line in self.LINE_OUTPUTS if line in dre_data]
+        lengths = {len(dre_data[line]) for line in lines}
+        if len(lengths) > 1:
+            raise ValueError(f"DRE series have different lengths: {sorted(lengths)}")
+        months = lengths.pop() if lengths else 12
+
+        first_day, offsets, days_in_month, day_month = self._calendar(months)
+        horizon_days = len(day_month)
+
+        ar_kernel = self.day_kernel("ar_terms")
+        ap_kernel = self.day_kernel("ap_terms")
+        # Room for weekend rolls and the longest term
+        length = horizon_days + 3 + max(len(ar_kernel), len(ap_kernel))
+
+        buckets = {key: np.zeros(length) for key in set(self.LINE_OUTPUTS.values())}
+        for line in lines:
+            booked = self._book(np.asarray(dre_data[line], dtype=np.float64),
+                                self.payment_calendar.get(line), first_day,
+                                offsets, days_in_month, day_month, length)
+            if line == 'faturamento':
+                kernel = ar_kernel
+            elif line in self.UNTERMED_LINES:
+                kernel = None
+            else:
+                kernel = ap_kernel
+            if kernel is not None:
+                booked = np.convolve(booked, kernel)[:length]
+            buckets[self.LINE_OUTPUTS[line]] += booked
+
+        daily_inflows = buckets['cash_inflows']
+        daily_outflows = sum(value for key, value in buckets.items() if key != 'cash_inflows')
+
+        inside = slice(0, horizon_days)
+        daily_balance = self.initial_balance + np.cumsum(daily_inflows[inside] - daily_outflows[inside])
+
+        def roll_up(daily: np.ndarray) -> np.ndarray:
+            return np.bincount(day_month, weights=daily[inside], minlength=months)
+
+        def spill(daily: np.ndarray) -> List[float]:
+            # Monthly buckets after the horizon (index 0 = first month after it)
+            tail = daily[horizon_days:]
+            if not tail.any():
+                return []
+            tail_dates = first_day + horizon_days + np.arange(len(tail))
+            tail_month = (tail_dates.astype('datetime64[M]') -
+                          np.datetime64(self.start_date, 'M')).astype(np.int64) - months
+            totals = np.bincount(tail_month, weights=tail)
+            return totals[:np.flatnonzero(totals)[-1] + 1].tolist()
+
+        result = {key: roll_up(value).tolist() for key, value in buckets.items()}
+        total_outflows = roll_up(daily_outflows)
+        monthly_balance = roll_up(daily_inflows) - total_outflows
+        month_ends = offsets[1:] - 1
+
+        result.update({
+            'total_outflows': total_outflows.tolist(),
+            'monthly_balance': monthly_balance.tolist(),
+            'accumulated_balance': daily_balance[month_ends].tolist(),
+            'min_daily_balance': np.minimum.reduceat(daily_balance, offsets[:-1]).tolist(),
+            'carryover_inflows': spill(daily_inflows),
+            'carryover_outflows': spill(daily_outflows),
+            'daily_dates': first_day + np.arange(horizon_days),
+            'daily_inflows': daily_inflows[inside],
+            'daily_outflows': daily_outflows[inside],
+            'daily_balance': daily_balance,
+        })
+        return result
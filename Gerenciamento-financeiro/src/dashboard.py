@@ -7,6 +7,7 @@ Creates a dashboard sheet with key performance indicators.
 from typing import Dict, List, Optional
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
+from .product_store import ProductStore
 
 
 class DashboardManager:
@@ -178,10 +179,9 @@ class DashboardManager:
             self._create_section_header(workbook_manager, ws, row, 1, "TOP PRODUTOS POR RECEITA")
             row += 1
             
-            # Sort products by revenue
-            products_sorted = sorted(product_data.items(), 
-                                   key=lambda x: x[1].get('receita_liquida', 0), 
-                                   reverse=True)
+            # Top products by revenue (partial selection, no full sort)
+            store = ProductStore.from_product_data(product_data)
+            top_products = store.ranking.top(10, 'receita_liquida')
             
             # Headers
             headers = ["Produto", "Receita Líquida", "CSV", "Margem Bruta", "MB%"]
@@ -193,7 +193,8 @@ class DashboardManager:
             row += 1
             
             # Top 10 products
-            for product, data in products_sorted[:10]:
+            for product, _ in top_products:
+                data = store.row(product)
                 receita = data.get('receita_liquida', 0)
                 csv = data.get('csv', 0)
                 lb = receita - csv
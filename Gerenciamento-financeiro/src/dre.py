@@ -5,7 +5,132 @@ Handles main P&L consolidation, calculations, and monthly distribution.
 """
 
 from typing import Dict, List, Tuple, Optional
+import numpy as np
 from .labeling import LabelDetector, get_month_number
+from .grid import as_grid
+from .layout_cache import LayoutCache
+
+
+class DREMatrix:
+    """
+    DRE lines x months matrix of float64 values with named axes.
+    
+    The last two axes are always (rows, months); leading axes are allowed so
+    that several years or entities can be stacked and computed together.
+    Lines missing from the matrix read as zeros.
+    """
+    
+    def __init__(self, values: np.ndarray, rows: List[str], months: List[str]):
+        """
+        Initialize the matrix.
+        
+        Args:
+            values: Array of shape (..., len(rows), len(months))
+            rows: DRE line names (e.g. 'faturamento', 'csv')
+            months: Month names
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[-2:] != (len(rows), len(months)):
+            raise ValueError(
+                f"Matrix shape {values.shape} does not match {len(rows)} rows x {len(months)} months"
+            )
+        
+        self.values = values
+        self.rows = list(rows)
+        self.months = list(months)
+        self._row_index = {row: i for i, row in enumerate(self.rows)}
+    
+    @classmethod
+    def from_grid(cls, worksheet, dre_structure: Dict[str, int],
+                  month_cols: Dict[str, int]) -> "DREMatrix":
+        """
+        Load the DRE lines of a sheet with a single gather.
+        
+        Args:
+            worksheet: DRE worksheet or its SheetGrid
+            dre_structure: Dictionary with line name -> row number
+            month_cols: Dictionary with month name -> column number
+            
+        Returns:
+            DREMatrix with one row per line of dre_structure
+        """
+        grid = as_grid(worksheet)
+        rows = list(dre_structure)
+        months = list(month_cols)
+        values = grid.numbers_at([dre_structure[r] for r in rows],
+                                 [month_cols[m] for m in months])
+        return cls(values, rows, months)
+    
+    def __contains__(self, row: str) -> bool:
+        return row in self._row_index
+    
+    def row(self, name: str) -> np.ndarray:
+        """
+        Get the monthly values of a line.
+        
+        Args:
+            name: Line name
+            
+        Returns:
+            Array of shape (..., months); zeros if the line is missing
+        """
+        i = self._row_index.get(name)
+        if i is None:
+            return np.zeros(self.values.shape[:-2] + (len(self.months),))
+        return self.values[..., i, :]
+    
+    def lucro_bruto(self) -> np.ndarray:
+        """LB = Faturamento - CSV."""
+        return self.row('faturamento') - self.row('csv')
+    
+    def lair(self) -> np.ndarray:
+        """LAIR = LB - Custos Fixos - Custos Variáveis."""
+        return self.lucro_bruto() - self.row('custos_fixos') - self.row('custos_variaveis')
+    
+    def lucro_liquido(self) -> np.ndarray:
+        """LL = LAIR - Impostos."""
+        return self.lair() - self.row('impostos')
+    
+    @staticmethod
+    def ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        """
+        Percentage ratio masked where the denominator is not positive.
+        
+        Returns:
+            Array of numerator / denominator * 100, NaN where denominator <= 0
+        """
+        numerator, denominator = np.broadcast_arrays(numerator, denominator)
+        out = np.full(numerator.shape, np.nan)
+        np.divide(numerator, denominator, out=out, where=denominator > 0)
+        return out * 100
+    
+    def margins(self) -> Dict[str, np.ndarray]:
+        """
+        Margin ratios of the lines present in the matrix.
+        
+        Returns:
+            Dictionary with margin name -> array (NaN for months without revenue)
+        """
+        faturamento = self.row('faturamento')
+        margins = {}
+        for margin, line in (('margem_bruta', 'lucro_bruto'),
+                             ('margem_lair', 'lair'),
+                             ('margem_liquida', 'lucro_liquido')):
+            if line in self:
+                margins[margin] = self.ratio(self.row(line), faturamento)
+        return margins
+    
+    def to_month_dict(self, values: np.ndarray) -> Dict[str, float]:
+        """
+        Convert a monthly vector to a month -> value dictionary.
+        
+        Args:
+            values: Array of shape (months,)
+            
+        Returns:
+            Dictionary with month -> value
+        """
+        return dict(zip(self.months, values.tolist()))
 
 
 class DREManager:
@@ -13,14 +138,16 @@ class DREManager:
     Manages DRE calculations and consolidation.
     """
     
-    def __init__(self, assumptions_manager):
+    def __init__(self, assumptions_manager, layout_cache: Optional[LayoutCache] = None):
         """
         Initialize DRE manager.
         
         Args:
             assumptions_manager: AssumptionsManager instance
+            layout_cache: Optional LayoutCache to reuse a previously detected structure
         """
         self.assumptions = assumptions_manager
+        self.layout_cache = layout_cache
         self.label_detector = LabelDetector()
         self.month_row = None
         self.month_cols = None
@@ -31,13 +158,24 @@ class DREManager:
         Analyze the DRE worksheet structure.
         
         Args:
-            worksheet: DRE Grencial Instituto worksheet
+            worksheet: DRE Grencial Instituto worksheet or its SheetGrid
             
         Returns:
             Dictionary with structure information
         """
+        grid = as_grid(worksheet)
+        
+        if self.layout_cache is not None:
+            cached = self.layout_cache.get(grid, 'dre')
+            if cached is not None:
+                self.month_row = cached['month_row']
+                self.month_cols = cached['month_cols']
+                self.dre_structure = dict(cached['rows'])
+                print(f"Using cached DRE layout (month row {self.month_row})")
+                return self.dre_structure
+        
         # Find month row
-        month_info = self.label_detector.find_month_row(worksheet, start_row=1, max_search_rows=20)
+        month_info = self.label_detector.find_month_row(grid, start_row=1, max_search_rows=20)
         
         if month_info:
             self.month_row, self.month_cols = month_info
@@ -61,16 +199,28 @@ class DREManager:
             'lucro_liquido',
         ]
         
+        # One index of the sheet resolves every key label
+        positions = self.label_detector.find_labels(
+            grid,
+            key_labels,
+            search_area=(self.month_row, self.month_row + 100, 1, 3)
+        )
+        
         for label in key_labels:
-            pos = self.label_detector.find_label(
-                worksheet, 
-                label,
-                search_area=(self.month_row, self.month_row + 100, 1, 3)
-            )
+            pos = positions.get(label)
             if pos:
                 self.dre_structure[label] = pos[0]  # Store row number
                 print(f"Found {label} at row {pos[0]}")
         
+        if self.layout_cache is not None:
+            check_cells = [(self.month_row, col) for col in self.month_cols.values()]
+            check_cells += [positions[label] for label in self.dre_structure]
+            self.layout_cache.put(grid, 'dre', {
+                'month_row': self.month_row,
+                'month_cols': self.month_cols,
+                'rows': self.dre_structure,
+            }, check_cells)
+        
         return self.dre_structure
     
     def read_2024_realized(self, worksheet) -> float:
@@ -83,15 +233,15 @@ class DREManager:
         Returns:
             2024 realized value
         """
+        grid = as_grid(worksheet)
+        
         # Look for "Realizado 2024" in top rows
-        for row in range(1, 10):
-            for col in range(1, 10):
-                cell = worksheet.cell(row=row, column=col)
-                if cell.value and "Realizado 2024" in str(cell.value):
-                    # Value should be in same row, next column or below
-                    value_cell = worksheet.cell(row=row + 1, column=col)
-                    if value_cell.value and isinstance(value_cell.value, (int, float)):
-                        return float(value_cell.value)
+        for row, col, cell_text in grid.iter_text(1, 9, 1, 9):
+            if "Realizado 2024" in cell_text:
+                # Value should be in same row, next column or below
+                value = grid.number(row + 1, col)
+                if value:
+                    return value
         
         return 0.0
     
@@ -154,6 +304,18 @@ class DREManager:
             
             workbook_manager.write_value(worksheet, row, col, value)
     
+    def load_matrix(self, worksheet) -> DREMatrix:
+        """
+        Load the detected DRE lines into a rows x months matrix.
+        
+        Args:
+            worksheet: DRE worksheet or its SheetGrid
+            
+        Returns:
+            DREMatrix over dre_structure and month_cols
+        """
+        return DREMatrix.from_grid(worksheet, self.dre_structure, self.month_cols or {})
+    
     def calculate_lucro_bruto(self, worksheet) -> Dict[str, float]:
         """
         Calculate Lucro Bruto for each month.
@@ -161,25 +323,11 @@ class DREManager:
         Returns:
             Dictionary with month -> LB value
         """
-        lucro_bruto = {}
-        
         if 'faturamento' not in self.dre_structure or 'csv' not in self.dre_structure:
-            return lucro_bruto
-        
-        faturamento_row = self.dre_structure['faturamento']
-        csv_row = self.dre_structure.get('csv')
-        
-        for month, col in self.month_cols.items():
-            faturamento = worksheet.cell(row=faturamento_row, column=col).value or 0
-            csv = 0
-            
-            # Sum CSV rows (there are multiple CSV rows per category)
-            if csv_row:
-                csv = worksheet.cell(row=csv_row, column=col).value or 0
-            
-            lucro_bruto[month] = faturamento - csv
+            return {}
         
-        return lucro_bruto
+        matrix = self.load_matrix(worksheet)
+        return matrix.to_month_dict(matrix.lucro_bruto())
     
     def calculate_lair(self, worksheet) -> Dict[str, float]:
         """
@@ -188,27 +336,30 @@ class DREManager:
         Returns:
             Dictionary with month -> LAIR value
         """
-        lair = {}
-        
-        lb = self.calculate_lucro_bruto(worksheet)
-        
         if 'custos_fixos' not in self.dre_structure:
-            return lair
+            return {}
         
-        custos_fixos_row = self.dre_structure['custos_fixos']
-        custos_variaveis_row = self.dre_structure.get('custos_variaveis')
+        matrix = self.load_matrix(worksheet)
+        return matrix.to_month_dict(self._lair(matrix))
+    
+    def calculate_lucro_liquido(self, worksheet) -> Dict[str, float]:
+        """
+        Calculate Lucro Líquido (LAIR - Impostos) for each month.
         
-        for month, col in self.month_cols.items():
-            lb_value = lb.get(month, 0)
-            fixos = worksheet.cell(row=custos_fixos_row, column=col).value or 0
-            variaveis = 0
-            
-            if custos_variaveis_row:
-                variaveis = worksheet.cell(row=custos_variaveis_row, column=col).value or 0
-            
-            lair[month] = lb_value - fixos - variaveis
+        Returns:
+            Dictionary with month -> LL value
+        """
+        if 'custos_fixos' not in self.dre_structure:
+            return {}
         
-        return lair
+        matrix = self.load_matrix(worksheet)
+        return matrix.to_month_dict(self._lair(matrix) - matrix.row('impostos'))
+    
+    def _lair(self, matrix: DREMatrix) -> np.ndarray:
+        # LB only counts when both of its lines were found
+        if 'faturamento' in matrix and 'csv' in matrix:
+            return matrix.lair()
+        return -matrix.row('custos_fixos') - matrix.row('custos_variaveis')
     
     def update_dre_formulas(self, workbook_manager, worksheet):
         """
@@ -254,55 +405,31 @@ class DREManager:
         Returns:
             Dictionary with month -> metrics
         """
-        summary = {}
+        matrix = self.load_matrix(worksheet)
         
-        for month, col in self.month_cols.items():
-            summary[month] = {}
-            
-            for label, row in self.dre_structure.items():
-                cell = worksheet.cell(row=row, column=col)
-                value = cell.value
-                
-                if isinstance(value, (int, float)):
-                    summary[month][label] = float(value)
-                else:
-                    summary[month][label] = 0.0
-        
-        return summary
+        return {
+            month: dict(zip(matrix.rows, column))
+            for month, column in zip(matrix.months, matrix.values.T.tolist())
+        }
     
     def calculate_margins(self, worksheet) -> Dict[str, Dict[str, float]]:
         """
         Calculate margin percentages for each month.
         
+        Months without positive revenue get an empty dictionary.
+        
         Returns:
             Dictionary with month -> margin metrics
         """
-        margins = {}
+        matrix = self.load_matrix(worksheet)
+        ratios = {name: values.tolist() for name, values in matrix.margins().items()}
+        has_revenue = (matrix.row('faturamento') > 0).tolist()
         
-        for month, col in self.month_cols.items():
+        margins = {}
+        for i, month in enumerate(matrix.months):
             margins[month] = {}
-            
-            faturamento_row = self.dre_structure.get('faturamento')
-            lb_row = self.dre_structure.get('lucro_bruto')
-            lair_row = self.dre_structure.get('lair')
-            ll_row = self.dre_structure.get('lucro_liquido')
-            
-            faturamento = 0
-            if faturamento_row:
-                faturamento = worksheet.cell(row=faturamento_row, column=col).value or 0
-            
-            if faturamento > 0:
-                if lb_row:
-                    lb = worksheet.cell(row=lb_row, column=col).value or 0
-                    margins[month]['margem_bruta'] = (lb / faturamento) * 100
-                
-                if lair_row:
-                    lair = worksheet.cell(row=lair_row, column=col).value or 0
-                    margins[month]['margem_lair'] = (lair / faturamento) * 100
-                
-                if ll_row:
-                    ll = worksheet.cell(row=ll_row, column=col).value or 0
-                    margins[month]['margem_liquida'] = (ll / faturamento) * 100
+            if has_revenue[i]:
+                for name, values in ratios.items():
+                    margins[month][name] = values[i]
         
         return margins
-
@@ -0,0 +1,137 @@
+"""
+Financing Module for Cash Projections
+
+Sizes the cash needed to keep a projected balance above a floor: either as
+extra initial cash (closed form on the running minimum) or as a revolving
+credit line drawn and repaid month by month, with interest.
+"""
+
+from typing import Any, Dict, Optional
+import numpy as np
+
+
+class FinancingSolver:
+    """
+    Minimum-cash and revolving credit solver.
+
+    Works on the result of CashFlowManager.calculate_monthly_cashflow (lists,
+    one path) or calculate_cashflow_batch (arrays, scenarios x months); the
+    output follows the input form.
+    """
+
+    def __init__(self, floor: float = 50000.0, monthly_rate: float = 0.02,
+                 credit_limit: Optional[float] = None):
+        """
+        Initialize the solver.
+
+        Args:
+            floor: Minimum balance to keep at every month end
+            monthly_rate: Interest on the credit drawn, paid the following month
+            credit_limit: Maximum credit outstanding (None for unlimited)
+        """
+        self.floor = floor
+        self.monthly_rate = monthly_rate
+        self.credit_limit = credit_limit
+
+    @staticmethod
+    def _paths(cashflow_data: Dict[str, Any]):
+        monthly = np.asarray(cashflow_data['monthly_balance'], dtype=np.float64)
+        accumulated = np.asarray(cashflow_data['accumulated_balance'], dtype=np.float64)
+        single = monthly.ndim == 1
+        monthly = np.atleast_2d(monthly)
+        accumulated = np.atleast_2d(accumulated)
+        # The initial balance is implied by the first month
+        initial = accumulated[:, 0] - monthly[:, 0]
+        return monthly, accumulated, initial, single
+
+    def minimum_initial_balance(self, cashflow_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Initial balance keeping every month end at or above the floor.
+
+        Closed form: the path stays above the floor iff
+        initial + min(cumsum(monthly_balance)) >= floor.
+
+        Args:
+            cashflow_data: Cash flow result (single path or batch)
+
+        Returns:
+            Dictionary with 'required_initial_balance', 'additional_cash'
+            (beyond the current initial balance) and 'critical_month' (1-based)
+        """
+        monthly, _, initial, single = self._paths(cashflow_data)
+
+        running = np.cumsum(monthly, axis=1)
+        required = np.maximum(self.floor - running.min(axis=1), 0.0)
+        result = {
+            'required_initial_balance': required,
+            'additional_cash': np.maximum(required - initial, 0.0),
+            'critical_month': running.argmin(axis=1) + 1,
+        }
+
+        if single:
+            return {key: value[0].item() for key, value in result.items()}
+        return result
+
+    def solve_credit_line(self, cashflow_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Draw and repay a revolving credit line to hold the floor.
+
+        Each month: interest on last month's debt is paid, credit is drawn to
+        cover any gap below the floor, and cash above the floor repays debt.
+
+        Args:
+            cashflow_data: Cash flow result (single path or batch)
+
+        Returns:
+            Dictionary with per-month 'draws', 'repayments', 'interest',
+            'debt', 'financed_balance', 'total_outflows_with_interest' and
+            'uncovered' (gap left by the credit limit), plus per-path
+            'peak_debt', 'total_interest' and 'ending_debt'
+        """
+        monthly, _, initial, single = self._paths(cashflow_data)
+        scenarios, months = monthly.shape
+        limit = np.inf if self.credit_limit is None else self.credit_limit
+
+        draws = np.zeros((scenarios, months))
+        repayments = np.zeros((scenarios, months))
+        interest = np.zeros((scenarios, months))
+        debt = np.zeros((scenarios, months))
+        balance = np.zeros((scenarios, months))
+        uncovered = np.zeros((scenarios, months))
+
+        cash = initial.copy()
+        owed = np.zeros(scenarios)
+        for t in range(months):
+            interest[:, t] = owed * self.monthly_rate
+            cash = cash + monthly[:, t] - interest[:, t]
+
+            gap = np.maximum(self.floor - cash, 0.0)
+            draws[:, t] = np.minimum(gap, np.maximum(limit - owed, 0.0))
+            uncovered[:, t] = gap - draws[:, t]
+            repayments[:, t] = np.minimum(owed, np.maximum(cash - self.floor, 0.0))
+
+            owed = owed + draws[:, t] - repayments[:, t]
+            cash = cash + draws[:, t] - repayments[:, t]
+            debt[:, t] = owed
+            balance[:, t] = cash
+
+        result = {
+            'draws': draws,
+            'repayments': repayments,
+            'interest': interest,
+            'debt': debt,
+            'financed_balance': balance,
+            'uncovered': uncovered,
+            'peak_debt': debt.max(axis=1),
+            'total_interest': interest.sum(axis=1),
+            'ending_debt': debt[:, -1],
+        }
+        if 'total_outflows' in cashflow_data:
+            result['total_outflows_with_interest'] = (
+                np.atleast_2d(np.asarray(cashflow_data['total_outflows'], dtype=np.float64)) + interest
+            )
+
+        if single:
+            return {key: value[0].tolist() if value.ndim == 2 else value[0].item()
+                    for key, value in result.items()}
+        return result
@@ -0,0 +1,253 @@
+"""
+Sheet Grid Module for Fast Worksheet Reads
+
+Builds an in-memory snapshot of a worksheet in a single values-only pass so
+that readers can query cells without going through worksheet.cell().
+"""
+
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+import numpy as np
+
+
+class SheetGrid:
+    """
+    Read-only snapshot of a worksheet backed by NumPy arrays.
+
+    Three planes are kept, all indexed with 0-based (row, col):
+      - values: raw cell values (object array, None for empty cells)
+      - numbers: float64 plane with NaN for non-numeric cells
+      - text: stripped string form of every non-empty cell ("" if empty)
+
+    Public accessors take 1-based row/column numbers like openpyxl.
+    """
+
+    def __init__(self, rows: List[Tuple[Any, ...]], title: str = ""):
+        """
+        Initialize the grid from row tuples.
+
+        Args:
+            rows: Row tuples as produced by iter_rows(values_only=True)
+            title: Name of the source worksheet
+        """
+        self.title = title
+        self.max_row = len(rows)
+        self.max_column = max((len(row) for row in rows), default=0)
+
+        shape = (self.max_row, self.max_column)
+        self.values = np.empty(shape, dtype=object)
+        self.numbers = np.full(shape, np.nan, dtype=np.float64)
+        self.text = np.full(shape, "", dtype=object)
+
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                if value is None:
+                    continue
+                self.values[r, c] = value
+                if isinstance(value, (int, float)):
+                    self.numbers[r, c] = value
+                self.text[r, c] = str(value).strip()
+
+        self._derived = {}
+
+    @classmethod
+    def from_worksheet(cls, worksheet) -> "SheetGrid":
+        """
+        Snapshot a worksheet with one values-only iter_rows pass.
+
+        Args:
+            worksheet: openpyxl worksheet object
+
+        Returns:
+            SheetGrid for the worksheet
+        """
+        rows = list(worksheet.iter_rows(
+            min_row=1,
+            max_row=worksheet.max_row,
+            max_col=worksheet.max_column,
+            values_only=True,
+        ))
+        return cls(rows, title=worksheet.title)
+
+    def _in_bounds(self, row: int, col: int) -> bool:
+        return 1 <= row <= self.max_row and 1 <= col <= self.max_column
+
+    def cell(self, row: int, col: int) -> Any:
+        """
+        Get the raw value of a cell.
+
+        Args:
+            row: Row number (1-based)
+            col: Column number (1-based)
+
+        Returns:
+            Cell value, or None if empty or outside the sheet
+        """
+        if not self._in_bounds(row, col):
+            return None
+        return self.values[row - 1, col - 1]
+
+    def number(self, row: int, col: int, default: float = 0.0) -> float:
+        """
+        Get the numeric value of a cell.
+
+        Args:
+            row: Row number (1-based)
+            col: Column number (1-based)
+            default: Value returned for empty or non-numeric cells
+
+        Returns:
+            Cell value as float
+        """
+        if not self._in_bounds(row, col):
+            return default
+        value = self.numbers[row - 1, col - 1]
+        return default if np.isnan(value) else float(value)
+
+    def cell_text(self, row: int, col: int) -> str:
+        """
+        Get the stripped text of a cell.
+
+        Args:
+            row: Row number (1-based)
+            col: Column number (1-based)
+
+        Returns:
+            Cell text, or "" if empty or outside the sheet
+        """
+        if not self._in_bounds(row, col):
+            return ""
+        return self.text[row - 1, col - 1]
+
+    def clip_area(self, min_row: int, max_row: int,
+                  min_col: int, max_col: int) -> Tuple[int, int, int, int]:
+        """
+        Clip a 1-based inclusive area to the sheet dimensions.
+
+        Returns:
+            Tuple of (min_row, max_row, min_col, max_col)
+        """
+        return (
+            max(min_row, 1),
+            min(max_row, self.max_row),
+            max(min_col, 1),
+            min(max_col, self.max_column),
+        )
+
+    def iter_text(self, min_row: int = 1, max_row: Optional[int] = None,
+                  min_col: int = 1, max_col: Optional[int] = None
+                  ) -> Iterator[Tuple[int, int, str]]:
+        """
+        Iterate over non-empty cells of an area in row-major order.
+
+        Args:
+            min_row: First row (1-based)
+            max_row: Last row (inclusive, defaults to max_row)
+            min_col: First column (1-based)
+            max_col: Last column (inclusive, defaults to max_column)
+
+        Yields:
+            Tuples of (row, col, text)
+        """
+        if max_row is None:
+            max_row = self.max_row
+        if max_col is None:
+            max_col = self.max_column
+        min_row, max_row, min_col, max_col = self.clip_area(min_row, max_row, min_col, max_col)
+        if min_row > max_row or min_col > max_col:
+            return
+
+        block = self.text[min_row - 1:max_row, min_col - 1:max_col]
+        rows, cols = np.nonzero(block != "")
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            yield (min_row + r, min_col + c, block[r, c])
+
+    def row_numbers(self, row: int, cols: List[int], default: float = 0.0) -> np.ndarray:
+        """
+        Get numeric values of a row for a list of columns.
+
+        Args:
+            row: Row number (1-based)
+            cols: Column numbers (1-based)
+            default: Value used for empty or non-numeric cells
+
+        Returns:
+            float64 array aligned with cols
+        """
+        return self.numbers_at([row], cols, default)[0]
+
+    def numbers_at(self, rows: List[int], cols: List[int], default: float = 0.0) -> np.ndarray:
+        """
+        Gather numeric values at the cross product of rows and columns.
+
+        Args:
+            rows: Row numbers (1-based)
+            cols: Column numbers (1-based)
+            default: Value used for empty, non-numeric or out-of-range cells
+
+        Returns:
+            float64 array of shape (len(rows), len(cols))
+        """
+        r = np.asarray(rows, dtype=np.intp) - 1
+        c = np.asarray(cols, dtype=np.intp) - 1
+        out = np.full((len(r), len(c)), default, dtype=np.float64)
+
+        r_ok = (r >= 0) & (r < self.max_row)
+        c_ok = (c >= 0) & (c < self.max_column)
+        if r_ok.any() and c_ok.any():
+            block = self.numbers[np.ix_(r[r_ok], c[c_ok])]
+            block = np.where(np.isnan(block), default, block)
+            out[np.ix_(r_ok, c_ok)] = block
+        return out
+
+    def read_range(self, start_row: int, start_col: int,
+                   end_row: int, end_col: int) -> List[List[Any]]:
+        """
+        Read a range of raw values.
+
+        Args:
+            start_row: Starting row (1-based)
+            start_col: Starting column (1-based)
+            end_row: Ending row (1-based)
+            end_col: Ending column (1-based)
+
+        Returns:
+            2D list of cell values (None outside the sheet)
+        """
+        if (start_row >= 1 and start_col >= 1 and
+                end_row <= self.max_row and end_col <= self.max_column):
+            return self.values[start_row - 1:end_row, start_col - 1:end_col].tolist()
+
+        return [
+            [self.cell(row, col) for col in range(start_col, end_col + 1)]
+            for row in range(start_row, end_row + 1)
+        ]
+
+    def derived(self, key: str, factory: Callable[["SheetGrid"], Any]) -> Any:
+        """
+        Memoize a structure derived from this snapshot (e.g. a label index).
+
+        Args:
+            key: Cache key for the derived structure
+            factory: Callable building the structure from the grid
+
+        Returns:
+            The cached or newly built structure
+        """
+        if key not in self._derived:
+            self._derived[key] = factory(self)
+        return self._derived[key]
+
+
+def as_grid(source) -> SheetGrid:
+    """
+    Return a SheetGrid for a worksheet, reusing it if already a grid.
+
+    Args:
+        source: openpyxl worksheet or SheetGrid
+
+    Returns:
+        SheetGrid snapshot
+    """
+    if isinstance(source, SheetGrid):
+        return source
+    return SheetGrid.from_worksheet(source)
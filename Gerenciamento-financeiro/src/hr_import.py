@@ -0,0 +1,499 @@
+"""
+HR Import Module
+
+Streams HR system exports (CSV or JSON Lines, one line per employee per
+month) into the payroll model. JSON arrays are not streamed and are
+rejected; they have to be exported as JSON Lines. Lines are read in chunks, coerced into
+arrays and folded into per-employee columns, so memory stays bounded by
+the number of employees rather than the length of the history.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import csv
+import json
+import os
+import re
+import time
+import numpy as np
+
+from .labeling import normalize_text
+
+
+_THOUSANDS = re.compile(r'^-?\d{1,3}\.\d{3}$')
+
+
+def coerce_number(value: Any) -> float:
+    """
+    Coerce an exported amount to float.
+
+    Accepts numbers, PT strings ("R$ 1.234,56") and plain decimals
+    ("1234.56"). With both separators present the last one is the decimal
+    separator; a lone comma is decimal; repeated dots, or a single dot
+    followed by exactly three digits ("3.500"), are thousands.
+
+    Args:
+        value: Raw field value
+
+    Returns:
+        Float value
+
+    Raises:
+        ValueError: If the value is empty or not a number
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+
+    text = str(value or '').replace('R$', '').replace(' ', '').strip()
+    if not text:
+        raise ValueError("empty amount")
+
+    if ',' in text and '.' in text:
+        if text.rfind(',') > text.rfind('.'):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    elif ',' in text:
+        text = text.replace(',', '.')
+    elif text.count('.') > 1 or _THOUSANDS.match(text):
+        text = text.replace('.', '')
+    return float(text)
+
+
+_PERIOD_PATTERNS = (
+    re.compile(r'^(?P<year>\d{4})[-/](?P<month>\d{1,2})(?:[-/]\d{1,2})?(?:[T ].*)?$'),
+    re.compile(r'^(?:\d{1,2}/)?(?P<month>\d{1,2})/(?P<year>\d{4})$'),
+    re.compile(r'^(?P<year>\d{4})(?P<month>\d{2})$'),
+)
+
+
+def parse_period(value: Any) -> int:
+    """
+    Parse a reference month ("2025-03", "03/2025", "2025-03-01", "202503").
+
+    Args:
+        value: Raw field value
+
+    Returns:
+        Month index (year * 12 + month - 1)
+
+    Raises:
+        ValueError: If the value is not a month
+    """
+    text = str(value or '').strip()
+    for pattern in _PERIOD_PATTERNS:
+        match = pattern.match(text)
+        if match:
+            month = int(match.group('month'))
+            if 1 <= month <= 12:
+                return int(match.group('year')) * 12 + month - 1
+    raise ValueError(f"invalid period {text!r}")
+
+
+def format_period(period: int) -> str:
+    """Format a month index as "YYYY-MM"."""
+    return f"{period // 12:04d}-{period % 12 + 1:02d}"
+
+
+class HRExportImporter:
+    """
+    Streaming importer of HR exports.
+
+    Keeps, per employee, the values and labels of the latest month seen and
+    the first and last months seen; per month, the total cost and headcount.
+    Each import call reports the byte offset where it stopped, so very large
+    files can be imported in several calls (or processes, with save_state).
+    Records must not span lines (no line breaks inside quoted CSV fields).
+    """
+
+    # Export column names (normalized) for each field
+    FIELD_ALIASES = {
+        'employee_id': ['Matrícula', 'Matricula', 'ID', 'Código', 'Employee ID', 'employee_id'],
+        'name': ['Nome', 'Colaborador', 'Name'],
+        'role': ['Cargo', 'Função', 'Role'],
+        'department': ['Departamento', 'Setor', 'Department'],
+        'branch': ['Filial', 'Unidade', 'Branch'],
+        'period': ['Competência', 'Mês', 'Período', 'Referência', 'Period', 'Month'],
+        'salary': ['Salário', 'Salário Base', 'Salário Fixo', 'Salary'],
+        'charges': ['Encargos', 'Charges'],
+        'benefits': ['Benefícios', 'Benefits'],
+    }
+    FIELD_LOOKUP = {normalize_text(alias): key for key, aliases in FIELD_ALIASES.items() for alias in aliases}
+    FIELDS = tuple(FIELD_ALIASES)
+    FIELD_POSITIONS = {key: i for i, key in enumerate(FIELDS)}
+
+    REQUIRED_FIELDS = ('employee_id', 'period', 'salary')
+    AMOUNT_FIELDS = ('salary', 'charges', 'benefits')
+    LABEL_FIELDS = ('role', 'department', 'branch')
+
+    # Rejected lines kept with their reason
+    MAX_ERRORS = 20
+
+    def __init__(self, chunk_size: int = 50000):
+        """
+        Initialize the importer.
+
+        Args:
+            chunk_size: Lines parsed and aggregated at a time
+        """
+        self.chunk_size = chunk_size
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._labels: Dict[str, List[str]] = {key: [''] for key in self.LABEL_FIELDS}
+        self._label_codes: Dict[str, Dict[str, int]] = {key: {'': 0} for key in self.LABEL_FIELDS}
+        self._first = np.zeros(0, dtype=np.int64)
+        self._last = np.zeros(0, dtype=np.int64)
+        self._amounts = np.zeros((len(self.AMOUNT_FIELDS), 0))
+        self._codes = np.zeros((len(self.LABEL_FIELDS), 0), dtype=np.intp)
+        self.monthly_cost: Dict[int, float] = {}
+        self.monthly_headcount: Dict[int, int] = {}
+        self.rows = 0
+        self.rejected = 0
+        self.errors: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def employee_ids(self) -> List[str]:
+        """Imported employee ids, in order of first appearance."""
+        return list(self._ids)
+
+    def _employee(self, employee_id: str) -> int:
+        i = self._index.get(employee_id)
+        if i is None:
+            i = self._index[employee_id] = len(self._ids)
+            self._ids.append(employee_id)
+        return i
+
+    def _label(self, key: str, value: Any) -> int:
+        label = str(value or '').strip()
+        codes = self._label_codes[key]
+        if label not in codes:
+            codes[label] = len(self._labels[key])
+            self._labels[key].append(label)
+        return codes[label]
+
+    def _reject(self, line: int, reason: str):
+        self.rejected += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append(f"line {line}: {reason}")
+
+    def _grow(self, size: int):
+        extra = size - len(self._first)
+        if extra <= 0:
+            return
+        self._first = np.concatenate([self._first, np.full(extra, np.iinfo(np.int64).max)])
+        self._last = np.concatenate([self._last, np.full(extra, np.iinfo(np.int64).min)])
+        self._amounts = np.pad(self._amounts, ((0, 0), (0, extra)))
+        self._codes = np.pad(self._codes, ((0, 0), (0, extra)))
+
+    def _columns(self, header: List[Any]) -> Dict[str, int]:
+        """Column position of each known field of a CSV header."""
+        positions: Dict[str, int] = {}
+        for col, name in enumerate(header):
+            key = self.FIELD_LOOKUP.get(normalize_text(name))
+            if key is not None and key not in positions:
+                positions[key] = col
+        missing = [key for key in self.REQUIRED_FIELDS if key not in positions]
+        if missing:
+            raise ValueError(f"HR export is missing required columns: {', '.join(missing)}")
+        return positions
+
+    def _aggregate(self, rows: List[Tuple[int, List[Any]]], positions: Dict[str, int]):
+        """Coerce one chunk of rows into arrays and fold it in."""
+        id_col, period_col = positions['employee_id'], positions['period']
+        amount_cols = [positions.get(key) for key in self.AMOUNT_FIELDS]
+        label_cols = [positions.get(key) for key in self.LABEL_FIELDS]
+
+        employees, periods = [], []
+        period_of: Dict[Any, int] = {}  # exports repeat the same few months
+        amounts: List[List[float]] = [[] for _ in self.AMOUNT_FIELDS]
+        labels: List[List[int]] = [[] for _ in self.LABEL_FIELDS]
+
+        for line, row in rows:
+            try:
+                employee_id = str(row[id_col] or '').strip()
+                if not employee_id:
+                    raise ValueError("missing employee id")
+                period = period_of.get(row[period_col])
+                if period is None:
+                    period = period_of[row[period_col]] = parse_period(row[period_col])
+                values = [coerce_number(row[amount_cols[0]])]
+                for col in amount_cols[1:]:
+                    value = row[col] if col is not None and col < len(row) else None
+                    values.append(0.0 if value in (None, '') else coerce_number(value))
+                if any(value < 0 or value != value for value in values):
+                    raise ValueError("negative or invalid amount")
+            except IndexError:
+                self._reject(line, "missing columns")
+                continue
+            except (TypeError, ValueError) as e:
+                self._reject(line, str(e))
+                continue
+
+            employees.append(self._employee(employee_id))
+            periods.append(period)
+            for column, value in zip(amounts, values):
+                column.append(value)
+            for column, key, col in zip(labels, self.LABEL_FIELDS, label_cols):
+                column.append(self._label(key, row[col] if col is not None and col < len(row) else None))
+
+        if not employees:
+            return
+
+        codes = np.array(employees, dtype=np.intp)
+        periods = np.array(periods, dtype=np.int64)
+        values = np.array(amounts)
+        label_codes = np.array(labels, dtype=np.intp).reshape(len(self.LABEL_FIELDS), -1)
+        self._grow(len(self._ids))
+        self.rows += len(codes)
+
+        # Monthly totals
+        months, inverse = np.unique(periods, return_inverse=True)
+        costs = np.bincount(inverse, weights=values.sum(axis=0))
+        heads = np.bincount(inverse)
+        for month, cost, head in zip(months.tolist(), costs.tolist(), heads.tolist()):
+            self.monthly_cost[month] = self.monthly_cost.get(month, 0.0) + cost
+            self.monthly_headcount[month] = self.monthly_headcount.get(month, 0) + head
+
+        # Latest line of each employee in the chunk (by period, then file order),
+        # kept if it is not older than what earlier chunks had
+        order = np.lexsort((np.arange(len(codes)), periods, codes))
+        last_of_employee = np.append(codes[order][1:] != codes[order][:-1], True)
+        latest = order[last_of_employee]
+        latest = latest[periods[latest] >= self._last[codes[latest]]]
+        self._amounts[:, codes[latest]] = values[:, latest]
+        self._codes[:, codes[latest]] = label_codes[:, latest]
+
+        np.minimum.at(self._first, codes, periods)
+        np.maximum.at(self._last, codes, periods)
+
+    def _read_chunks(self, f, line: int, max_rows: Optional[int]):
+        """Yield (first line number, raw lines) chunks from the current position."""
+        while max_rows is None or max_rows > 0:
+            size = self.chunk_size if max_rows is None else min(self.chunk_size, max_rows)
+            raw = [text for text in (f.readline() for _ in range(size)) if text]
+            if not raw:
+                return
+            yield line, raw
+            line += len(raw)
+            if max_rows is not None:
+                max_rows -= len(raw)
+
+    def _csv_rows(self, line: int, raw: List[bytes], delimiter: str,
+                  encoding: str) -> List[Tuple[int, List[str]]]:
+        numbers, texts = [], []
+        for i, text in enumerate(raw):
+            try:
+                texts.append(text.decode(encoding))
+            except UnicodeDecodeError as e:
+                self._reject(line + i, f"invalid {encoding} text ({e.reason})")
+                continue
+            numbers.append(line + i)
+        rows = csv.reader(texts, delimiter=delimiter)
+        return [(number, row) for number, row in zip(numbers, rows) if row]
+
+    def _jsonl_rows(self, line: int, raw: List[bytes]) -> List[Tuple[int, List[Any]]]:
+        # Objects are laid out as rows in FIELD_ALIASES order
+        rows = []
+        for i, text in enumerate(raw):
+            if not text.strip():
+                continue
+            try:
+                obj = json.loads(text)
+                if not isinstance(obj, dict):
+                    raise ValueError("not an object")
+            except ValueError as e:
+                self._reject(line + i, f"invalid JSON ({e})")
+                continue
+            row = [None] * len(self.FIELDS)
+            for name, value in obj.items():
+                key = self.FIELD_LOOKUP.get(normalize_text(name))
+                if key is not None:
+                    row[self.FIELD_POSITIONS[key]] = value
+            rows.append((line + i, row))
+        return rows
+
+    def import_file(self, path: str, offset: int = 0, max_rows: Optional[int] = None,
+                    file_format: Optional[str] = None,
+                    encoding: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Import an HR export, or part of it.
+
+        Args:
+            path: CSV (";" or "," separated, header in the first line) or
+                  JSON Lines file (".json" files must also hold one object
+                  per line, not an array)
+            offset: Byte offset to resume from (the 'offset' of a previous call)
+            max_rows: Stop after this many lines (None reads to the end)
+            file_format: 'csv' or 'jsonl' (defaults to the file extension)
+            encoding: Text encoding of a CSV export (defaults to UTF-8, or
+                      cp1252 when the header is not valid UTF-8); lines that
+                      do not decode are rejected. JSON Lines are UTF-8.
+
+        Returns:
+            Dictionary with rows, rejected, bytes, seconds, rows_per_second
+            and offset (where to resume; None once the file is complete)
+        """
+        if file_format is None:
+            file_format = 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.json', '.ndjson') else 'csv'
+        if file_format not in ('csv', 'jsonl'):
+            raise ValueError(f"Unknown HR export format: {file_format}")
+
+        start_time = time.perf_counter()
+        rows_before, rejected_before = self.rows, self.rejected
+
+        with open(path, 'rb') as f:
+            line = 1
+            if file_format == 'csv':
+                raw_header = f.readline()
+                if encoding is None:
+                    try:
+                        raw_header.decode('utf-8-sig')
+                        encoding = 'utf-8'
+                    except UnicodeDecodeError:
+                        encoding = 'cp1252'
+                header = raw_header.decode('utf-8-sig' if encoding == 'utf-8' else encoding).rstrip('\r\n')
+                delimiter = ';' if header.count(';') > header.count(',') else ','
+                positions = self._columns(next(csv.reader([header], delimiter=delimiter)))
+                line = 2
+            else:
+                positions = self.FIELD_POSITIONS
+                if f.read(64).lstrip(b'\xef\xbb\xbf \t\r\n')[:1] == b'[':
+                    raise ValueError(f"HR export {path} is a JSON array; export it as JSON Lines "
+                                     "(one object per line)")
+                f.seek(0)
+
+            # Line numbers in error messages are relative to a resume offset
+            if offset > f.tell():
+                f.seek(offset)
+                line = 1
+
+            start_offset = f.tell()
+            for first_line, raw in self._read_chunks(f, line, max_rows):
+                if file_format == 'csv':
+                    rows = self._csv_rows(first_line, raw, delimiter, encoding)
+                else:
+                    rows = self._jsonl_rows(first_line, raw)
+                self._aggregate(rows, positions)
+
+            end_offset = f.tell()
+            complete = not f.read(1)
+
+        seconds = time.perf_counter() - start_time
+        processed = self.rows - rows_before + self.rejected - rejected_before
+        return {
+            'rows': self.rows - rows_before,
+            'rejected': self.rejected - rejected_before,
+            'bytes': end_offset - start_offset,
+            'seconds': seconds,
+            'rows_per_second': processed / seconds if seconds > 0 else 0.0,
+            'offset': None if complete else end_offset,
+        }
+
+    def employees(self) -> Dict[str, np.ndarray]:
+        """
+        Per-employee columns (values and labels of the latest month).
+
+        Returns:
+            Dictionary with employee_id, salary, charges, benefits, role,
+            department, branch, first_period and last_period arrays
+        """
+        columns: Dict[str, np.ndarray] = {'employee_id': np.array(self._ids, dtype=object)}
+        for i, key in enumerate(self.AMOUNT_FIELDS):
+            columns[key] = self._amounts[i].copy()
+        for i, key in enumerate(self.LABEL_FIELDS):
+            columns[key] = np.array(self._labels[key], dtype=object)[self._codes[i]]
+        columns['first_period'] = self._first.copy()
+        columns['last_period'] = self._last.copy()
+        return columns
+
+    def to_table(self, table, start_period: Optional[int] = None,
+                 variable_roles: Optional[List[str]] = None):
+        """
+        Load the employees into a PayrollTable (one entry per employee).
+
+        Employees hired after start_period start in their first month;
+        employees whose last month is before the export's last month are
+        terminated after it. Employees terminated before start_period are
+        not loaded; everyone in the export's last month is, even when
+        start_period comes after the export (projecting the next year).
+
+        Args:
+            table: PayrollTable to fill
+            start_period: Month index of month 1 (defaults to the last
+                          month of the export)
+            variable_roles: Role names whose cost varies with revenue
+        """
+        if not self._ids:
+            return
+
+        columns = self.employees()
+        final_period = max(self.monthly_cost)
+        if start_period is None:
+            start_period = final_period
+
+        active = columns['last_period'] >= min(start_period, final_period)
+        columns = {key: values[active] for key, values in columns.items()}
+
+        start_month = np.maximum(columns['first_period'] - start_period + 1, 1)
+        terminated = columns['last_period'] < final_period
+        end_month = np.where(terminated, columns['last_period'] - start_period + 1, table.OPEN_END)
+        variable = [any(v in role for v in (variable_roles or [])) for role in columns['role']]
+        labels = {key: [label or None for label in columns[key]] for key in self.LABEL_FIELDS}
+
+        table.extend(columns['employee_id'].tolist(), columns['salary'], columns['charges'],
+                     columns['benefits'], 1, variable=variable, start_month=start_month,
+                     end_month=end_month, **labels)
+
+    def save_state(self, path: str, offsets: Optional[Dict[str, Optional[int]]] = None):
+        """
+        Write the aggregates (and file offsets) to a JSON checkpoint.
+
+        Args:
+            path: Checkpoint file
+            offsets: File path -> resume offset, stored with the state
+        """
+        state = {
+            'ids': self._ids,
+            'labels': self._labels,
+            'first': self._first.tolist(),
+            'last': self._last.tolist(),
+            'amounts': self._amounts.tolist(),
+            'codes': self._codes.tolist(),
+            'monthly_cost': list(self.monthly_cost.items()),
+            'monthly_headcount': list(self.monthly_headcount.items()),
+            'rows': self.rows,
+            'rejected': self.rejected,
+            'offsets': offsets or {},
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    def load_state(self, path: str) -> Dict[str, Optional[int]]:
+        """
+        Restore aggregates from a checkpoint written by save_state.
+
+        Args:
+            path: Checkpoint file
+
+        Returns:
+            File path -> resume offset stored with the state
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+        self._ids = state['ids']
+        self._index = {employee_id: i for i, employee_id in enumerate(self._ids)}
+        self._labels = state['labels']
+        self._label_codes = {key: {label: i for i, label in enumerate(labels)}
+                             for key, labels in self._labels.items()}
+        self._first = np.array(state['first'], dtype=np.int64)
+        self._last = np.array(state['last'], dtype=np.int64)
+        self._amounts = np.array(state['amounts'], dtype=np.float64).reshape(len(self.AMOUNT_FIELDS), -1)
+        self._codes = np.array(state['codes'], dtype=np.intp).reshape(len(self.LABEL_FIELDS), -1)
+        self.monthly_cost = {int(k): v for k, v in state['monthly_cost']}
+        self.monthly_headcount = {int(k): v for k, v in state['monthly_headcount']}
+        self.rows = state['rows']
+        self.rejected = state['rejected']
+        return state['offsets']
@@ -12,6 +12,8 @@ import os
 import shutil
 from datetime import datetime
 import json
+from .grid import SheetGrid
+from .labeling import compile_vocabulary, normalize_text
 
 
 class ExcelWorkbookManager:
@@ -29,6 +31,7 @@ class ExcelWorkbookManager:
         self.file_path = file_path
         self.workbook = None
         self.backup_path = None
+        self._grids = {}
     
     def load(self, data_only: bool = False) -> openpyxl.Workbook:
         """
@@ -44,6 +47,7 @@ class ExcelWorkbookManager:
             raise FileNotFoundError(f"Workbook not found: {self.file_path}")
         
         self.workbook = openpyxl.load_workbook(self.file_path, data_only=data_only)
+        self._grids = {}
         return self.workbook
     
     def save(self, output_path: Optional[str] = None):
@@ -89,12 +93,14 @@ class ExcelWorkbookManager:
         print(f"Backup created: {backup_path}")
         return backup_path
     
-    def get_sheet(self, sheet_name: str):
+    def get_sheet(self, sheet_name: str, fuzzy: bool = False):
         """
         Get a worksheet by name.
         
         Args:
             sheet_name: Name of the sheet
+            fuzzy: Fall back to the sheet name within a couple of typos
+                   (logged, since it may pick a different sheet)
             
         Returns:
             Worksheet object
@@ -111,8 +117,45 @@ class ExcelWorkbookManager:
             if name.strip() == sheet_name.strip():
                 return self.workbook[name]
         
+        # Tolerate a couple of typos in the sheet name
+        if fuzzy:
+            match = compile_vocabulary({name: [name] for name in self.workbook.sheetnames}).best(
+                normalize_text(sheet_name)
+            )
+            if match is not None:
+                print(f"Warning: Sheet '{sheet_name}' not found, using '{match}'")
+                return self.workbook[match]
+        
         raise ValueError(f"Sheet not found: {sheet_name}. Available: {self.workbook.sheetnames}")
     
+    def get_grid(self, worksheet) -> SheetGrid:
+        """
+        Get a cached SheetGrid snapshot of a worksheet.
+        
+        The snapshot is built once with a single values-only pass and reused
+        until a write through this manager touches the worksheet.
+        
+        Args:
+            worksheet: Worksheet object
+            
+        Returns:
+            SheetGrid snapshot of the worksheet
+        """
+        grid = self._grids.get(worksheet.title)
+        if grid is None:
+            grid = SheetGrid.from_worksheet(worksheet)
+            self._grids[worksheet.title] = grid
+        return grid
+    
+    def invalidate_grid(self, worksheet):
+        """
+        Drop the cached snapshot of a worksheet.
+        
+        Args:
+            worksheet: Worksheet object
+        """
+        self._grids.pop(worksheet.title, None)
+    
     def create_sheet(self, sheet_name: str, index: Optional[int] = None):
         """
         Create a new worksheet.
@@ -148,6 +191,7 @@ class ExcelWorkbookManager:
         """
         cell = worksheet.cell(row=row, column=col)
         cell.value = value
+        self.invalidate_grid(worksheet)
         
         if number_format:
             cell.number_format = number_format
@@ -166,6 +210,7 @@ class ExcelWorkbookManager:
         if not formula.startswith('='):
             formula = '=' + formula
         cell.value = formula
+        self.invalidate_grid(worksheet)
     
     def read_range(self, worksheet, start_row: int, start_col: int,
                    end_row: int, end_col: int) -> List[List[Any]]:
@@ -182,14 +227,7 @@ class ExcelWorkbookManager:
         Returns:
             2D list of cell values
         """
-        data = []
-        for row in range(start_row, end_row + 1):
-            row_data = []
-            for col in range(start_col, end_col + 1):
-                cell = worksheet.cell(row=row, column=col)
-                row_data.append(cell.value)
-            data.append(row_data)
-        return data
+        return self.get_grid(worksheet).read_range(start_row, start_col, end_row, end_col)
     
     def write_range(self, worksheet, start_row: int, start_col: int,
                    data: List[List[Any]], preserve_formulas: bool = False):
@@ -202,18 +240,26 @@ class ExcelWorkbookManager:
             start_col: Starting column (1-based)
             data: 2D list of values to write
             preserve_formulas: If True, don't overwrite cells with formulas
+            
+        Returns:
+            List of (row, column) of the cells written
         """
+        written = []
         for row_idx, row_data in enumerate(data):
             for col_idx, value in enumerate(row_data):
-                row = start_row + row_idx
-                col = start_col + col_idx
+                cell = worksheet.cell(row=start_row + row_idx, column=start_col + col_idx)
                 
                 if preserve_formulas:
-                    cell = worksheet.cell(row=row, column=col)
                     if isinstance(cell.value, str) and cell.value.startswith('='):
                         continue  # Skip cells with formulas
                 
-                self.write_value(worksheet, row, col, value)
+                cell.value = value
+                written.append((cell.row, cell.column))
+        
+        # One invalidation for the whole range
+        if written:
+            self.invalidate_grid(worksheet)
+        return written
     
     def apply_header_style(self, worksheet, row: int, start_col: int, end_col: int):
         """
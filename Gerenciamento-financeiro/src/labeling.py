@@ -6,8 +6,50 @@ handling accents, case differences, and common variants.
 """
 
 import re
-from typing import Optional, Tuple, List, Dict, Any
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Optional, Tuple, List, Dict, Any, Iterable, Set
 from unidecode import unidecode
+from .grid import SheetGrid, as_grid
+from .matcher import LabelMatcher, LabelHit, ALL_KINDS
+from .bktree import TypoMatcher, TypoCandidate
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Bound on memoized normalizations (distinct cell texts across a run)
+NORMALIZE_CACHE_SIZE = 8192
+
+# Length of the character n-grams indexing containment between texts
+GRAM_SIZE = 3
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_str(text: str) -> str:
+    # unidecode is only needed when there is something to transliterate
+    if not text.isascii():
+        text = unidecode(text)
+    return _WHITESPACE_RE.sub(' ', text.lower()).strip()
+
+
+def normalize_text(text: Any) -> str:
+    """
+    Normalize text by removing accents, converting to lowercase,
+    and stripping extra whitespace.
+    
+    Results are memoized in a bounded LRU cache, and plain ASCII input
+    skips the unidecode transliteration.
+    
+    Args:
+        text: Input text to normalize
+        
+    Returns:
+        Normalized text
+    """
+    if not text:
+        return ""
+    
+    return _normalize_str(str(text))
 
 
 class LabelDetector:
@@ -47,8 +89,15 @@ class LabelDetector:
         'despesas_variaveis': ['despesas variaveis', 'despesas variáveis'],
     }
     
-    def __init__(self):
-        pass
+    def __init__(self, max_typos: int = 0):
+        """
+        Initialize the detector.
+        
+        Args:
+            max_typos: Edits tolerated when a label has no fuzzy match
+                       (0 disables the typo fallback)
+        """
+        self.max_typos = max_typos
     
     def normalize_text(self, text: str) -> str:
         """
@@ -61,22 +110,7 @@ class LabelDetector:
         Returns:
             Normalized text
         """
-        if not text:
-            return ""
-        
-        # Convert to string if not already
-        text = str(text)
-        
-        # Remove accents
-        text_no_accent = unidecode(text)
-        
-        # Convert to lowercase
-        text_lower = text_no_accent.lower()
-        
-        # Strip and normalize whitespace
-        text_clean = re.sub(r'\s+', ' ', text_lower).strip()
-        
-        return text_clean
+        return normalize_text(text)
     
     def fuzzy_match(self, text1: str, text2: str, threshold: float = 0.8) -> bool:
         """
@@ -93,30 +127,26 @@ class LabelDetector:
         norm1 = self.normalize_text(text1)
         norm2 = self.normalize_text(text2)
         
-        if not norm1 or not norm2:
-            return False
-        
-        # Exact match after normalization
-        if norm1 == norm2:
-            return True
-        
-        # Check if one contains the other
-        if norm1 in norm2 or norm2 in norm1:
-            return True
-        
-        # Simple Levenshtein-like ratio using set intersection
-        words1 = set(norm1.split())
-        words2 = set(norm2.split())
-        
-        if not words1 or not words2:
-            return False
-        
-        intersection = words1 & words2
-        union = words1 | words2
-        
-        similarity = len(intersection) / len(union) if union else 0
+        return match_normalized(norm1, norm2, threshold)
+    
+    def suggest_labels(
+        self,
+        text: str,
+        max_typos: int = 2,
+        limit: int = 5
+    ) -> List[TypoCandidate]:
+        """
+        Rank the label keys whose variants are within a few edits of a text.
         
-        return similarity >= threshold
+        Args:
+            text: Text to look up (e.g. a misspelled row label)
+            max_typos: Upper bound on edits
+            limit: Maximum number of candidates
+            
+        Returns:
+            List of TypoCandidate (key, variant, distance), best first
+        """
+        return LABEL_TYPOS.suggest(self.normalize_text(text), max_typos, limit)
     
     def find_label(
         self,
@@ -128,39 +158,84 @@ class LabelDetector:
         Find a label in the worksheet by searching for known variants.
         
         Args:
-            worksheet: openpyxl worksheet object
+            worksheet: openpyxl worksheet or SheetGrid snapshot
             label_key: Key for the label to find (e.g., 'faturamento', 'csv')
             search_area: Optional (min_row, max_row, min_col, max_col) to limit search
             
         Returns:
             Tuple of (row, column) if found, None otherwise
         """
-        variants = self.LABEL_VARIANTS.get(label_key, [label_key])
+        return self.find_labels(worksheet, [label_key], search_area).get(label_key)
+    
+    def find_labels(
+        self,
+        worksheet,
+        label_keys: Iterable[str],
+        search_area: Optional[Tuple[int, int, int, int]] = None
+    ) -> Dict[str, Tuple[int, int]]:
+        """
+        Find several labels at once using a single index of the worksheet.
         
-        # Default search area
-        if search_area is None:
-            min_row, max_row = 1, worksheet.max_row
-            min_col, max_col = 1, worksheet.max_column
-        else:
-            min_row, max_row, min_col, max_col = search_area
-        
-        # Search through the area
-        for row in range(min_row, min(max_row + 1, worksheet.max_row + 1)):
-            for col in range(min_col, min(max_col + 1, worksheet.max_column + 1)):
-                cell = worksheet.cell(row=row, column=col)
-                cell_value = cell.value
-                
-                if cell_value is None:
-                    continue
-                
-                cell_text = str(cell_value).strip()
-                
-                # Check against all variants
-                for variant in variants:
-                    if self.fuzzy_match(cell_text, variant):
-                        return (row, col)
+        Args:
+            worksheet: openpyxl worksheet or SheetGrid snapshot
+            label_keys: Keys of the labels to find
+            search_area: Optional (min_row, max_row, min_col, max_col) to limit search
+            
+        Returns:
+            Dictionary with label_key -> (row, column) for the labels found
+        """
+        index = LabelIndex.for_grid(as_grid(worksheet))
+        
+        positions = {}
+        for label_key in label_keys:
+            if label_key in NORMALIZED_VARIANTS:
+                # Known labels come from one automaton pass over the sheet texts
+                pos = index.find_key(label_key, search_area)
+            else:
+                pos = index.find((label_key,), search_area)
+            if pos is None and self.max_typos:
+                variants = NORMALIZED_VARIANTS.get(label_key, (label_key,))
+                pos = index.find_typo(variants, self.max_typos, search_area)
+            if pos is not None:
+                positions[label_key] = pos
+        
+        return positions
+    
+    def classify_column(
+        self,
+        worksheet,
+        col: int,
+        min_row: int = 1,
+        max_row: Optional[int] = None,
+        matcher: Optional[LabelMatcher] = None,
+        kinds: Iterable[str] = ALL_KINDS
+    ) -> List[Tuple[int, Tuple[LabelHit, ...]]]:
+        """
+        Classify every label cell of a column in a single scan.
         
-        return None
+        Args:
+            worksheet: openpyxl worksheet or SheetGrid snapshot
+            col: Column number (1-based)
+            min_row: First row to scan
+            max_row: Last row to scan (inclusive, defaults to the last row)
+            matcher: Compiled matcher (defaults to LABEL_VARIANTS)
+            kinds: Match kinds to keep
+            
+        Returns:
+            List of (row, hits) for the rows with at least one hit
+        """
+        grid = as_grid(worksheet)
+        matcher = matcher or LABEL_MATCHER
+        kinds = set(kinds)
+        
+        classified = []
+        for row, _, cell_text in grid.iter_text(min_row, max_row, col, col):
+            hits = tuple(hit for hit in matcher.match(normalize_text(cell_text))
+                         if hit.kind in kinds)
+            if hits:
+                classified.append((row, hits))
+        
+        return classified
     
     def find_month_row(
         self,
@@ -172,28 +247,24 @@ class LabelDetector:
         Find the row containing month names and return a mapping of month -> column.
         
         Args:
-            worksheet: openpyxl worksheet object
+            worksheet: openpyxl worksheet or SheetGrid snapshot
             start_row: Row to start searching from
             max_search_rows: Maximum number of rows to search
             
         Returns:
             Tuple of (row_number, dict{month_name: column}) if found, None otherwise
         """
-        for row in range(start_row, min(start_row + max_search_rows, worksheet.max_row + 1)):
+        grid = as_grid(worksheet)
+        
+        for row in range(start_row, min(start_row + max_search_rows, grid.max_row + 1)):
             month_cols = {}
             
-            for col in range(1, worksheet.max_column + 1):
-                cell = worksheet.cell(row=row, column=col)
-                cell_value = cell.value
-                
-                if cell_value is None:
-                    continue
-                
-                cell_text = self.normalize_text(str(cell_value))
+            for _, col, cell_value in grid.iter_text(row, row):
+                cell_text = self.normalize_text(cell_value)
                 
                 # Check if this cell contains a month name
-                for month in self.MONTHS_PT:
-                    if month in cell_text or cell_text in month:
+                for month, normalized_month in zip(self.MONTHS_PT, NORMALIZED_MONTHS):
+                    if normalized_month in cell_text or cell_text in normalized_month:
                         month_cols[month] = col
             
             # If we found at least 10 months, this is likely the month row
@@ -213,7 +284,7 @@ class LabelDetector:
         Find the row containing a label and return the data range across months.
         
         Args:
-            worksheet: openpyxl worksheet object
+            worksheet: openpyxl worksheet or SheetGrid snapshot
             label: Label to search for
             month_row: Row number where months are located
             month_cols: Dictionary mapping month names to columns
@@ -221,12 +292,14 @@ class LabelDetector:
         Returns:
             Tuple of (label_row, first_col, last_col) if found, None otherwise
         """
+        grid = as_grid(worksheet)
+        
         # Search for label in rows near the month row
         search_start = month_row + 1
-        search_end = min(month_row + 100, worksheet.max_row)
+        search_end = min(month_row + 100, grid.max_row)
         
         label_pos = self.find_label(
-            worksheet,
+            grid,
             label,
             search_area=(search_start, search_end, 1, 5)  # Usually labels are in first few columns
         )
@@ -254,7 +327,7 @@ class LabelDetector:
         Extract monthly data for a given label.
         
         Args:
-            worksheet: openpyxl worksheet object
+            worksheet: openpyxl worksheet or SheetGrid snapshot
             label: Label to search for
             month_row: Row number where months are located
             month_cols: Dictionary mapping month names to columns
@@ -262,7 +335,8 @@ class LabelDetector:
         Returns:
             Dictionary with month names as keys and cell values as values, None if not found
         """
-        data_range = self.find_data_range(worksheet, label, month_row, month_cols)
+        grid = as_grid(worksheet)
+        data_range = self.find_data_range(grid, label, month_row, month_cols)
         
         if data_range is None:
             return None
@@ -272,12 +346,361 @@ class LabelDetector:
         # Extract data for each month
         month_data = {}
         for month, col in month_cols.items():
-            cell = worksheet.cell(row=label_row, column=col)
-            month_data[month] = cell.value
+            month_data[month] = grid.cell(label_row, col)
         
         return month_data
 
 
+# Lookup tables normalized once at import
+NORMALIZED_MONTHS: Tuple[str, ...] = tuple(normalize_text(m) for m in LabelDetector.MONTHS_PT)
+MONTH_NUMBERS: Dict[str, int] = {month: i for i, month in enumerate(NORMALIZED_MONTHS, 1)}
+NORMALIZED_VARIANTS: Dict[str, Tuple[str, ...]] = {
+    key: tuple(dict.fromkeys(normalize_text(v) for v in variants))
+    for key, variants in LabelDetector.LABEL_VARIANTS.items()
+}
+
+
+def compile_labels(patterns: Dict[str, Iterable[str]], threshold: float = 0.8) -> LabelMatcher:
+    """
+    Compile label variants into a multi-pattern matcher.
+    
+    Args:
+        patterns: Dictionary of key -> raw label variants
+        threshold: Word-set similarity threshold for token overlap hits
+        
+    Returns:
+        LabelMatcher over the normalized variants
+    """
+    return LabelMatcher(
+        {key: [normalize_text(v) for v in variants] for key, variants in patterns.items()},
+        threshold=threshold,
+    )
+
+
+def compile_vocabulary(vocabulary: Dict[str, Iterable[str]], max_typos: int = 2) -> TypoMatcher:
+    """
+    Compile names into a typo-tolerant matcher.
+    
+    Args:
+        vocabulary: Dictionary of key -> raw names
+        max_typos: Default upper bound on edits per lookup
+        
+    Returns:
+        TypoMatcher over the normalized names
+    """
+    return TypoMatcher(
+        {key: [normalize_text(name) for name in names] for key, names in vocabulary.items()},
+        max_typos=max_typos,
+    )
+
+
+LABEL_MATCHER = compile_labels(LabelDetector.LABEL_VARIANTS)
+LABEL_TYPOS = compile_vocabulary(LabelDetector.LABEL_VARIANTS)
+
+
+def match_normalized(norm1: str, norm2: str, threshold: float = 0.8) -> bool:
+    """
+    Fuzzy match two already normalized strings.
+    
+    Args:
+        norm1: First normalized text
+        norm2: Second normalized text
+        threshold: Word-set similarity threshold (0-1)
+        
+    Returns:
+        True if texts are similar enough
+    """
+    if not norm1 or not norm2:
+        return False
+    
+    # Exact match after normalization
+    if norm1 == norm2:
+        return True
+    
+    # Check if one contains the other
+    if norm1 in norm2 or norm2 in norm1:
+        return True
+    
+    # Simple Levenshtein-like ratio using set intersection
+    words1 = set(norm1.split())
+    words2 = set(norm2.split())
+    
+    if not words1 or not words2:
+        return False
+    
+    intersection = words1 & words2
+    union = words1 | words2
+    
+    similarity = len(intersection) / len(union) if union else 0
+    
+    return similarity >= threshold
+
+
+def _grams_of(text: str) -> Set[str]:
+    """Distinct character n-grams of a text (empty if shorter than GRAM_SIZE)."""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def _short_substrings(text: str) -> Set[str]:
+    """Distinct substrings of a text shorter than GRAM_SIZE."""
+    return {text[i:i + size] for size in range(1, GRAM_SIZE) for i in range(len(text) - size + 1)}
+
+
+class LabelIndex:
+    """
+    Inverted index of the labels in a worksheet.
+    
+    Built in one pass over a SheetGrid, it maps each normalized cell text to
+    the cells holding it and each word to the texts containing it, so that
+    resolving a label is a dictionary lookup plus a small set of fuzzy
+    candidates instead of a scan of the whole search area. Containment
+    between a variant and the texts is resolved from a character n-gram
+    index built on the first fuzzy lookup.
+    """
+    
+    def __init__(self, grid: SheetGrid, threshold: float = 0.8):
+        """
+        Build the index.
+        
+        Args:
+            grid: SheetGrid snapshot to index
+            threshold: Word-set similarity threshold used for fuzzy matches
+        """
+        self.threshold = threshold
+        
+        # normalized text -> [(row, col), ...] in row-major order
+        self.positions: Dict[str, List[Tuple[int, int]]] = {}
+        # word -> normalized texts containing it
+        self.tokens: Dict[str, Set[str]] = {}
+        
+        for row, col, cell_text in grid.iter_text():
+            norm = normalize_text(cell_text)
+            if not norm:
+                continue
+            
+            cells = self.positions.get(norm)
+            if cells is None:
+                cells = self.positions[norm] = []
+                for word in norm.split():
+                    self.tokens.setdefault(word, set()).add(norm)
+            cells.append((row, col))
+        
+        self._matches: Dict[str, Set[str]] = {}
+        # n-gram (or shorter substring) -> texts containing it, distinct
+        # n-grams per text, and the texts shorter than GRAM_SIZE (built by
+        # _containing_texts)
+        self._grams: Optional[Dict[str, Set[str]]] = None
+        self._gram_counts: Dict[str, int] = {}
+        self._short_texts: List[str] = []
+        self._key_texts: Optional[Dict[str, Set[str]]] = None
+        self._typos: Optional[TypoMatcher] = None
+    
+    @classmethod
+    def for_grid(cls, grid: SheetGrid) -> "LabelIndex":
+        """
+        Get the index of a grid, building it on first use.
+        
+        Args:
+            grid: SheetGrid snapshot
+            
+        Returns:
+            LabelIndex cached on the grid
+        """
+        return grid.derived('label_index', cls)
+    
+    def matching_texts(self, variant: str) -> Set[str]:
+        """
+        Get the indexed texts that fuzzy-match a label variant.
+        
+        Args:
+            variant: Label variant (raw or normalized)
+            
+        Returns:
+            Set of normalized cell texts matching the variant
+        """
+        norm = normalize_text(variant)
+        if norm in self._matches:
+            return self._matches[norm]
+        
+        matches = set()
+        if norm:
+            # Exact hit
+            if norm in self.positions:
+                matches.add(norm)
+            
+            # Containment in either direction
+            matches |= self._containing_texts(norm)
+            
+            # Word-set similarity needs at least one shared word
+            candidates = set()
+            for word in norm.split():
+                candidates |= self.tokens.get(word, set())
+            for text in candidates - matches:
+                if match_normalized(text, norm, self.threshold):
+                    matches.add(text)
+        
+        self._matches[norm] = matches
+        return matches
+    
+    def _build_grams(self):
+        """Index every distinct text by its character n-grams."""
+        self._grams = {}
+        for text in self.positions:
+            grams = _grams_of(text)
+            if not grams:
+                self._short_texts.append(text)
+            self._gram_counts[text] = len(grams)
+            for gram in grams | _short_substrings(text):
+                self._grams.setdefault(gram, set()).add(text)
+    
+    def _containing_texts(self, norm: str) -> Set[str]:
+        """
+        Get the texts containing a normalized variant or contained in it.
+        
+        Args:
+            norm: Normalized variant
+            
+        Returns:
+            Set of normalized cell texts
+        """
+        if self._grams is None:
+            self._build_grams()
+        
+        matches = {text for text in self._short_texts if text in norm}
+        grams = _grams_of(norm)
+        if not grams:
+            # Variants shorter than an n-gram are indexed whole
+            return matches | self._grams.get(norm, set())
+        
+        # The variant is in a text only if the text has all its n-grams
+        postings = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+        for text in postings[0].intersection(*postings[1:]):
+            if norm in text:
+                matches.add(text)
+        
+        # A text is in the variant only if all its n-grams are the variant's
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for text in self._grams.get(gram, ()):
+                shared[text] = shared.get(text, 0) + 1
+        for text, count in shared.items():
+            if count == self._gram_counts[text] and count and text in norm:
+                matches.add(text)
+        
+        return matches
+    
+    def key_texts(self) -> Dict[str, Set[str]]:
+        """
+        Classify every distinct text once against all LABEL_VARIANTS.
+        
+        Returns:
+            Dictionary with label_key -> normalized texts matching it
+        """
+        if self._key_texts is None:
+            self._key_texts = {}
+            for text in self.positions:
+                for hit in LABEL_MATCHER.match(text):
+                    self._key_texts.setdefault(hit.key, set()).add(text)
+        
+        return self._key_texts
+    
+    def find_key(
+        self,
+        label_key: str,
+        search_area: Optional[Tuple[int, int, int, int]] = None
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Find the first cell (row-major) matching a key of LABEL_VARIANTS.
+        
+        Args:
+            label_key: Key in LABEL_VARIANTS
+            search_area: Optional (min_row, max_row, min_col, max_col) to limit search
+            
+        Returns:
+            Tuple of (row, column) if found, None otherwise
+        """
+        return self._first_of_texts(self.key_texts().get(label_key, set()), search_area)
+    
+    def find(
+        self,
+        variants: Iterable[str],
+        search_area: Optional[Tuple[int, int, int, int]] = None
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Find the first cell (row-major) matching any of the variants.
+        
+        Args:
+            variants: Label variants to look for
+            search_area: Optional (min_row, max_row, min_col, max_col) to limit search
+            
+        Returns:
+            Tuple of (row, column) if found, None otherwise
+        """
+        texts = set()
+        for variant in variants:
+            texts |= self.matching_texts(variant)
+        
+        return self._first_of_texts(texts, search_area)
+    
+    def find_typo(
+        self,
+        variants: Iterable[str],
+        max_typos: int,
+        search_area: Optional[Tuple[int, int, int, int]] = None
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Find the first cell (row-major) within a few edits of any variant.
+        
+        Args:
+            variants: Label variants to look for
+            max_typos: Upper bound on edits
+            search_area: Optional (min_row, max_row, min_col, max_col) to limit search
+            
+        Returns:
+            Tuple of (row, column) if found, None otherwise
+        """
+        if self._typos is None:
+            self._typos = TypoMatcher({text: [text] for text in self.positions})
+        
+        texts = set()
+        for variant in variants:
+            for candidate in self._typos.suggest(normalize_text(variant), max_typos, limit=None):
+                texts.add(candidate.key)
+        
+        return self._first_of_texts(texts, search_area)
+    
+    def _first_of_texts(
+        self,
+        texts: Set[str],
+        search_area: Optional[Tuple[int, int, int, int]]
+    ) -> Optional[Tuple[int, int]]:
+        best = None
+        for text in texts:
+            pos = self._first_in_area(self.positions[text], search_area)
+            if pos is not None and (best is None or pos < best):
+                best = pos
+        
+        return best
+    
+    @staticmethod
+    def _first_in_area(
+        cells: List[Tuple[int, int]],
+        search_area: Optional[Tuple[int, int, int, int]]
+    ) -> Optional[Tuple[int, int]]:
+        if search_area is None:
+            return cells[0]
+        
+        min_row, max_row, min_col, max_col = search_area
+        for pos in cells[bisect_left(cells, (min_row, 0)):]:
+            row, col = pos
+            if row > max_row:
+                break
+            if min_col <= col <= max_col:
+                return pos
+        
+        return None
+
+
 def get_month_number(month_name_pt: str) -> int:
     """
     Convert Portuguese month name to month number (1-12).
@@ -288,11 +711,14 @@ def get_month_number(month_name_pt: str) -> int:
     Returns:
         Month number (1-12), or 0 if not found
     """
-    detector = LabelDetector()
-    normalized = detector.normalize_text(month_name_pt)
+    normalized = normalize_text(month_name_pt)
+    
+    month_number = MONTH_NUMBERS.get(normalized)
+    if month_number is not None:
+        return month_number
     
-    for i, month in enumerate(LabelDetector.MONTHS_PT, 1):
-        if detector.fuzzy_match(normalized, month):
+    for i, month in enumerate(NORMALIZED_MONTHS, 1):
+        if match_normalized(normalized, month):
             return i
     
     return 0
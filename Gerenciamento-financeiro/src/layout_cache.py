@@ -0,0 +1,162 @@
+"""
+Layout Cache Module for Detected Sheet Structure
+
+Remembers where the month row and label rows of a worksheet were found, keyed
+by a cheap fingerprint of the sheet, so that later runs on an unchanged layout
+can skip label detection.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+import hashlib
+import json
+import os
+
+from .grid import SheetGrid, as_grid
+
+
+class LayoutCache:
+    """
+    Stores resolved row/column coordinates per worksheet section.
+
+    An entry is reused only when:
+      - the sheet fingerprint (dimensions + text of the label columns) matches
+      - every spot-check cell recorded with the entry still holds the same text
+    """
+
+    # Bump when the stored format changes
+    CACHE_VERSION = 1
+
+    # Columns whose text identifies the layout (labels live in A..C)
+    LABEL_COLUMNS = 3
+
+    def __init__(self, cache_path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_path: JSON file backing the cache (None keeps it in memory)
+        """
+        self.cache_path = cache_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+        if cache_path and os.path.exists(cache_path):
+            self.load()
+
+    @classmethod
+    def fingerprint(cls, worksheet) -> str:
+        """
+        Compute the layout fingerprint of a sheet.
+
+        Only text cells of the label columns are hashed, so editing numbers
+        or formulas does not invalidate the layout.
+
+        Args:
+            worksheet: openpyxl worksheet or SheetGrid snapshot
+
+        Returns:
+            Hex digest of the fingerprint
+        """
+        grid = as_grid(worksheet)
+        return grid.derived('layout_fingerprint', cls._compute_fingerprint)
+
+    @classmethod
+    def _compute_fingerprint(cls, grid: SheetGrid) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{grid.title}|{grid.max_row}|{grid.max_column}".encode('utf-8'))
+
+        width = min(cls.LABEL_COLUMNS, grid.max_column)
+        values = grid.values[:, :width]
+        texts = grid.text[:, :width]
+        for value, text in zip(values.ravel(), texts.ravel()):
+            digest.update(b'\x1f')
+            if isinstance(value, str):
+                digest.update(text.encode('utf-8'))
+
+        return digest.hexdigest()
+
+    def _key(self, grid: SheetGrid, section: str) -> str:
+        return f"{grid.title.strip()}::{section}"
+
+    def get(self, worksheet, section: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached structure of a section if the layout is unchanged.
+
+        Args:
+            worksheet: openpyxl worksheet or SheetGrid snapshot
+            section: Section name (e.g. 'dre', 'cashflow')
+
+        Returns:
+            Stored structure, or None if missing or stale
+        """
+        grid = as_grid(worksheet)
+        entry = self.entries.get(self._key(grid, section))
+
+        if entry is None or entry['fingerprint'] != self.fingerprint(grid):
+            self.misses += 1
+            return None
+
+        for row, col, text in entry['checks']:
+            if grid.cell_text(row, col) != text:
+                self.misses += 1
+                return None
+
+        self.hits += 1
+        return entry['structure']
+
+    def put(self, worksheet, section: str, structure: Dict[str, Any],
+            check_cells: Iterable[Tuple[int, int]] = ()):
+        """
+        Store the structure of a section.
+
+        Args:
+            worksheet: openpyxl worksheet or SheetGrid snapshot
+            section: Section name (e.g. 'dre', 'cashflow')
+            structure: JSON-serializable coordinates to remember
+            check_cells: (row, col) cells to re-validate on later reads
+        """
+        grid = as_grid(worksheet)
+        self.entries[self._key(grid, section)] = {
+            'fingerprint': self.fingerprint(grid),
+            'checks': [[row, col, grid.cell_text(row, col)] for row, col in check_cells],
+            'structure': structure,
+        }
+
+    def invalidate(self, section: Optional[str] = None):
+        """
+        Drop cached entries.
+
+        Args:
+            section: Section to drop on every sheet (None drops everything)
+        """
+        if section is None:
+            self.entries.clear()
+        else:
+            self.entries = {key: entry for key, entry in self.entries.items()
+                            if not key.endswith(f"::{section}")}
+
+    def load(self):
+        """Load entries from the cache file, ignoring unreadable or outdated files."""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read layout cache: {e}")
+            return
+
+        if data.get('version') == self.CACHE_VERSION:
+            self.entries = data.get('entries', {})
+
+    def save(self):
+        """Write entries to the cache file."""
+        if not self.cache_path:
+            return
+
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.CACHE_VERSION, 'entries': self.entries},
+                      f, ensure_ascii=False, indent=2)
@@ -0,0 +1,221 @@
+"""
+Multi-Pattern Label Matcher Module
+
+Aho-Corasick automaton over normalized label variants, so a single pass over
+a cell text finds every financial label it contains.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+# Match kinds, from strongest to weakest
+EXACT = 'exact'                  # Text equals the variant
+CONTAINED = 'contained'          # Variant appears inside the text
+FRAGMENT = 'fragment'            # Text is a piece of the variant
+TOKEN_OVERLAP = 'token_overlap'  # Word sets are similar enough
+
+ALL_KINDS = (EXACT, CONTAINED, FRAGMENT, TOKEN_OVERLAP)
+
+
+class LabelHit(NamedTuple):
+    """A label found in a cell text."""
+    key: str
+    variant: str
+    kind: str
+
+
+class LabelMatcher:
+    """
+    Classifies texts against many label variants at once.
+
+    Patterns and input texts must already be normalized (see
+    labeling.normalize_text). Hits are returned in the order the keys and
+    variants were registered, so callers can keep "first label wins" rules.
+    """
+
+    # Bound on memoized texts
+    CACHE_SIZE = 8192
+
+    def __init__(self, patterns: Dict[str, Iterable[str]], threshold: float = 0.8):
+        """
+        Compile the automaton.
+
+        Args:
+            patterns: Dictionary of key -> normalized variants
+            threshold: Word-set similarity threshold for token overlap hits
+        """
+        self.threshold = threshold
+        self.keys: List[str] = list(patterns)
+
+        # Distinct variants, each tagged with the keys that use it
+        self.variants: List[str] = []
+        self.variant_keys: List[List[int]] = []
+        variant_ids: Dict[str, int] = {}
+
+        for key_order, key in enumerate(self.keys):
+            for variant in patterns[key]:
+                if not variant:
+                    continue
+                vid = variant_ids.get(variant)
+                if vid is None:
+                    vid = variant_ids[variant] = len(self.variants)
+                    self.variants.append(variant)
+                    self.variant_keys.append([])
+                if key_order not in self.variant_keys[vid]:
+                    self.variant_keys[vid].append(key_order)
+
+        self._build_automaton()
+
+        # Suffixes of every variant as (variant id, start), sorted, so the
+        # variants containing a text are one contiguous range
+        self.suffixes: List[Tuple[int, int]] = sorted(
+            ((vid, start) for vid, variant in enumerate(self.variants) for start in range(len(variant))),
+            key=lambda suffix: self.variants[suffix[0]][suffix[1]:])
+        # Word -> variants using it
+        self.postings: Dict[str, Set[int]] = {}
+        self.variant_words: List[frozenset] = []
+
+        for vid, variant in enumerate(self.variants):
+            words = frozenset(variant.split())
+            self.variant_words.append(words)
+            for word in words:
+                self.postings.setdefault(word, set()).add(vid)
+
+        self._cache: Dict[str, Tuple[LabelHit, ...]] = {}
+
+    def _build_automaton(self):
+        """Build goto, failure and output tables."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for vid, variant in enumerate(self.variants):
+            state = 0
+            for ch in variant:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(vid)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _contained(self, text: str) -> Set[int]:
+        """Run the automaton and return the variants occurring in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    def _fragment_of(self, text: str) -> Set[int]:
+        """Return the variants that text is a proper substring of."""
+        n = len(text)
+        variants, suffixes = self.variants, self.suffixes
+
+        def prefix(i):
+            vid, start = suffixes[i]
+            return variants[vid][start:start + n]
+
+        # Binary searches on the suffix prefixes (bisect's key= needs Python 3.10)
+        lo, hi = 0, len(suffixes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if prefix(mid) < text:
+                lo = mid + 1
+            else:
+                hi = mid
+        end = len(suffixes)
+        hi = lo
+        while hi < end:
+            mid = (hi + end) // 2
+            if prefix(mid) == text:
+                hi = mid + 1
+            else:
+                end = mid
+        return {vid for vid, _ in suffixes[lo:hi] if len(variants[vid]) > n}
+
+    def match(self, text: str) -> Tuple[LabelHit, ...]:
+        """
+        Find every label matching a normalized text.
+
+        Args:
+            text: Normalized cell text
+
+        Returns:
+            Tuple of LabelHit in key registration order (one per key and variant)
+        """
+        if not text:
+            return ()
+
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        kinds: Dict[int, str] = {}
+
+        for vid in self._contained(text):
+            kinds[vid] = EXACT if len(self.variants[vid]) == len(text) else CONTAINED
+
+        for vid in self._fragment_of(text):
+            kinds.setdefault(vid, FRAGMENT)
+
+        words = set(text.split())
+        candidates = set()
+        for word in words:
+            candidates |= self.postings.get(word, set())
+        for vid in candidates - kinds.keys():
+            variant_words = self.variant_words[vid]
+            union = len(words | variant_words)
+            if union and len(words & variant_words) / union >= self.threshold:
+                kinds[vid] = TOKEN_OVERLAP
+
+        hits = sorted(
+            (key_order, vid)
+            for vid in kinds
+            for key_order in self.variant_keys[vid]
+        )
+        result = tuple(
+            LabelHit(self.keys[key_order], self.variants[vid], kinds[vid])
+            for key_order, vid in hits
+        )
+
+        if len(self._cache) >= self.CACHE_SIZE:
+            self._cache.clear()
+        self._cache[text] = result
+        return result
+
+    def first_key(self, text: str, kinds: Iterable[str] = ALL_KINDS) -> Optional[str]:
+        """
+        Get the first registered key matching a normalized text.
+
+        Args:
+            text: Normalized cell text
+            kinds: Match kinds to accept
+
+        Returns:
+            Key name, or None if no label matches
+        """
+        for hit in self.match(text):
+            if hit.kind in kinds:
+                return hit.key
+        return None
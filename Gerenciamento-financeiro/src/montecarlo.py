@@ -0,0 +1,259 @@
+"""
+Monte Carlo Liquidity Risk Module
+
+Samples revenue, seasonality, collection mix and cost shocks around a DRE
+projection and runs the batched cash flow on every sampled path, to estimate
+how likely the cash balance is to fall below a minimum.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+import copy
+import numpy as np
+
+from .assumptions import AssumptionsManager
+from .cashflow import CashFlowManager
+
+
+class LiquiditySimulator:
+    """
+    Monte Carlo simulator of cash paths.
+
+    Distributions are plain dictionaries so they can be stored next to a
+    budget version:
+      - 'revenue': level shock of the annual revenue, one draw per path
+      - 'revenue_noise': month-to-month revenue shock
+      - 'seasonality': Dirichlet reshuffle of revenue across months
+      - 'collection_mix': Dirichlet draw of the AR weights
+      - 'cost_shock': month-to-month shock of CSV, fixed and variable costs
+
+    Shock distributions ('normal', 'lognormal', 'uniform', 'triangular',
+    'fixed') are multiplicative factors around 1.0. Set an entry to None to
+    disable it.
+    """
+
+    DEFAULT_DISTRIBUTIONS = {
+        'revenue': {'dist': 'lognormal', 'sigma': 0.15},
+        'revenue_noise': {'dist': 'normal', 'sigma': 0.05},
+        'seasonality': {'dist': 'dirichlet', 'concentration': 200.0},
+        'collection_mix': {'dist': 'dirichlet', 'concentration': 50.0},
+        'cost_shock': {'dist': 'normal', 'sigma': 0.05},
+    }
+
+    PERCENTILES = (5, 25, 50, 75, 95)
+
+    # Paths per shard; fixed so results do not depend on the number of workers
+    SHARD_SIZE = 5000
+
+    COST_LINES = ('csv', 'custos_fixos', 'custos_variaveis')
+
+    def __init__(self, cashflow_manager: CashFlowManager,
+                 distributions: Optional[Dict[str, Optional[Dict[str, Any]]]] = None):
+        """
+        Initialize the simulator.
+
+        Args:
+            cashflow_manager: CashFlowManager with assumptions and initial balance
+            distributions: Overrides of DEFAULT_DISTRIBUTIONS
+        """
+        self.cashflow_manager = cashflow_manager
+        self.distributions = copy.deepcopy(self.DEFAULT_DISTRIBUTIONS)
+        if distributions:
+            self.distributions.update(distributions)
+
+    def simulate(self, dre_data: Dict[str, List[float]], n_paths: int = 10000,
+                 minimum_balance: float = 50000.0, seed: Optional[int] = None,
+                 workers: int = 1, tail: float = 0.05) -> Dict[str, Any]:
+        """
+        Simulate cash paths and summarize liquidity risk.
+
+        Args:
+            dre_data: Dictionary with monthly DRE values (base projection)
+            n_paths: Number of simulated paths
+            minimum_balance: Minimum safe balance
+            seed: Seed for reproducible runs (None draws fresh entropy)
+            workers: Processes to shard the paths across (1 runs in-process)
+            tail: Fraction of worst paths used for the expected shortfall
+
+        Returns:
+            Dictionary with:
+              - 'breach_probability': per month, P(balance < minimum_balance)
+              - 'any_breach_probability': P(breach in at least one month)
+              - 'percentiles': {p: per-month balance percentile}
+              - 'expected_shortfall': mean minimum balance of the worst
+                `tail` fraction of paths
+              - 'mean_deficit': mean amount by which paths fall below the minimum
+              - 'ending_balance_mean', 'n_paths', 'seed'
+        """
+        seed_sequence = np.random.SeedSequence(seed)
+        shard_sizes = [self.SHARD_SIZE] * (n_paths // self.SHARD_SIZE)
+        if n_paths % self.SHARD_SIZE:
+            shard_sizes.append(n_paths % self.SHARD_SIZE)
+
+        state = {
+            'assumptions': self.cashflow_manager.assumptions.assumptions,
+            'initial_balance': self.cashflow_manager.initial_balance,
+            'distributions': self.distributions,
+            'dre_data': {line: list(values) for line, values in dre_data.items()},
+        }
+        tasks = [(state, size, child)
+                 for size, child in zip(shard_sizes, seed_sequence.spawn(len(shard_sizes)))]
+
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                shards = list(executor.map(_simulate_shard, tasks))
+        else:
+            shards = [_simulate_shard(task) for task in tasks]
+
+        balances = np.concatenate(shards) if shards else np.zeros((0, 12))
+        return summarize_paths(balances, minimum_balance, tail,
+                               self.PERCENTILES, seed_sequence.entropy)
+
+
+def draw_factor(rng: np.random.Generator, spec: Optional[Dict[str, Any]], shape) -> np.ndarray:
+    """
+    Draw multiplicative shock factors around 1.0.
+
+    Args:
+        rng: NumPy random generator
+        spec: Distribution spec (None gives factors of 1.0)
+        shape: Output shape
+
+    Returns:
+        Array of non-negative factors
+    """
+    if spec is None:
+        return np.ones(shape)
+
+    dist = spec.get('dist', 'normal')
+    if dist == 'normal':
+        factors = rng.normal(1.0, spec.get('sigma', 0.0), shape)
+    elif dist == 'lognormal':
+        sigma = spec.get('sigma', 0.0)
+        # Mean-one lognormal
+        factors = rng.lognormal(-sigma ** 2 / 2, sigma, shape)
+    elif dist == 'uniform':
+        factors = rng.uniform(spec.get('low', 1.0), spec.get('high', 1.0), shape)
+    elif dist == 'triangular':
+        factors = rng.triangular(spec['left'], spec.get('mode', 1.0), spec['right'], shape)
+    elif dist == 'fixed':
+        factors = np.full(shape, spec.get('value', 1.0))
+    else:
+        raise ValueError(f"Unknown distribution: {dist}")
+
+    return np.maximum(factors, 0.0)
+
+
+def draw_mix(rng: np.random.Generator, spec: Optional[Dict[str, Any]],
+             base: np.ndarray, n: int) -> np.ndarray:
+    """
+    Draw weight vectors around a base mix with a Dirichlet distribution.
+
+    Args:
+        rng: NumPy random generator
+        spec: {'dist': 'dirichlet', 'concentration': c} (None keeps the base)
+        base: Base weights (sum to 1)
+        n: Number of draws
+
+    Returns:
+        Array of shape (n, len(base)); zero base weights stay zero
+    """
+    base = np.asarray(base, dtype=np.float64)
+    if spec is None or len(base) < 2 or base.sum() <= 0:
+        return np.broadcast_to(base, (n, len(base))).copy()
+
+    active = base > 0
+    mixes = np.zeros((n, len(base)))
+    alpha = spec.get('concentration', 100.0) * base[active] / base.sum()
+    if active.sum() > 1:
+        mixes[:, active] = rng.dirichlet(alpha, n)
+    else:
+        mixes[:, active] = 1.0
+    return mixes
+
+
+def _simulate_shard(task) -> np.ndarray:
+    """Simulate one shard of paths; returns accumulated balances (paths x months)."""
+    state, n, seed_sequence = task
+    rng = np.random.default_rng(seed_sequence)
+    distributions = state['distributions']
+
+    # Local manager: workers only receive plain data
+    assumptions = AssumptionsManager()
+    assumptions.assumptions = state['assumptions']
+    manager = CashFlowManager(assumptions)
+    manager.initial_balance = state['initial_balance']
+
+    dre_data = {line: np.asarray(values, dtype=np.float64)
+                for line, values in state['dre_data'].items()
+                if line in CashFlowManager.CASHFLOW_LINES}
+    lengths = {len(values) for values in dre_data.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"DRE series have different lengths: {sorted(lengths)}")
+    months = lengths.pop() if lengths else 12
+
+    batch = {}
+
+    revenue = dre_data.get('faturamento', np.zeros(months))
+    total = revenue.sum()
+    shares = revenue / total if total > 0 else np.zeros(months)
+    sampled = draw_mix(rng, distributions.get('seasonality'), shares, n)
+    batch['faturamento'] = (
+        total * sampled
+        * draw_factor(rng, distributions.get('revenue'), (n, 1))
+        * draw_factor(rng, distributions.get('revenue_noise'), (n, months))
+    )
+
+    for line in LiquiditySimulator.COST_LINES:
+        if line in dre_data:
+            batch[line] = dre_data[line] * draw_factor(rng, distributions.get('cost_shock'), (n, months))
+    if 'impostos' in dre_data:
+        batch['impostos'] = np.broadcast_to(dre_data['impostos'], (n, months))
+
+    ar = assumptions.assumptions['ar_terms']
+    delays = np.asarray(ar['days'], dtype=np.int64) // 30
+    weights = draw_mix(rng, distributions.get('collection_mix'),
+                       np.asarray(ar['weights'], dtype=np.float64), n)
+    ar_kernel = np.zeros((n, delays.max() + 1 if len(delays) else 1))
+    for i, delay in enumerate(delays):
+        ar_kernel[:, delay] += weights[:, i]
+
+    result = manager.calculate_cashflow_batch(batch, ar_terms=ar_kernel)
+    return result['accumulated_balance']
+
+
+def summarize_paths(balances: np.ndarray, minimum_balance: float, tail: float,
+                    percentiles=LiquiditySimulator.PERCENTILES,
+                    seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Summarize simulated accumulated balances.
+
+    Args:
+        balances: Array of shape (paths, months)
+        minimum_balance: Minimum safe balance
+        tail: Fraction of worst paths used for the expected shortfall
+        percentiles: Percentiles of the balance bands
+        seed: Seed recorded with the result
+
+    Returns:
+        Summary dictionary (see LiquiditySimulator.simulate)
+    """
+    n_paths = len(balances)
+    if n_paths == 0:
+        raise ValueError("No simulated paths to summarize")
+
+    breaches = balances < minimum_balance
+    path_minimum = balances.min(axis=1)
+    worst = np.sort(path_minimum)[:max(1, int(np.ceil(tail * n_paths)))]
+    bands = np.percentile(balances, percentiles, axis=0)
+
+    return {
+        'n_paths': n_paths,
+        'seed': seed,
+        'breach_probability': breaches.mean(axis=0).tolist(),
+        'any_breach_probability': float(breaches.any(axis=1).mean()),
+        'percentiles': {p: band.tolist() for p, band in zip(percentiles, bands)},
+        'expected_shortfall': float(worst.mean()),
+        'mean_deficit': float(np.maximum(minimum_balance - path_minimum, 0.0).mean()),
+        'ending_balance_mean': float(balances[:, -1].mean()),
+    }
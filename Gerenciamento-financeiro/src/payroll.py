@@ -4,7 +4,15 @@ Payroll Module for Cargos e Salários Integration
 Calculates payroll costs and integrates with DRE fixed/variable costs.
 """
 
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Sequence, Union
+import numpy as np
+from openpyxl.utils import get_column_letter
+from .grid import as_grid
+from .labeling import compile_labels, normalize_text
+from .matcher import EXACT, CONTAINED
+from .payroll_table import PayrollTable
+from .payroll_projection import PayrollProjection
+from .hr_import import HRExportImporter
 
 
 class PayrollManager:
@@ -12,77 +20,182 @@ class PayrollManager:
     Manages payroll calculations and integration with DRE.
     """
     
+    # Header labels of the roles table; more specific keys come first so
+    # "Custo Total por Função" is not taken for "Custo por Função" or "Função"
+    HEADER_LABELS = {
+        'total_cost': ['Custo Total por Função', 'Custo Total'],
+        'cost_per_role': ['Custo por Função', 'Custo por Cargo'],
+        'quantity': ['Quantidade por Função', 'Quantidade', 'Qtd'],
+        'salary': ['Salário Fixo', 'Salário Base', 'Salário'],
+        'charges': ['Encargos'],
+        'benefits': ['Benefícios'],
+        'role': ['Função', 'Cargo'],
+    }
+    HEADER_MATCHER = compile_labels(HEADER_LABELS)
+    
+    # Columns read as numbers, in this order
+    VALUE_KEYS = ['salary', 'charges', 'benefits', 'quantity', 'cost_per_role', 'total_cost']
+    
+    # Rows scanned for the header
+    HEADER_SEARCH_ROWS = 20
+    
+    # Roles whose cost varies with revenue (e.g., commission-based roles)
+    DEFAULT_VARIABLE_ROLES = [
+        'Supervisor Comercial',
+        'Assessora Comercial',
+    ]
+    
     def __init__(self):
         """Initialize payroll manager."""
-        self.roles = {}
-        self.total_payroll = 0.0
-        self.fixed_portion = 0.0
-        self.variable_portion = 0.0
+        self.table = PayrollTable()
+        self.variable_roles = None
+        self.layout = None
+    
+    @property
+    def roles(self) -> Dict[str, Dict[str, float]]:
+        """Snapshot of the role data (role name -> values)."""
+        return self.table.to_dict()
+    
+    @property
+    def total_payroll(self) -> float:
+        """Total payroll cost."""
+        return self.table.total()
+    
+    @property
+    def fixed_portion(self) -> float:
+        """Payroll cost of the fixed roles."""
+        return self.table.fixed_total()
+    
+    @property
+    def variable_portion(self) -> float:
+        """Payroll cost of the variable roles."""
+        return self.table.variable_total()
+    
+    def _is_variable(self, role_name: str) -> bool:
+        return any(var_role in role_name for var_role in (self.variable_roles or []))
+    
+    def detect_table(self, worksheet) -> Optional[Dict]:
+        """
+        Locate the roles table from its header labels.
+        
+        The header is the row (within HEADER_SEARCH_ROWS) matching the most
+        labels, with at least the role column and two value columns. Role
+        rows run down to the "Total" row, or to the first blank role cell.
+        
+        Args:
+            worksheet: Cargos e Salários worksheet or its SheetGrid
+            
+        Returns:
+            Dictionary with 'header_row', 'first_row', 'last_row',
+            'total_row' (None if the table has no total row), 'columns'
+            (key -> column number) and 'sheet_title'; None if not found
+        """
+        grid = as_grid(worksheet)
+        
+        best_row, best_columns = None, {}
+        for row in range(1, min(self.HEADER_SEARCH_ROWS, grid.max_row) + 1):
+            columns = {}
+            for _, col, text in grid.iter_text(row, row):
+                key = self.HEADER_MATCHER.first_key(normalize_text(text), kinds=(EXACT, CONTAINED))
+                if key is not None and key not in columns:
+                    columns[key] = col
+            if len(columns) > len(best_columns):
+                best_row, best_columns = row, columns
+        
+        if best_row is None or 'role' not in best_columns or len(best_columns) < 3:
+            return None
+        
+        role_col = best_columns['role']
+        first_row = best_row + 1
+        last_row = best_row
+        total_row = None
+        for row in range(first_row, grid.max_row + 1):
+            text = grid.cell_text(row, role_col)
+            if not text:
+                break
+            if normalize_text(text).startswith('total'):
+                total_row = row
+                break
+            last_row = row
+        
+        return {
+            'header_row': best_row,
+            'first_row': first_row,
+            'last_row': last_row,
+            'total_row': total_row,
+            'columns': best_columns,
+            'sheet_title': grid.title,
+        }
     
     def read_payroll_data(self, worksheet) -> Dict[str, Dict[str, float]]:
         """
         Read payroll data from Cargos e Salários sheet.
         
         Args:
-            worksheet: Cargos e Salários worksheet
+            worksheet: Cargos e Salários worksheet or its SheetGrid
             
         Returns:
             Dictionary with role data
         """
-        # Find header row (should be row 3)
-        header_row = 3
-        
-        # Column mapping
-        col_mapping = {
-            'role': 2,           # Função
-            'salary': 3,         # Salário Fixo
-            'charges': 4,        # Encargos
-            'benefits': 5,       # Benefícios
-            'cost_per_role': 6,  # Custo por Função
-            'quantity': 7,       # Quantidade
-            'total_cost': 8,     # Custo Total
-        }
+        grid = as_grid(worksheet)
         
-        # Read data starting from row 4
-        start_row = 4
-        end_row = 17  # Based on the structure we saw
+        self.layout = self.detect_table(grid)
+        if self.layout is None:
+            print("Warning: Could not find the payroll table header")
+            return self.roles
         
-        for row in range(start_row, end_row):
-            role_cell = worksheet.cell(row=row, column=col_mapping['role'])
-            role_name = role_cell.value
-            
-            if not role_name or role_name == "Total":
-                continue
-            
-            role_data = {
-                'salary': worksheet.cell(row=row, column=col_mapping['salary']).value or 0,
-                'charges': worksheet.cell(row=row, column=col_mapping['charges']).value or 0,
-                'benefits': worksheet.cell(row=row, column=col_mapping['benefits']).value or 0,
-                'quantity': worksheet.cell(row=row, column=col_mapping['quantity']).value or 0,
-                'cost_per_role': worksheet.cell(row=row, column=col_mapping['cost_per_role']).value or 0,
-                'total_cost': worksheet.cell(row=row, column=col_mapping['total_cost']).value or 0,
-            }
-            
-            # Calculate if not already calculated
-            if role_data['cost_per_role'] == 0:
-                role_data['cost_per_role'] = (
-                    role_data['salary'] + 
-                    role_data['charges'] + 
-                    role_data['benefits']
-                )
-            
-            if role_data['total_cost'] == 0:
-                role_data['total_cost'] = role_data['cost_per_role'] * role_data['quantity']
-            
-            self.roles[role_name] = role_data
+        columns = self.layout['columns']
+        rows = list(range(self.layout['first_row'], self.layout['last_row'] + 1))
+        
+        # One gather for the whole table; formulas, blanks and missing
+        # columns read as 0 and are recalculated below
+        values = grid.numbers_at(rows, [columns.get(key, 0) for key in self.VALUE_KEYS])
+        table = dict(zip(self.VALUE_KEYS, values.T))
+        
+        cost_per_role = table['salary'] + table['charges'] + table['benefits']
+        table['cost_per_role'] = np.where(table['cost_per_role'] == 0, cost_per_role, table['cost_per_role'])
+        total_cost = table['cost_per_role'] * table['quantity']
+        table['total_cost'] = np.where(table['total_cost'] == 0, total_cost, table['total_cost'])
         
-        # Calculate total
-        self.total_payroll = sum(role['total_cost'] for role in self.roles.values())
+        role_names = [grid.cell(row, columns['role']) for row in rows]
+        self.table.extend(role_names, table['salary'], table['charges'], table['benefits'],
+                          table['quantity'], table['cost_per_role'], table['total_cost'],
+                          variable=[self._is_variable(name) for name in role_names])
         
         print(f"Read {len(self.roles)} roles, total payroll: {self.total_payroll:,.2f}")
         
         return self.roles
     
+    def import_hr_export(self, path: str, start_period: Optional[int] = None,
+                         chunk_size: int = 50000, encoding: Optional[str] = None) -> Dict:
+        """
+        Read payroll data from an HR system export (one line per employee per month).
+        
+        Every employee becomes its own entry, with the values of their latest
+        month and their hire/termination months.
+        
+        Args:
+            path: CSV or JSON Lines export
+            start_period: Month index of month 1 of the projection
+                          (defaults to the last month of the export)
+            chunk_size: Lines processed at a time
+            encoding: Text encoding of a CSV export (None detects UTF-8 or cp1252)
+            
+        Returns:
+            Import statistics (see HRExportImporter.import_file)
+        """
+        importer = HRExportImporter(chunk_size)
+        stats = importer.import_file(path, encoding=encoding)
+        importer.to_table(self.table, start_period, self.variable_roles or self.DEFAULT_VARIABLE_ROLES)
+        
+        print(f"Imported {stats['rows']:,} HR lines ({stats['rejected']} rejected) for "
+              f"{len(importer)} employees at {stats['rows_per_second']:,.0f} lines/s, "
+              f"total payroll: {self.total_payroll:,.2f}")
+        for error in importer.errors:
+            print(f"  Warning: {error}")
+        
+        return stats
+    
     def classify_fixed_variable(self, variable_roles: Optional[List[str]] = None) -> Tuple[float, float]:
         """
         Classify payroll into fixed and variable portions.
@@ -94,24 +207,16 @@ class PayrollManager:
             Tuple of (fixed_total, variable_total)
         """
         if variable_roles is None:
-            # By default, certain roles are considered variable
-            # (e.g., commission-based roles)
-            variable_roles = [
-                'Supervisor Comercial',
-                'Assessora Comercial',
-            ]
-        
-        fixed_total = 0.0
-        variable_total = 0.0
+            variable_roles = self.DEFAULT_VARIABLE_ROLES
         
-        for role_name, data in self.roles.items():
-            if any(var_role in role_name for var_role in variable_roles):
-                variable_total += data['total_cost']
-            else:
-                fixed_total += data['total_cost']
+        # Roles added later are classified with the same list
+        self.variable_roles = list(variable_roles)
+        roles = self.table.column('role')
+        self.table.set_variable([self._is_variable(name) or self._is_variable(role)
+                                 for name, role in zip(self.table, roles)])
         
-        self.fixed_portion = fixed_total
-        self.variable_portion = variable_total
+        fixed_total = self.fixed_portion
+        variable_total = self.variable_portion
         
         print(f"Fixed payroll: {fixed_total:,.2f}")
         print(f"Variable payroll: {variable_total:,.2f}")
@@ -126,33 +231,44 @@ class PayrollManager:
             workbook_manager: ExcelWorkbookManager instance
             worksheet: Cargos e Salários worksheet
         """
-        col_mapping = {
-            'cost_per_role': 6,
-            'total_cost': 8,
-        }
+        if self.layout is None:
+            print("Warning: Cannot update payroll formulas without a detected table")
+            return
+        
+        columns = self.layout['columns']
+        first_row = self.layout['first_row']
+        last_row = self.layout['last_row']
+        letters = {key: get_column_letter(col) for key, col in columns.items()}
         
-        start_row = 4
-        row = start_row
+        parts = [columns[key] for key in ('salary', 'charges', 'benefits') if key in columns]
+        contiguous = parts == list(range(parts[0], parts[0] + len(parts))) if parts else False
         
-        for role_name, data in self.roles.items():
+        for row in range(first_row, last_row + 1):
             # Update cost per role if needed
-            cost_formula = f"=SUM(C{row}:E{row})"
-            workbook_manager.write_formula(worksheet, row, col_mapping['cost_per_role'], cost_formula)
+            if 'cost_per_role' in columns and parts:
+                if contiguous:
+                    cost_formula = f"=SUM({get_column_letter(parts[0])}{row}:{get_column_letter(parts[-1])}{row})"
+                else:
+                    cost_formula = "=" + "+".join(f"{get_column_letter(col)}{row}" for col in parts)
+                workbook_manager.write_formula(worksheet, row, columns['cost_per_role'], cost_formula)
             
             # Update total cost
-            total_formula = f"=F{row}*G{row}"
-            workbook_manager.write_formula(worksheet, row, col_mapping['total_cost'], total_formula)
-            
-            row += 1
+            if {'total_cost', 'cost_per_role', 'quantity'} <= columns.keys():
+                total_formula = f"={letters['cost_per_role']}{row}*{letters['quantity']}{row}"
+                workbook_manager.write_formula(worksheet, row, columns['total_cost'], total_formula)
         
-        # Update total row (row 17)
-        total_row = 17
-        workbook_manager.write_formula(worksheet, total_row, 3, f"=SUM(C4:C16)")
-        workbook_manager.write_formula(worksheet, total_row, 4, f"=SUM(D4:D16)")
-        workbook_manager.write_formula(worksheet, total_row, 5, f"=SUM(E4:E16)")
-        workbook_manager.write_formula(worksheet, total_row, 6, f"=SUM(F4:F16)")
-        workbook_manager.write_formula(worksheet, total_row, 7, f"=SUM(G4:G16)")
-        workbook_manager.write_formula(worksheet, total_row, 8, f"=SUM(H4:H16)")
+        # Update total row (added below the table if missing)
+        total_row = self.layout['total_row']
+        if total_row is None:
+            total_row = last_row + 1
+            workbook_manager.write_value(worksheet, total_row, columns['role'], "Total")
+            self.layout['total_row'] = total_row
+        
+        for key in self.VALUE_KEYS:
+            if key in columns:
+                letter = letters[key]
+                workbook_manager.write_formula(worksheet, total_row, columns[key],
+                                               f"=SUM({letter}{first_row}:{letter}{last_row})")
         
         print("Payroll sheet updated with formulas")
     
@@ -166,21 +282,63 @@ class PayrollManager:
             payroll_row: Row in DRE for payroll costs
             month_cols: Dictionary of month names to columns
         """
-        # The link is already in place: ='Cargos e Salários '!$H$17
-        # We just verify it's correct
+        # Point at the total cost of the detected total row
+        # (the template's link is ='Cargos e Salários '!$H$17)
+        if self.layout and self.layout['total_row'] and 'total_cost' in self.layout['columns']:
+            sheet_title = self.layout['sheet_title'] or 'Cargos e Salários '
+            total_col = get_column_letter(self.layout['columns']['total_cost'])
+            expected_formula = f"='{sheet_title}'!${total_col}${self.layout['total_row']}"
+        else:
+            expected_formula = "='Cargos e Salários '!$H$17"
         
         for month, col in month_cols.items():
             cell = dre_worksheet.cell(row=payroll_row, column=col)
             current_formula = cell.value
             
-            # Expected formula
-            expected_formula = "='Cargos e Salários '!$H$17"
-            
             if not current_formula or expected_formula not in str(current_formula):
                 workbook_manager.write_formula(dre_worksheet, payroll_row, col, expected_formula)
         
         print(f"Payroll linked to DRE at row {payroll_row}")
     
+    def link_monthly_to_dre(self, workbook_manager, dre_worksheet, payroll_row: int,
+                            month_cols: Dict[str, int], monthly_costs: Sequence[float]):
+        """
+        Write a projected payroll into the DRE, one value per month.
+        
+        The values replace the formula link set by link_to_dre, so the row
+        no longer follows edits to the payroll sheet until it is written
+        again.
+        
+        Args:
+            workbook_manager: ExcelWorkbookManager instance
+            dre_worksheet: DRE worksheet
+            payroll_row: Row in DRE for payroll costs
+            month_cols: Dictionary of month names to columns, in month order
+            monthly_costs: Cost of each month (e.g. PayrollProjection.monthly())
+        """
+        if len(monthly_costs) < len(month_cols):
+            raise ValueError(f"Expected {len(month_cols)} monthly costs, got {len(monthly_costs)}")
+        
+        for col, cost in zip(month_cols.values(), monthly_costs):
+            workbook_manager.write_value(dre_worksheet, payroll_row, col, float(cost))
+        
+        print(f"Projected payroll written to DRE at row {payroll_row}")
+    
+    def project(self, months: int = 12, first_calendar_month: int = 1,
+                charges_rates: Optional[Union[float, Sequence[float]]] = None) -> PayrollProjection:
+        """
+        Create a monthly projection of the current payroll.
+        
+        Args:
+            months: Months in the horizon
+            first_calendar_month: Calendar month (1-12) of the first month
+            charges_rates: Encargos rate(s) (None keeps each role's charges)
+            
+        Returns:
+            PayrollProjection (schedule raises on it before projecting)
+        """
+        return PayrollProjection(self.table, months, first_calendar_month, charges_rates)
+    
     def get_payroll_summary(self) -> Dict[str, float]:
         """
         Get summary of payroll costs.
@@ -188,16 +346,7 @@ class PayrollManager:
         Returns:
             Dictionary with summary metrics
         """
-        return {
-            'total': self.total_payroll,
-            'fixed': self.fixed_portion,
-            'variable': self.variable_portion,
-            'headcount': sum(role['quantity'] for role in self.roles.values()),
-            'average_cost_per_employee': (
-                self.total_payroll / sum(role['quantity'] for role in self.roles.values())
-                if sum(role['quantity'] for role in self.roles.values()) > 0 else 0
-            ),
-        }
+        return self.table.summary()
     
     def get_role_details(self, role_name: str) -> Optional[Dict[str, float]]:
         """
@@ -209,34 +358,33 @@ class PayrollManager:
         Returns:
             Dictionary with role data, or None if not found
         """
-        return self.roles.get(role_name)
+        if role_name not in self.table:
+            return None
+        return self.table.row(role_name)
     
     def add_or_update_role(self, role_name: str, salary: float, charges: float, 
-                          benefits: float, quantity: int):
+                          benefits: float, quantity: int, department: Optional[str] = None,
+                          branch: Optional[str] = None, start_month: Optional[int] = None,
+                          end_month: Optional[int] = None):
         """
-        Add or update a role in the payroll.
+        Add or update a role (or a single employee) in the payroll.
         
         Args:
-            role_name: Name of the role
+            role_name: Name of the role (or employee id)
             salary: Base salary
             charges: Employee charges (taxes, etc.)
             benefits: Benefits cost
             quantity: Number of employees in this role
+            department: Department label (kept if None)
+            branch: Branch label (kept if None)
+            start_month: First active month, 1-based (kept if None)
+            end_month: Last active month (kept if None)
         """
-        cost_per_role = salary + charges + benefits
-        total_cost = cost_per_role * quantity
-        
-        self.roles[role_name] = {
-            'salary': salary,
-            'charges': charges,
-            'benefits': benefits,
-            'quantity': quantity,
-            'cost_per_role': cost_per_role,
-            'total_cost': total_cost,
-        }
-        
-        # Recalculate total
-        self.total_payroll = sum(role['total_cost'] for role in self.roles.values())
+        # Totals are kept up to date by the table
+        self.table.upsert(role_name, salary, charges, benefits, quantity,
+                          department=department, branch=branch,
+                          variable=self._is_variable(role_name),
+                          start_month=start_month, end_month=end_month)
     
     def get_cost_by_department(self, department_mapping: Dict[str, str]) -> Dict[str, float]:
         """
@@ -248,13 +396,6 @@ class PayrollManager:
         Returns:
             Dictionary with department -> total cost
         """
-        dept_costs = {}
-        
-        for role_name, data in self.roles.items():
-            dept = department_mapping.get(role_name, 'Outros')
-            if dept not in dept_costs:
-                dept_costs[dept] = 0.0
-            dept_costs[dept] += data['total_cost']
-        
-        return dept_costs
+        departments = [department_mapping.get(role_name, 'Outros') for role_name in self.table]
+        return self.table.group_totals(departments)
 
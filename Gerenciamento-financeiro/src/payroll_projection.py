@@ -0,0 +1,262 @@
+"""
+Payroll Projection Module
+
+Projects the payroll month by month (entries x months) from a PayrollTable:
+scheduled raises, hires and terminations, 13th salary, vacation bonus and
+encargos, as monthly rows for the DRE (accrual) and cash flow (cash).
+"""
+
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
+
+from .dre import DREMatrix
+
+
+class PayrollProjection:
+    """
+    Monthly payroll cost matrix.
+
+    Month 1 is the first month of the horizon; entries are active from their
+    start month through their end month. On the accrual basis the 13th
+    salary and the vacation bonus (1/3 of a salary) accrue 1/12 per active
+    month. On the cash basis the 13th is paid half in November and the rest
+    in December, or in full in the termination month; the vacation bonus is
+    paid as it accrues (vacations spread over the year).
+    """
+
+    COMPONENTS = ('salary', 'charges', 'benefits', 'thirteenth', 'vacation_bonus')
+
+    def __init__(self, table, months: int = 12, first_calendar_month: int = 1,
+                 charges_rates: Optional[Union[float, Sequence[float]]] = None,
+                 thirteenth: bool = True, vacation_bonus: bool = True):
+        """
+        Initialize the projection.
+
+        Args:
+            table: PayrollTable with the entries to project
+            months: Months in the horizon (e.g. 36 for a three-year plan)
+            first_calendar_month: Calendar month (1-12) of month 1
+            charges_rates: Encargos rate on salary, 13th and vacation bonus,
+                           as one rate or one per month; None keeps each
+                           entry's charges/salary ratio
+            thirteenth: Include the 13th salary
+            vacation_bonus: Include the vacation bonus
+        """
+        if not 1 <= first_calendar_month <= 12:
+            raise ValueError(f"Invalid calendar month: {first_calendar_month}")
+
+        self.table = table
+        self.months = months
+        self.first_calendar_month = first_calendar_month
+        self.charges_rates = charges_rates
+        self.thirteenth = thirteenth
+        self.vacation_bonus = vacation_bonus
+        self.raises: List[Dict] = []
+
+        offsets = np.arange(months) + first_calendar_month - 1
+        self.calendar_months = offsets % 12 + 1
+        self.years = offsets // 12
+
+    def add_raise(self, month: int, pct: float, department: Optional[str] = None,
+                  branch: Optional[str] = None, every_year: bool = False):
+        """
+        Schedule a salary raise.
+
+        Args:
+            month: Month of the horizon the raise takes effect (1-based)
+            pct: Raise as a fraction (0.05 = 5%)
+            department: Only entries of this department (None for all)
+            branch: Only entries of this branch (None for all)
+            every_year: Repeat in the same calendar month every year
+                        (e.g. the yearly collective agreement)
+        """
+        if not 1 <= month <= self.months:
+            raise ValueError(f"Raise month {month} is outside the {self.months}-month horizon")
+
+        self.raises.append({
+            'month': month,
+            'pct': pct,
+            'department': department,
+            'branch': branch,
+            'every_year': every_year,
+        })
+
+    def salary_multipliers(self) -> np.ndarray:
+        """
+        Cumulative raise factor of every entry and month.
+
+        Returns:
+            Array of shape (entries, months)
+        """
+        factors = np.ones((len(self.table), self.months))
+        columns = np.arange(self.months)
+        for raise_ in self.raises:
+            rows = np.ones(len(self.table), dtype=bool)
+            for key in ('department', 'branch'):
+                if raise_[key] is not None:
+                    rows &= self.table.column(key) == raise_[key]
+
+            if raise_['every_year']:
+                first = raise_['month'] - 1
+                cols = columns[(columns >= first) & ((columns - first) % 12 == 0)]
+            else:
+                cols = [raise_['month'] - 1]
+            factors[np.ix_(rows, cols)] *= 1 + raise_['pct']
+        return np.cumprod(factors, axis=1)
+
+    def active_mask(self) -> np.ndarray:
+        """
+        Whether each entry is employed in each month.
+
+        Returns:
+            Boolean array of shape (entries, months)
+        """
+        month = np.arange(1, self.months + 1)
+        start = self.table.column('start_month').astype(np.int64)[:, None]
+        end = self.table.column('end_month').astype(np.int64)[:, None]
+        return (start <= month) & (month <= end)
+
+    def _charges_rates(self) -> np.ndarray:
+        """Encargos rate per entry and month, broadcastable to (entries, months)."""
+        if self.charges_rates is None:
+            salary = self.table.column('salary')
+            charges = self.table.column('charges')
+            rates = np.divide(charges, salary, out=np.zeros(len(self.table)), where=salary > 0)
+            return rates[:, None]
+
+        rates = np.asarray(self.charges_rates, dtype=np.float64)
+        if rates.ndim and rates.shape != (self.months,):
+            raise ValueError(f"Expected {self.months} charges rates, got {rates.size}")
+        return rates
+
+    def _year_to_date(self, values: np.ndarray) -> np.ndarray:
+        """Running sum of each row, restarting every calendar year."""
+        running = np.cumsum(values, axis=1)
+        padded = np.concatenate([np.zeros((values.shape[0], 1)), running], axis=1)
+        year_start = np.searchsorted(self.years, self.years)
+        return running - padded[:, year_start]
+
+    def _thirteenth_cash(self, accrued: np.ndarray, active: np.ndarray) -> np.ndarray:
+        """Pay the 13th accrued in each year in November/December or on termination."""
+        year_to_date = self._year_to_date(accrued)
+
+        # Last active month of terminated entries (inside the horizon)
+        end = self.table.column('end_month').astype(np.int64)[:, None]
+        terminated = np.arange(1, self.months + 1) == end
+
+        november = (self.calendar_months == 11) & active & ~terminated
+        first_half = np.where(november, 0.5 * year_to_date, 0.0)
+        settled = ((self.calendar_months == 12) & active) | terminated
+        paid_before = self._year_to_date(first_half) - first_half
+        return first_half + np.where(settled, year_to_date - paid_before, 0.0)
+
+    def project(self, basis: str = 'accrual') -> Dict[str, np.ndarray]:
+        """
+        Project every cost component.
+
+        Args:
+            basis: 'accrual' (DRE) or 'cash' (cash flow)
+
+        Returns:
+            Dictionary with component -> array of shape (entries, months),
+            plus 'total'
+        """
+        if basis not in ('accrual', 'cash'):
+            raise ValueError(f"Unknown basis: {basis}")
+
+        active = self.active_mask()
+        quantity = self.table.column('quantity')[:, None]
+        salary = self.table.column('salary')[:, None] * quantity * self.salary_multipliers() * active
+        benefits = np.broadcast_to(self.table.column('benefits')[:, None] * quantity, active.shape) * active
+
+        thirteenth = salary / 12 if self.thirteenth else np.zeros_like(salary)
+        if self.thirteenth and basis == 'cash':
+            thirteenth = self._thirteenth_cash(thirteenth, active)
+        vacation_bonus = salary / 36 if self.vacation_bonus else np.zeros_like(salary)
+
+        charges = (salary + thirteenth + vacation_bonus) * self._charges_rates()
+
+        projection = {
+            'salary': salary,
+            'charges': charges,
+            'benefits': benefits,
+            'thirteenth': thirteenth,
+            'vacation_bonus': vacation_bonus,
+        }
+        projection['total'] = sum(projection.values())
+        return projection
+
+    def monthly(self, basis: str = 'accrual', by: Optional[Union[str, Sequence[str]]] = None,
+                component: str = 'total') -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Monthly payroll totals.
+
+        Args:
+            basis: 'accrual' or 'cash'
+            by: Optional grouping ('department', 'branch', 'role', 'variable'
+                or one label per entry)
+            component: Cost component (see COMPONENTS) or 'total'
+
+        Returns:
+            Array of shape (months,), or group -> array if grouped
+        """
+        values = self.project(basis)[component]
+        if by is None:
+            return values.sum(axis=0)
+
+        return self.table.group_rows(values, by)
+
+    def dre_lines(self, basis: str = 'accrual',
+                  variable_line: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Payroll as monthly DRE lines.
+
+        Args:
+            basis: 'accrual' or 'cash'
+            variable_line: Line for the variable roles (None keeps the whole
+                           payroll in custos_fixos, as the template does)
+
+        Returns:
+            Dictionary with line -> array of shape (months,)
+        """
+        if variable_line is None:
+            return {'custos_fixos': self.monthly(basis)}
+
+        split = self.monthly(basis, by='variable')
+        zeros = np.zeros(self.months)
+        return {
+            'custos_fixos': split.get('Fixo', zeros),
+            variable_line: split.get('Variável', zeros),
+        }
+
+    def apply_to_dre(self, dre_matrix: DREMatrix, basis: str = 'accrual',
+                     variable_line: Optional[str] = None) -> DREMatrix:
+        """
+        Replace the static payroll in the DRE with the projection.
+
+        The template carries the same payroll total in every month of
+        custos_fixos; that amount is swapped for the projected month.
+
+        Args:
+            dre_matrix: DREMatrix with the same months as the projection
+            basis: 'accrual' for the DRE, 'cash' for the cash flow
+            variable_line: Line for the variable roles (see dre_lines)
+
+        Returns:
+            New DREMatrix
+        """
+        if len(dre_matrix.months) != self.months:
+            raise ValueError(
+                f"DRE has {len(dre_matrix.months)} months, projection has {self.months}"
+            )
+
+        values = dre_matrix.values.copy()
+        static = {'custos_fixos': self.table.total()}
+        if variable_line is not None:
+            static = {'custos_fixos': self.table.fixed_total(), variable_line: self.table.variable_total()}
+
+        for line, projected in self.dre_lines(basis, variable_line).items():
+            if line not in dre_matrix:
+                raise ValueError(f"DRE has no line {line}")
+            values[..., dre_matrix.rows.index(line), :] += projected - static[line]
+        return DREMatrix(values, dre_matrix.rows, dre_matrix.months)
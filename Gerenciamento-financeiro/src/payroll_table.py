@@ -0,0 +1,479 @@
+"""
+Payroll Table Module
+
+Columnar storage of payroll entries (one per role line or per employee)
+with running totals and grouped roll-ups, so summaries stay fast for
+headcounts in the tens of thousands.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+import numpy as np
+
+
+class PayrollTable:
+    """
+    Payroll entries stored as NumPy columns.
+
+    Each entry is keyed by name (role or employee id) and carries its
+    values, a department, branch and role, a fixed/variable flag and the months
+    it is active in. Totals are updated on every change instead of being
+    re-summed; department, branch and monthly roll-ups are grouped
+    reductions over the columns.
+    """
+
+    # Numeric columns, in storage order
+    VALUE_KEYS = ('salary', 'charges', 'benefits', 'quantity', 'cost_per_role', 'total_cost')
+
+    # Label columns, stored as codes into a per-column label list
+    CATEGORY_KEYS = ('department', 'branch', 'role')
+
+    DEFAULT_CATEGORY = 'Outros'
+
+    # End month of entries with no termination
+    OPEN_END = np.iinfo(np.int32).max
+
+    def __init__(self, capacity: int = 64):
+        """
+        Initialize an empty table.
+
+        Args:
+            capacity: Entries allocated up front (grows by doubling)
+        """
+        capacity = max(int(capacity), 1)
+        self._size = 0
+        self._names: List[Any] = []
+        self._index: Dict[Any, int] = {}
+        self._values = np.zeros((len(self.VALUE_KEYS), capacity))
+        self._codes = np.zeros((len(self.CATEGORY_KEYS), capacity), dtype=np.intp)
+        self._variable = np.zeros(capacity, dtype=bool)
+        self._start = np.ones(capacity, dtype=np.int32)
+        self._end = np.full(capacity, self.OPEN_END, dtype=np.int32)
+        self._labels = {key: [self.DEFAULT_CATEGORY] for key in self.CATEGORY_KEYS}
+        self._label_codes = {key: {self.DEFAULT_CATEGORY: 0} for key in self.CATEGORY_KEYS}
+
+        # Running column sums, overall and over variable entries
+        self._sums = np.zeros(len(self.VALUE_KEYS))
+        self._variable_sums = np.zeros(len(self.VALUE_KEYS))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, name: Any) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._names)
+
+    @property
+    def names(self) -> List[Any]:
+        """Entry names in storage order."""
+        return list(self._names)
+
+    def _grow(self, needed: int):
+        capacity = self._values.shape[1]
+        if needed <= capacity:
+            return
+
+        while capacity < needed:
+            capacity *= 2
+        extra = capacity - self._values.shape[1]
+        self._values = np.pad(self._values, ((0, 0), (0, extra)))
+        self._codes = np.pad(self._codes, ((0, 0), (0, extra)))
+        self._variable = np.pad(self._variable, (0, extra))
+        self._start = np.pad(self._start, (0, extra), constant_values=1)
+        self._end = np.pad(self._end, (0, extra), constant_values=self.OPEN_END)
+
+    def _code(self, key: str, label: Optional[str]) -> int:
+        if label is None:
+            label = self.DEFAULT_CATEGORY
+        codes = self._label_codes[key]
+        if label not in codes:
+            codes[label] = len(self._labels[key])
+            self._labels[key].append(label)
+        return codes[label]
+
+    def column(self, key: str) -> np.ndarray:
+        """
+        Read-only view of a column.
+
+        Args:
+            key: One of VALUE_KEYS, CATEGORY_KEYS (as labels), 'variable',
+                 'start_month' or 'end_month'
+
+        Returns:
+            Array with one value per entry
+        """
+        n = self._size
+        if key in self.VALUE_KEYS:
+            view = self._values[self.VALUE_KEYS.index(key), :n]
+        elif key in self.CATEGORY_KEYS:
+            labels = np.array(self._labels[key], dtype=object)
+            return labels[self._codes[self.CATEGORY_KEYS.index(key), :n]]
+        elif key == 'variable':
+            view = self._variable[:n]
+        elif key == 'start_month':
+            view = self._start[:n]
+        elif key == 'end_month':
+            view = self._end[:n]
+        else:
+            raise KeyError(key)
+        view = view.view()
+        view.flags.writeable = False
+        return view
+
+    def row(self, name: Any) -> Dict[str, float]:
+        """
+        Values of one entry.
+
+        Args:
+            name: Entry name
+
+        Returns:
+            Dictionary with VALUE_KEYS -> value
+        """
+        i = self._index[name]
+        return dict(zip(self.VALUE_KEYS, self._values[:, i].tolist()))
+
+    def to_dict(self) -> Dict[Any, Dict[str, float]]:
+        """
+        Snapshot of every entry.
+
+        Returns:
+            Dictionary with name -> values (the PayrollManager.roles format)
+        """
+        columns = self._values[:, :self._size].T.tolist()
+        return {name: dict(zip(self.VALUE_KEYS, values)) for name, values in zip(self._names, columns)}
+
+    def upsert(self, name: Any, salary: float, charges: float, benefits: float,
+               quantity: float = 1, cost_per_role: Optional[float] = None,
+               total_cost: Optional[float] = None, department: Optional[str] = None,
+               branch: Optional[str] = None, role: Optional[str] = None,
+               variable: Optional[bool] = None, start_month: Optional[int] = None, end_month: Optional[int] = None) -> int:
+        """
+        Add an entry or replace the values of an existing one.
+
+        Args:
+            name: Entry name (role or employee id)
+            salary: Base salary
+            charges: Employee charges
+            benefits: Benefits cost
+            quantity: Number of employees in the entry
+            cost_per_role: Cost per employee (defaults to salary + charges + benefits)
+            total_cost: Total cost (defaults to cost_per_role * quantity)
+            department: Department label
+            branch: Branch label
+            role: Role label (for per-employee entries)
+            variable: True if the cost varies with revenue
+            start_month: First active month (1-based)
+            end_month: Last active month (None for no termination)
+
+        Returns:
+            Position of the entry
+
+        Note:
+            For an existing entry, the labels, variable flag and the
+            months are kept unless given.
+        """
+        if cost_per_role is None:
+            cost_per_role = salary + charges + benefits
+        if total_cost is None:
+            total_cost = cost_per_role * quantity
+        values = np.array([salary, charges, benefits, quantity, cost_per_role, total_cost], dtype=np.float64)
+
+        i = self._index.get(name)
+        if i is None:
+            self._grow(self._size + 1)
+            i = self._size
+            self._size += 1
+            self._names.append(name)
+            self._index[name] = i
+            self._codes[:, i] = 0
+            self._variable[i] = False
+            self._start[i] = 1
+            self._end[i] = self.OPEN_END
+        else:
+            self._subtract(i)
+
+        self._values[:, i] = values
+        for k, (key, label) in enumerate(zip(self.CATEGORY_KEYS, (department, branch, role))):
+            if label is not None:
+                self._codes[k, i] = self._code(key, label)
+        if variable is not None:
+            self._variable[i] = bool(variable)
+        if start_month is not None:
+            self._start[i] = start_month
+        if end_month is not None:
+            self._end[i] = end_month
+
+        self._add(i)
+        return i
+
+    def extend(self, names: Sequence[Any], salary, charges, benefits, quantity=1,
+               cost_per_role=None, total_cost=None, department=None, branch=None,
+               role=None, variable=None, start_month=None, end_month=None):
+        """
+        Add many entries at once.
+
+        Array arguments hold one value per name; scalars apply to all.
+        Names already in the table (or repeated) are upserted one by one,
+        the last occurrence winning.
+
+        Args:
+            names: Entry names
+            salary, charges, benefits, quantity: Value columns
+            cost_per_role: Cost per employee (defaults to the sum of the parts)
+            total_cost: Total cost (defaults to cost_per_role * quantity)
+            department, branch, role: Label or sequence of labels
+            variable: Flag or sequence of flags
+            start_month, end_month: Month or sequence of months
+        """
+        names = list(names)
+        n = len(names)
+        if n == 0:
+            return
+
+        def expand(value, dtype=np.float64):
+            return np.broadcast_to(np.asarray(value, dtype=dtype), (n,))
+
+        salary, charges, benefits, quantity = (expand(v) for v in (salary, charges, benefits, quantity))
+        cost_per_role = salary + charges + benefits if cost_per_role is None else expand(cost_per_role)
+        total_cost = cost_per_role * quantity if total_cost is None else expand(total_cost)
+
+        labels = {}
+        for key, value in zip(self.CATEGORY_KEYS, (department, branch, role)):
+            if value is None or isinstance(value, str):
+                value = [value] * n
+            labels[key] = np.array([self._code(key, label) for label in value], dtype=np.intp)
+
+        flags = expand(False if variable is None else variable, bool)
+        starts = expand(1 if start_month is None else start_month, np.int32)
+        ends = expand(self.OPEN_END if end_month is None else end_month, np.int32)
+
+        if len(set(names)) < n or any(name in self._index for name in names):
+            for i, name in enumerate(names):
+                row_labels = {key: self._labels[key][labels[key][i]] for key in self.CATEGORY_KEYS}
+                self.upsert(name, salary[i], charges[i], benefits[i], quantity[i],
+                            cost_per_role[i], total_cost[i], variable=bool(flags[i]),
+                            start_month=int(starts[i]), end_month=int(ends[i]), **row_labels)
+            return
+
+        start, stop = self._size, self._size + n
+        self._grow(stop)
+        block = np.vstack([salary, charges, benefits, quantity, cost_per_role, total_cost])
+        self._values[:, start:stop] = block
+        for k, key in enumerate(self.CATEGORY_KEYS):
+            self._codes[k, start:stop] = labels[key]
+        self._variable[start:stop] = flags
+        self._start[start:stop] = starts
+        self._end[start:stop] = ends
+
+        self._names.extend(names)
+        self._index.update(zip(names, range(start, stop)))
+        self._size = stop
+
+        self._sums += block.sum(axis=1)
+        self._variable_sums += block[:, flags].sum(axis=1)
+
+    def remove(self, name: Any):
+        """
+        Remove an entry (the last entry takes its position).
+
+        Args:
+            name: Entry name
+        """
+        i = self._index.pop(name)
+        self._subtract(i)
+
+        last = self._size - 1
+        if i != last:
+            moved = self._names[last]
+            self._names[i] = moved
+            self._index[moved] = i
+            self._values[:, i] = self._values[:, last]
+            self._codes[:, i] = self._codes[:, last]
+            self._variable[i] = self._variable[last]
+            self._start[i] = self._start[last]
+            self._end[i] = self._end[last]
+        self._names.pop()
+        self._size = last
+
+    def clear(self):
+        """Remove every entry."""
+        self._size = 0
+        self._names = []
+        self._index = {}
+        self._sums[:] = 0.0
+        self._variable_sums[:] = 0.0
+
+    def _add(self, i: int):
+        self._sums += self._values[:, i]
+        if self._variable[i]:
+            self._variable_sums += self._values[:, i]
+
+    def _subtract(self, i: int):
+        self._sums -= self._values[:, i]
+        if self._variable[i]:
+            self._variable_sums -= self._values[:, i]
+
+    def set_variable(self, flags: Union[Sequence[bool], np.ndarray]):
+        """
+        Set the fixed/variable flag of every entry.
+
+        Args:
+            flags: One flag per entry, in storage order
+        """
+        flags = np.asarray(flags, dtype=bool)
+        if flags.shape != (self._size,):
+            raise ValueError(f"Expected {self._size} flags, got {flags.size}")
+        self._variable[:self._size] = flags
+        self._variable_sums = self._values[:, :self._size][:, flags].sum(axis=1)
+
+    def set_categories(self, key: str, mapping: Dict[Any, str], default: Optional[str] = None):
+        """
+        Assign a label column from a name -> label mapping.
+
+        Args:
+            key: 'department', 'branch' or 'role'
+            mapping: Entry name -> label
+            default: Label of unmapped entries (defaults to DEFAULT_CATEGORY)
+        """
+        k = self.CATEGORY_KEYS.index(key)
+        self._codes[k, :self._size] = [self._code(key, mapping.get(name, default)) for name in self._names]
+
+    def total(self, key: str = 'total_cost') -> float:
+        """Running sum of a value column."""
+        return float(self._sums[self.VALUE_KEYS.index(key)])
+
+    def variable_total(self, key: str = 'total_cost') -> float:
+        """Running sum of a value column over the variable entries."""
+        return float(self._variable_sums[self.VALUE_KEYS.index(key)])
+
+    def fixed_total(self, key: str = 'total_cost') -> float:
+        """Running sum of a value column over the fixed entries."""
+        return self.total(key) - self.variable_total(key)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Get the payroll totals.
+
+        Returns:
+            Dictionary with total, fixed, variable, headcount and
+            average_cost_per_employee
+        """
+        total = self.total()
+        headcount = self.total('quantity')
+        return {
+            'total': total,
+            'fixed': self.fixed_total(),
+            'variable': self.variable_total(),
+            'headcount': headcount,
+            'average_cost_per_employee': total / headcount if headcount > 0 else 0,
+        }
+
+    def group_totals(self, by: Union[str, Sequence[str]] = 'department',
+                     value: str = 'total_cost') -> Dict[str, float]:
+        """
+        Sum a value column per group.
+
+        Args:
+            by: 'department', 'branch', 'role', 'variable' or one label per entry
+            value: Value column to sum
+
+        Returns:
+            Dictionary with group -> total, for groups with entries,
+            in order of first appearance
+        """
+        codes, labels = self.group_codes(by)
+        weights = self._values[self.VALUE_KEYS.index(value), :self._size]
+        totals = np.bincount(codes, weights=weights, minlength=len(labels))
+        counts = np.bincount(codes, minlength=len(labels))
+        return {labels[c]: float(totals[c]) for c in self._appearance_order(codes, counts)}
+
+    def monthly_cost(self, months: int = 12, by: Optional[Union[str, Sequence[str]]] = None,
+                     value: str = 'total_cost') -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Cost of the entries active in each month.
+
+        An entry counts from its start month through its end month; the
+        sum is built from start/stop events, so its cost does not depend
+        on the number of months.
+
+        Args:
+            months: Months in the horizon
+            by: Optional grouping (see group_totals)
+            value: Value column to sum
+
+        Returns:
+            Array with one total per month, or group -> array if grouped
+        """
+        n = self._size
+        weights = self._values[self.VALUE_KEYS.index(value), :n]
+        first = np.clip(self._start[:n].astype(np.int64), 1, months + 1) - 1
+        stop = np.clip(self._end[:n].astype(np.int64), 0, months)
+        active = stop > first
+
+        if by is None:
+            codes, labels = np.zeros(n, dtype=np.intp), [None]
+        else:
+            codes, labels = self.group_codes(by)
+
+        width = months + 1
+        events = np.zeros(len(labels) * width)
+        np.add.at(events, codes[active] * width + first[active], weights[active])
+        np.add.at(events, codes[active] * width + stop[active], -weights[active])
+        monthly = np.cumsum(events.reshape(len(labels), width), axis=1)[:, :months]
+
+        if by is None:
+            return monthly[0]
+        counts = np.bincount(codes, minlength=len(labels))
+        return {labels[c]: monthly[c] for c in self._appearance_order(codes, counts)}
+
+    def group_codes(self, by: Union[str, Sequence[str]]):
+        """
+        Group code of every entry.
+
+        Args:
+            by: 'department', 'branch', 'role', 'variable' or one label per entry
+
+        Returns:
+            Tuple of (code per entry, label per code)
+        """
+        n = self._size
+        if isinstance(by, str):
+            if by in self.CATEGORY_KEYS:
+                return self._codes[self.CATEGORY_KEYS.index(by), :n], self._labels[by]
+            if by == 'variable':
+                return self._variable[:n].astype(np.intp), ['Fixo', 'Variável']
+            raise KeyError(by)
+
+        if len(by) != n:
+            raise ValueError(f"Expected {n} labels, got {len(by)}")
+        codes_of: Dict[Any, int] = {}
+        codes = np.array([codes_of.setdefault(label, len(codes_of)) for label in by], dtype=np.intp)
+        return codes.reshape(n), list(codes_of)
+
+    def group_rows(self, values: np.ndarray, by: Union[str, Sequence[str]]) -> Dict[str, np.ndarray]:
+        """
+        Sum per-entry rows (e.g. a monthly projection) per group.
+
+        Args:
+            values: Array with one row per entry
+            by: Grouping (see group_codes)
+
+        Returns:
+            Dictionary with group -> summed row, in order of first appearance
+        """
+        codes, labels = self.group_codes(by)
+        grouped = np.zeros((len(labels),) + values.shape[1:])
+        np.add.at(grouped, codes, values)
+        counts = np.bincount(codes, minlength=len(labels))
+        return {labels[c]: grouped[c] for c in self._appearance_order(codes, counts)}
+
+    @staticmethod
+    def _appearance_order(codes: np.ndarray, counts: np.ndarray) -> Iterable[int]:
+        present = np.flatnonzero(counts)
+        if present.size == 0:
+            return []
+        first_seen = np.full(counts.size, codes.size)
+        np.minimum.at(first_seen, codes, np.arange(codes.size))
+        return present[np.argsort(first_seen[present], kind='stable')].tolist()
@@ -0,0 +1,360 @@
+"""
+Scenario Pipeline Module
+
+Runs the full model (DRE, product aggregation, payroll and AR/AP cash flow)
+once per scenario, in parallel. Products and payroll feed the scenario's
+DRE lines, and through them its cash flow, when the DRE sheet does not
+already carry them. Inputs are parsed once and shared with the
+worker processes through a single shared memory block.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import numpy as np
+
+from .assumptions import AssumptionsManager
+from .cashflow import CashFlowManager
+from .dre import DREMatrix
+from .labeling import get_month_number
+from .payroll import PayrollManager
+from .payroll_table import PayrollTable
+from .product_store import ProductDataView
+
+
+class SharedArrays:
+    """
+    Named float64 arrays packed into one shared memory block.
+
+    The owner creates the block and must unlink it; workers attach by name
+    through the picklable spec and get zero-copy views.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """
+        Copy arrays into a new shared memory block.
+
+        Args:
+            arrays: Name -> array (converted to float64)
+        """
+        layout = {}
+        offset = 0
+        for name, values in arrays.items():
+            values = np.asarray(values, dtype=np.float64)
+            layout[name] = (offset, values.shape)
+            offset += values.size
+
+        self.layout = layout
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1) * 8)
+        self.arrays = self._views(self.shm, layout)
+        for name, values in arrays.items():
+            self.arrays[name][...] = values
+
+    @property
+    def spec(self) -> Tuple[str, Dict[str, Tuple[int, tuple]]]:
+        """Block name and layout, enough for a worker to attach."""
+        return self.shm.name, self.layout
+
+    @staticmethod
+    def _views(shm: shared_memory.SharedMemory,
+               layout: Dict[str, Tuple[int, tuple]]) -> Dict[str, np.ndarray]:
+        buffer = np.ndarray((shm.size // 8,), dtype=np.float64, buffer=shm.buf)
+        return {name: buffer[offset:offset + int(np.prod(shape))].reshape(shape)
+                for name, (offset, shape) in layout.items()}
+
+    @classmethod
+    def attach(cls, spec) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+        """
+        Attach to a block created by another process.
+
+        Args:
+            spec: SharedArrays.spec of the owner
+
+        Returns:
+            Tuple of (handle to close when done, name -> read-only view)
+        """
+        name, layout = spec
+        shm = shared_memory.SharedMemory(name=name)
+        views = cls._views(shm, layout)
+        for view in views.values():
+            view.flags.writeable = False
+        return shm, views
+
+    def close(self):
+        """Release and remove the block."""
+        self.arrays = {}
+        self.shm.close()
+        self.shm.unlink()
+
+
+class ScenarioPipeline:
+    """
+    Full-model scenario runner.
+
+    Each scenario scales the DRE lines, the product lines and the payroll by
+    the ScenarioManager line factors, rebuilds the derived results and runs
+    the cash flow with the scenario's assumptions (including its AR/AP terms).
+    With add_components, the products' revenue and CSV (spread with the
+    scenario's seasonality) and the monthly payroll are added to the DRE
+    lines before the results and the cash flow are computed.
+    """
+
+    # DRE line whose factor scales each product line; derived lines are recomputed
+    PRODUCT_LINE_FACTORS = {
+        'receita_bruta': 'faturamento',
+        'impostos': 'faturamento',
+        'descontos': 'faturamento',
+        'receita_liquida': 'faturamento',
+        'csv': 'csv',
+        'despesas_variaveis': 'custos_variaveis',
+        'rateio_fixos': 'custos_fixos',
+    }
+
+    PRODUCT_LINES = (
+        'receita_bruta', 'impostos', 'descontos', 'receita_liquida', 'csv',
+        'despesas_variaveis', 'rateio_fixos',
+    )
+
+    def __init__(self, scenario_manager, initial_balance: float = 100000.0,
+                 minimum_balance: float = 50000.0):
+        """
+        Initialize the pipeline.
+
+        Args:
+            scenario_manager: ScenarioManager with the scenarios to run
+            initial_balance: Cash at the start of the projection
+            minimum_balance: Minimum safe balance for the risk count
+        """
+        self.scenario_manager = scenario_manager
+        self.initial_balance = initial_balance
+        self.minimum_balance = minimum_balance
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.meta: Dict[str, Any] = {}
+
+    def load_inputs(self, dre_matrix: DREMatrix,
+                    product_data: Optional[Dict[str, Dict[str, float]]] = None,
+                    payroll_roles: Optional[Dict[str, Dict[str, float]]] = None,
+                    variable_roles: Optional[List[str]] = None,
+                    payroll_projection=None, add_components: bool = False):
+        """
+        Pack the parsed inputs into arrays.
+
+        Args:
+            dre_matrix: DREMatrix of the base case (DREManager.load_matrix)
+            product_data: ProductDREAnalyzer.product_data
+            payroll_roles: PayrollManager.table (its variable flags are used as
+                           classified) or PayrollManager.roles
+            variable_roles: Role names whose cost varies with revenue, for
+                            payroll_roles given as a dictionary (defaults to
+                            PayrollManager.DEFAULT_VARIABLE_ROLES)
+            payroll_projection: Optional PayrollProjection (12 months or more)
+                                giving the monthly payroll added to the DRE
+                                (13th salary, vacation bonus); defaults to
+                                the same payroll every month
+            add_components: Add products and payroll to the DRE lines, for a
+                            DRE whose totals are sheet formulas (read as zero)
+        """
+        product_data = product_data or {}
+        payroll_roles = payroll_roles if payroll_roles is not None else {}
+        if variable_roles is None:
+            variable_roles = PayrollManager.DEFAULT_VARIABLE_ROLES
+
+        assumptions = self.scenario_manager.base_assumptions
+        products = list(product_data)
+        categories = [assumptions.get_category_for_product(product) for product in products]
+        category_names = sorted(set(categories))
+        if isinstance(payroll_roles, PayrollTable):
+            payroll = np.array(payroll_roles.column('total_cost'), dtype=np.float64)
+            payroll_variable = np.array(payroll_roles.column('variable'), dtype=np.float64)
+        else:
+            roles = list(payroll_roles)
+            payroll = np.array([payroll_roles[r].get('total_cost', 0.0) for r in roles])
+            payroll_variable = np.array([any(v in r for v in variable_roles) for r in roles],
+                                        dtype=np.float64)
+
+        if isinstance(product_data, ProductDataView):
+            store = product_data.store
+            product_values = store.values[:, [store.LINE_INDEX[line] for line in self.PRODUCT_LINES]]
+        else:
+            product_values = np.array([[product_data[p].get(line, 0.0) for line in self.PRODUCT_LINES]
+                                       for p in products]).reshape(len(products), len(self.PRODUCT_LINES))
+
+        # Calendar month of each DRE month (position when the name is not a month)
+        calendar_months = [get_month_number(month) or i % 12 + 1
+                           for i, month in enumerate(dre_matrix.months)]
+        
+        # Monthly payroll as rows (fixed, variable) over the DRE months
+        variable_mask = payroll_variable > 0
+        if payroll_projection is not None:
+            lines = payroll_projection.dre_lines('accrual', variable_line='custos_variaveis')
+            index = [(month - payroll_projection.first_calendar_month) % 12 for month in calendar_months]
+            payroll_monthly = np.array([lines['custos_fixos'][index], lines['custos_variaveis'][index]])
+        else:
+            payroll_monthly = np.outer([payroll[~variable_mask].sum(), payroll[variable_mask].sum()],
+                                       np.ones(len(calendar_months)))
+        
+        self.arrays = {
+            'dre': dre_matrix.values,
+            'products': product_values,
+            'product_category': np.array([category_names.index(c) for c in categories], dtype=np.float64),
+            'payroll': payroll,
+            'payroll_variable': payroll_variable,
+            'payroll_monthly': payroll_monthly,
+        }
+        self.meta = {
+            'dre_rows': dre_matrix.rows,
+            'months': dre_matrix.months,
+            'calendar_months': calendar_months,
+            'categories': category_names,
+            'add_components': add_components,
+        }
+
+    def run(self, scenario_names: Optional[List[str]] = None,
+            workers: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Run the full model for each scenario.
+
+        Args:
+            scenario_names: Scenarios to run (defaults to all)
+            workers: Processes to use (defaults to one per CPU, capped at the
+                     number of scenarios; 1 runs in-process)
+
+        Returns:
+            Dictionary with scenario -> metrics (annual DRE totals and
+            margins, revenue by category, payroll and cash flow summary)
+        """
+        if not self.arrays:
+            raise ValueError("No inputs loaded; call load_inputs first")
+
+        manager = self.scenario_manager
+        names = scenario_names or manager.get_scenario_list()
+        if workers is None:
+            workers = min(os.cpu_count() or 1, len(names))
+
+        tasks = []
+        for name in names:
+            deltas = manager.scenarios[name]['deltas']
+            factors = {line: float(factor) for line, factor in manager.line_factors(deltas).items()}
+            tasks.append((name, factors, manager.get_scenario_assumptions(name).to_dict()))
+
+        if workers <= 1 or len(tasks) <= 1:
+            results = [run_scenario(self.arrays, self.meta, task, self.initial_balance,
+                                    self.minimum_balance) for task in tasks]
+        else:
+            shared = SharedArrays(self.arrays)
+            try:
+                jobs = [(shared.spec, self.meta, task, self.initial_balance, self.minimum_balance)
+                        for task in tasks]
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(_run_shared_scenario, jobs))
+            finally:
+                shared.close()
+
+        return dict(zip(names, results))
+
+
+def _run_shared_scenario(job) -> Dict[str, float]:
+    """Worker entry point: attach to the shared inputs and run one scenario."""
+    spec, meta, task, initial_balance, minimum_balance = job
+    shm, arrays = SharedArrays.attach(spec)
+    try:
+        return run_scenario(arrays, meta, task, initial_balance, minimum_balance)
+    finally:
+        arrays = None
+        shm.close()
+
+
+def run_scenario(arrays: Dict[str, np.ndarray], meta: Dict[str, Any], task,
+                 initial_balance: float, minimum_balance: float) -> Dict[str, float]:
+    """
+    Run the full model for one scenario.
+
+    Args:
+        arrays: Packed inputs (see ScenarioPipeline.load_inputs)
+        meta: Row, month and category names of the arrays
+        task: Tuple of (scenario name, DRE line factors, assumptions dict)
+        initial_balance: Cash at the start of the projection
+        minimum_balance: Minimum safe balance
+
+    Returns:
+        Dictionary with the scenario metrics
+    """
+    _, factors, assumptions_dict = task
+    rows = meta['dre_rows']
+    metrics = {}
+
+    # Products: scale and recompute contribution
+    products = arrays['products']
+    product_scale = np.array([factors.get(ScenarioPipeline.PRODUCT_LINE_FACTORS[line], 1.0)
+                              for line in ScenarioPipeline.PRODUCT_LINES])
+    scaled = products * product_scale
+    lines = {line: scaled[:, i] for i, line in enumerate(ScenarioPipeline.PRODUCT_LINES)}
+
+    # Payroll: fixed roles follow fixed costs, commercial roles follow revenue
+    payroll_factors = np.array([[factors.get('custos_fixos', 1.0)], [factors.get('faturamento', 1.0)]])
+    payroll_monthly = arrays['payroll_monthly'] * payroll_factors
+
+    # DRE: scale the base lines, add the components it lacks, then rebuild the results
+    scale = np.array([factors.get(row, 1.0) for row in rows]).reshape(-1, 1)
+    dre = DREMatrix(arrays['dre'] * scale, rows, meta['months'])
+    if meta.get('add_components'):
+        seasonality = np.asarray(assumptions_dict['monthly_seasonality'], dtype=np.float64)
+        weights = seasonality[np.asarray(meta['calendar_months']) - 1]
+        dre = _add_lines(dre, {
+            'faturamento': lines['receita_liquida'].sum() * weights,
+            'csv': lines['csv'].sum() * weights,
+            'custos_fixos': payroll_monthly[0],
+            'custos_variaveis': payroll_monthly[1],
+        })
+    revenue = dre.row('faturamento')
+    for line, values in (('faturamento', revenue),
+                         ('lucro_bruto', dre.lucro_bruto()),
+                         ('lair', dre.lair()),
+                         ('lucro_liquido', dre.lucro_liquido())):
+        metrics[line] = float(values.sum())
+    for margin, line in (('margem_bruta_pct', 'lucro_bruto'), ('margem_lair_pct', 'lair')):
+        total = metrics['faturamento']
+        metrics[margin] = metrics[line] / total * 100 if total > 0 else 0.0
+
+    # Product roll-up by category
+    contribution = lines['receita_liquida'] - lines['csv'] - lines['despesas_variaveis']
+    codes = arrays['product_category'].astype(np.intp)
+    by_category = np.bincount(codes, weights=lines['receita_liquida'],
+                              minlength=len(meta['categories']))
+    for category, value in zip(meta['categories'], by_category.tolist()):
+        metrics[f'receita_liquida[{category}]'] = value
+    metrics['margem_contribuicao_produtos'] = float(contribution.sum())
+
+    payroll = arrays['payroll']
+    variable = arrays['payroll_variable'] > 0
+    metrics['folha_fixa'] = float(payroll[~variable].sum() * factors.get('custos_fixos', 1.0))
+    metrics['folha_variavel'] = float(payroll[variable].sum() * factors.get('faturamento', 1.0))
+
+    # Cash flow with the scenario's assumptions (AR/AP terms included)
+    assumptions = AssumptionsManager()
+    assumptions.assumptions = assumptions_dict
+    cashflow = CashFlowManager(assumptions)
+    cashflow.initial_balance = initial_balance
+
+    batch = cashflow.calculate_cashflow_batch(
+        {line: dre.row(line) for line in CashFlowManager.CASHFLOW_LINES if line in dre}
+    )
+    summary = cashflow.get_cashflow_summary_batch(batch)
+    for key in ('net_cashflow', 'ending_balance', 'min_balance'):
+        metrics[key] = float(summary[key][0])
+    metrics['months_below_minimum'] = int(
+        cashflow.check_liquidity_risk_batch(batch, minimum_balance).sum()
+    )
+
+    return metrics
+
+
+def _add_lines(dre: DREMatrix, additions: Dict[str, np.ndarray]) -> DREMatrix:
+    """Add monthly values to DRE lines, appending the lines that are missing."""
+    rows = dre.rows + [line for line in additions if line not in dre]
+    values = np.zeros(dre.values.shape[:-2] + (len(rows), len(dre.months)))
+    values[..., :len(dre.rows), :] = dre.values
+    for line, monthly in additions.items():
+        values[..., rows.index(line), :] += monthly
+    return DREMatrix(values, rows, dre.months)
@@ -0,0 +1,392 @@
+"""
+Product Store Module
+
+Holds product-level DRE data as a products x lines float matrix with an
+integer category code per product, so category roll-ups and product
+metrics are single array passes over thousands of products. A
+ProductRanking kept alongside the store answers top-N queries by partial
+selection and follows product updates without re-sorting the catalog.
+"""
+
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+class ProductStore:
+    """
+    Columnar product DRE.
+
+    Rows are products (in order of first insertion), columns are LINES.
+    Lines never read are reported as absent by the product_data view.
+    """
+
+    # DRE por Produto lines, in column order
+    LINES = (
+        'receita_bruta',
+        'impostos',
+        'descontos',
+        'receita_liquida',
+        'csv',
+        'lucro_bruto',
+        'despesas_variaveis',
+        'margem_contribuicao',
+        'rateio_fixos',
+        'lucro_operacional',
+    )
+    LINE_INDEX = {line: i for i, line in enumerate(LINES)}
+
+    def __init__(self, capacity: int = 32):
+        """
+        Initialize an empty store.
+
+        Args:
+            capacity: Products allocated up front (grows by doubling)
+        """
+        self._size = 0
+        self._names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._values = np.zeros((max(int(capacity), 1), len(self.LINES)))
+        self._codes = np.zeros(max(int(capacity), 1), dtype=np.intp)
+        self.categories: List[str] = []
+        self._category_codes: Dict[str, int] = {}
+        self.found = np.zeros(len(self.LINES), dtype=bool)
+        # Version of the last write to each product (read by ProductRanking)
+        self.version = 0
+        self._stamps = np.zeros(max(int(capacity), 1), dtype=np.int64)
+        self._ranking: Optional["ProductRanking"] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    @property
+    def names(self) -> List[str]:
+        """Product names in row order."""
+        return list(self._names)
+
+    @property
+    def values(self) -> np.ndarray:
+        """Read-only products x LINES matrix."""
+        view = self._values[:self._size].view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def category_codes(self) -> np.ndarray:
+        """Read-only category code of every product (index into categories)."""
+        view = self._codes[:self._size].view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def stamps(self) -> np.ndarray:
+        """Read-only version of the last write to every product."""
+        view = self._stamps[:self._size].view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def ranking(self) -> "ProductRanking":
+        """Top-N ranking kept in sync with this store."""
+        if self._ranking is None:
+            self._ranking = ProductRanking(self)
+        return self._ranking
+
+    @classmethod
+    def from_product_data(cls, product_data: Mapping) -> "ProductStore":
+        """
+        Get the store behind product data, building one from plain dictionaries.
+
+        Args:
+            product_data: ProductDataView or product -> {line: value} dictionary
+
+        Returns:
+            ProductStore holding the products
+        """
+        if isinstance(product_data, ProductDataView):
+            return product_data.store
+        store = cls(capacity=len(product_data))
+        for name, data in product_data.items():
+            lines = [line for line in data if line in cls.LINE_INDEX]
+            store.set_products([name], lines, [[data[line] for line in lines]])
+        return store
+
+    @property
+    def product_data(self) -> "ProductDataView":
+        """Dictionary-like view: product -> {line: value} for the lines read."""
+        return ProductDataView(self)
+
+    def column(self, line: str) -> np.ndarray:
+        """Values of one line for every product (zeros if never read)."""
+        return self.values[:, self.LINE_INDEX[line]]
+
+    def _category_code(self, category: str) -> int:
+        code = self._category_codes.get(category)
+        if code is None:
+            code = self._category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def set_products(self, names: Sequence[str], lines: Sequence[str], values: np.ndarray,
+                     categories: Optional[Sequence[str]] = None):
+        """
+        Add products or overwrite the lines of existing ones.
+
+        Args:
+            names: Product names
+            lines: Lines given, one per column of values
+            values: Array of shape (len(names), len(lines))
+            categories: Category of each product (None keeps the categories
+                        of existing products and leaves new ones uncategorized: '')
+        """
+        names = list(names)
+        values = np.asarray(values, dtype=np.float64).reshape(len(names), len(lines))
+        columns = [self.LINE_INDEX[line] for line in lines]
+
+        rows = np.empty(len(names), dtype=np.intp)
+        for i, name in enumerate(names):
+            row = self._index.get(name)
+            if row is None:
+                row = self._index[name] = len(self._names)
+                self._names.append(name)
+            rows[i] = row
+
+        new_size = len(self._names)
+        if new_size > len(self._values):
+            capacity = len(self._values)
+            while capacity < new_size:
+                capacity *= 2
+            self._values = np.pad(self._values, ((0, capacity - len(self._values)), (0, 0)))
+            self._codes = np.pad(self._codes, (0, capacity - len(self._codes)))
+            self._stamps = np.pad(self._stamps, (0, capacity - len(self._stamps)))
+        if new_size > self._size:
+            self._values[self._size:new_size] = 0.0
+            self._codes[self._size:new_size] = 0 if categories is not None else self._category_code('')
+            self._size = new_size
+
+        self._values[np.ix_(rows, columns)] = values
+        self.version += 1
+        self._stamps[rows] = self.version
+        self.found[columns] = True
+        if categories is not None:
+            self._codes[rows] = [self._category_code(category) for category in categories]
+
+    def categorize(self, classify: Callable[[str], str]):
+        """
+        Recompute every product's category code.
+
+        Args:
+            classify: Product name -> category (e.g. get_category_for_product)
+        """
+        self.categories = []
+        self._category_codes = {}
+        self._codes[:self._size] = [self._category_code(classify(name)) for name in self._names]
+
+    def aggregate(self, lines: Iterable[str] = LINES) -> Dict[str, Dict[str, float]]:
+        """
+        Sum lines per category.
+
+        Args:
+            lines: Lines to sum
+
+        Returns:
+            Dictionary with category -> {line: total}, categories in order of
+            their first product
+        """
+        lines = list(lines)
+        codes = self.category_codes
+        grouped = np.zeros((len(self.categories), len(lines)))
+        np.add.at(grouped, codes, self.values[:, [self.LINE_INDEX[line] for line in lines]])
+
+        present = np.flatnonzero(np.bincount(codes, minlength=len(self.categories)))
+        first_row = np.full(len(self.categories), len(codes))
+        np.minimum.at(first_row, codes, np.arange(len(codes)))
+        order = present[np.argsort(first_row[present], kind='stable')]
+        return {self.categories[c]: dict(zip(lines, grouped[c].tolist())) for c in order}
+
+    def metrics(self) -> Dict[str, np.ndarray]:
+        """
+        Margin percentages of every product (0 without net revenue).
+
+        Returns:
+            Dictionary with margem_bruta_pct, margem_contribuicao_pct and
+            margem_operacional_pct arrays, in row order
+        """
+        receita_liquida = self.column('receita_liquida')
+        positive = receita_liquida > 0
+        metrics = {}
+        for metric, line in (('margem_bruta_pct', 'lucro_bruto'),
+                             ('margem_contribuicao_pct', 'margem_contribuicao'),
+                             ('margem_operacional_pct', 'lucro_operacional')):
+            out = np.zeros(self._size)
+            np.divide(self.column(line), receita_liquida, out=out, where=positive)
+            metrics[metric] = out * 100
+        return metrics
+
+    def row(self, name: str) -> Dict[str, float]:
+        """Lines read for one product."""
+        values = self._values[self._index[name]]
+        return {line: float(values[i]) for i, line in enumerate(self.LINES) if self.found[i]}
+
+
+class ProductDataView(Mapping):
+    """
+    Read-only product -> {line: value} mapping over a ProductStore.
+
+    Keeps the dict-of-dicts interface of ProductDREAnalyzer.product_data;
+    each lookup builds the product's dictionary from its matrix row.
+    """
+
+    def __init__(self, store: ProductStore):
+        self.store = store
+
+    def __getitem__(self, name: str) -> Dict[str, float]:
+        return self.store.row(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.names)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __repr__(self) -> str:
+        return f"ProductDataView({len(self)} products)"
+
+
+class ProductRanking:
+    """
+    Top-N products by any metric of a ProductStore.
+
+    Scores are kept per metric and only the rows written since the last
+    query are rescored. The best rows of each metric are cached; changed
+    rows are merged into that short list, and a partial selection
+    (argpartition) over all scores is only needed when a cached product
+    drops out with nothing known to replace it. Ties keep row order, as a
+    stable sort would.
+    """
+
+    # Metrics derived from lines (besides the lines themselves)
+    DERIVED = ('margem_bruta', 'margem_bruta_pct')
+
+    def __init__(self, store: ProductStore):
+        """
+        Initialize the ranking.
+
+        Args:
+            store: Product store to rank
+        """
+        self.store = store
+        self._version = 0
+        self._scores: Dict[str, np.ndarray] = {}
+        self._top: Dict[str, np.ndarray] = {}
+
+    def _compute(self, metric: str, rows: np.ndarray) -> np.ndarray:
+        values = self.store.values[rows]
+        if metric in ProductStore.LINE_INDEX:
+            return values[:, ProductStore.LINE_INDEX[metric]]
+        receita = values[:, ProductStore.LINE_INDEX['receita_liquida']]
+        margem = receita - values[:, ProductStore.LINE_INDEX['csv']]
+        if metric == 'margem_bruta':
+            return margem
+        if metric == 'margem_bruta_pct':
+            out = np.zeros(len(rows))
+            np.divide(margem, receita, out=out, where=receita > 0)
+            return out * 100
+        raise KeyError(f"Unknown ranking metric: {metric}")
+
+    def _sync(self):
+        """Rescore the rows written since the last query and patch the cached tops."""
+        if self.store.version == self._version:
+            return
+        changed = np.flatnonzero(self.store.stamps > self._version)
+        self._version = self.store.version
+
+        for metric, scores in self._scores.items():
+            if len(scores) < len(self.store):
+                scores = self._scores[metric] = np.pad(scores, (0, len(self.store) - len(scores)))
+            top = self._top.get(metric)
+            last = top[-1] if top is not None and len(top) else None
+            last_score = scores[last] if last is not None else None
+            scores[changed] = self._compute(metric, changed)
+            if last is None:
+                continue
+
+            # Every row outside the cached top ranks below its last entry, so
+            # the new top is among the unchanged top rows and the changed rows
+            # that now rank above that entry
+            new_scores = scores[changed]
+            better = changed[(new_scores > last_score) | ((new_scores == last_score) & (changed <= last))]
+            candidates = np.union1d(top[~np.isin(top, changed)], better)
+            if len(candidates) < len(top):
+                del self._top[metric]
+            else:
+                self._top[metric] = self._order(scores, candidates)[:len(top)]
+
+    @staticmethod
+    def _order(scores: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Sort rows by descending score, then ascending row."""
+        return rows[np.lexsort((rows, -scores[rows]))]
+
+    def scores(self, metric: str = 'receita_liquida') -> np.ndarray:
+        """
+        Score of every product for a metric.
+
+        Args:
+            metric: A store line, 'margem_bruta' or 'margem_bruta_pct'
+
+        Returns:
+            Read-only array in row order
+        """
+        self._sync()
+        if metric not in self._scores:
+            self._scores[metric] = self._compute(metric, np.arange(len(self.store)))
+        view = self._scores[metric].view()
+        view.flags.writeable = False
+        return view
+
+    def top_rows(self, n: int = 10, metric: str = 'receita_liquida') -> np.ndarray:
+        """
+        Row indices of the n best products, best first.
+
+        Args:
+            n: Number of products
+            metric: A store line, 'margem_bruta' or 'margem_bruta_pct'
+
+        Returns:
+            Array of at most n row indices
+        """
+        scores = self.scores(metric)
+        n = min(max(int(n), 0), len(scores))
+        top = self._top.get(metric)
+        if top is not None and len(top) >= n:
+            return top[:n]
+        if n == 0:
+            return np.zeros(0, dtype=np.intp)
+
+        # Partial selection: everything above the n-th score, then ties at
+        # that score in row order
+        threshold = np.partition(-scores, n - 1)[n - 1]
+        above = np.flatnonzero(-scores < threshold)
+        ties = np.flatnonzero(-scores == threshold)[:n - len(above)]
+        top = self._order(scores, np.concatenate([above, ties]))
+        self._top[metric] = top
+        return top
+
+    def top(self, n: int = 10, metric: str = 'receita_liquida') -> List[Tuple[str, float]]:
+        """
+        The n best products for a metric.
+
+        Args:
+            n: Number of products
+            metric: A store line, 'margem_bruta' or 'margem_bruta_pct'
+
+        Returns:
+            List of (product, score) tuples, best first
+        """
+        rows = self.top_rows(n, metric)
+        names = self.store._names
+        scores = self._scores[metric]
+        return [(names[row], float(scores[row])) for row in rows]
@@ -5,7 +5,11 @@ Aggregates product-level P&L data into category-level summaries for the main DRE
 """
 
 from typing import Dict, List, Tuple, Optional
-from .labeling import LabelDetector
+import numpy as np
+from .labeling import LabelDetector, compile_labels, get_month_number
+from .matcher import EXACT, CONTAINED
+from .grid import as_grid
+from .product_store import ProductStore, ProductDataView
 
 
 class ProductDREAnalyzer:
@@ -13,6 +17,49 @@ class ProductDREAnalyzer:
     Analyzes product-level DRE and aggregates by category.
     """
     
+    # Row labels of the DRE por Produto sheet (first match in this order wins)
+    ROW_LABELS = {
+        'receita_bruta': ['Receita Bruta'],
+        'impostos': ['Impostos'],
+        'descontos': ['Devoluções e descontos'],
+        'receita_liquida': ['Receita Líquida'],
+        'csv': ['Custo dos Serviços Vendidos'],
+        'lucro_bruto': ['Lucro Bruto'],
+        'despesas_variaveis': ['Despesas Variáveis'],
+        'margem_contribuicao': ['Margem de Contribuição'],
+        'rateio_fixos': ['Rateio das Despesas Fixas'],
+        'lucro_operacional': ['Lucro Operacional'],
+    }
+    ROW_LABEL_MATCHER = compile_labels(ROW_LABELS)
+    
+    # Categories of the main DRE; CSV rows are registered first so
+    # "(-) CSV ... - Cursos" is not taken for the "Cursos" revenue row
+    DRE_CATEGORIES = ['Odonto e Estética', 'Cursos', 'Implante Capilar']
+    DRE_ROW_KEYS = {
+        **{f'csv:{c}': ('csv', c) for c in DRE_CATEGORIES},
+        **{f'revenue:{c}': ('revenue', c) for c in DRE_CATEGORIES},
+    }
+    DRE_ROW_MATCHER = compile_labels({
+        **{f'csv:{c}': [f'CSV (Custo do Serviço Vendido) - {c}', f'CSV - {c}'] for c in DRE_CATEGORIES},
+        **{f'revenue:{c}': [c] for c in DRE_CATEGORIES},
+    })
+    
+    # Product line feeding the category revenue rows (the DRE has no
+    # tax/discount lines above the gross profit)
+    REVENUE_LINE = 'receita_liquida'
+    
+    # Lines summed per category
+    AGGREGATE_LINES = [
+        'receita_bruta',
+        'impostos',
+        'descontos',
+        'receita_liquida',
+        'csv',
+        'lucro_bruto',
+        'despesas_variaveis',
+        'margem_contribuicao',
+    ]
+    
     def __init__(self, assumptions_manager):
         """
         Initialize analyzer with assumptions.
@@ -23,29 +70,43 @@ class ProductDREAnalyzer:
         self.assumptions = assumptions_manager
         self.label_detector = LabelDetector()
         self.products = []
-        self.product_data = {}
+        self.store = ProductStore()
+        
+        # Assumptions the store's category codes were computed with
+        self._categorized_with = None
+    
+    @property
+    def product_data(self) -> ProductDataView:
+        """Product -> {line: value} view of the product store."""
+        return self.store.product_data
+    
+    def _ensure_categories(self):
+        """Categorize the products once per version of the assumptions."""
+        current = self.assumptions.assumptions
+        if self._categorized_with is not current:
+            self.store.categorize(self.assumptions.get_category_for_product)
+            self._categorized_with = current
     
     def read_product_dre(self, worksheet) -> Dict[str, Dict[str, float]]:
         """
         Read product-level DRE from worksheet.
         
         Args:
-            worksheet: DRE por Produto worksheet
+            worksheet: DRE por Produto worksheet or its SheetGrid
             
         Returns:
             Dictionary with product data
         """
+        grid = as_grid(worksheet)
+        
         # Find product names in row 3
         product_row = 3
         products_by_col = {}
         
-        for col in range(4, worksheet.max_column + 1):
-            cell = worksheet.cell(row=product_row, column=col)
-            if cell.value:
-                product_name = str(cell.value).strip()
-                if product_name and product_name not in ['DRE', 'Total', '']:
-                    products_by_col[col] = product_name
-                    self.products.append(product_name)
+        for _, col, product_name in grid.iter_text(product_row, product_row, 4, grid.max_column):
+            if product_name not in ['DRE', 'Total']:
+                products_by_col[col] = product_name
+                self.products.append(product_name)
         
         print(f"Found {len(products_by_col)} products: {list(products_by_col.values())}")
         
@@ -63,43 +124,19 @@ class ProductDREAnalyzer:
             'lucro_operacional': None,
         }
         
-        # Search for row labels
-        label_map = {
-            'Receita Bruta': 'receita_bruta',
-            'Impostos': 'impostos',
-            'Devoluções e descontos': 'descontos',
-            'Receita Líquida': 'receita_liquida',
-            'Custo dos Serviços Vendidos': 'csv',
-            'Lucro Bruto': 'lucro_bruto',
-            'Despesas Variáveis': 'despesas_variaveis',
-            'Margem de Contribuição': 'margem_contribuicao',
-            'Rateio das Despesas Fixas': 'rateio_fixos',
-            'Lucro Operacional': 'lucro_operacional',
-        }
-        
-        for row in range(1, min(30, worksheet.max_row + 1)):
-            cell = worksheet.cell(row=row, column=2)
-            if cell.value:
-                cell_text = str(cell.value).strip()
-                for label, key in label_map.items():
-                    if self.label_detector.fuzzy_match(cell_text, label):
-                        row_mapping[key] = row
-                        break
+        # Search for row labels: one scan of the label column classifies every row
+        for row, hits in self.label_detector.classify_column(
+                grid, 2, 1, 29, matcher=self.ROW_LABEL_MATCHER):
+            row_mapping[hits[0].key] = row
         
         print(f"Row mapping: {row_mapping}")
         
         # Extract data for each product
-        for col, product_name in products_by_col.items():
-            self.product_data[product_name] = {}
-            
-            for key, row in row_mapping.items():
-                if row is not None:
-                    cell = worksheet.cell(row=row, column=col)
-                    value = cell.value
-                    if value is not None and isinstance(value, (int, float)):
-                        self.product_data[product_name][key] = float(value)
-                    else:
-                        self.product_data[product_name][key] = 0.0
+        found_keys = [key for key, row in row_mapping.items() if row is not None]
+        values = grid.numbers_at([row_mapping[key] for key in found_keys], list(products_by_col))
+        
+        self.store.set_products(list(products_by_col.values()), found_keys, values.T)
+        self._categorized_with = None
         
         return self.product_data
     
@@ -110,29 +147,8 @@ class ProductDREAnalyzer:
         Returns:
             Dictionary with category-level aggregates
         """
-        category_data = {}
-        
-        for product, data in self.product_data.items():
-            category = self.assumptions.get_category_for_product(product)
-            
-            if category not in category_data:
-                category_data[category] = {
-                    'receita_bruta': 0.0,
-                    'impostos': 0.0,
-                    'descontos': 0.0,
-                    'receita_liquida': 0.0,
-                    'csv': 0.0,
-                    'lucro_bruto': 0.0,
-                    'despesas_variaveis': 0.0,
-                    'margem_contribuicao': 0.0,
-                }
-            
-            # Sum up values
-            for key in category_data[category].keys():
-                if key in data:
-                    category_data[category][key] += data[key]
-        
-        return category_data
+        self._ensure_categories()
+        return self.store.aggregate(self.AGGREGATE_LINES)
     
     def calculate_product_metrics(self, product_name: str) -> Dict[str, float]:
         """
@@ -164,65 +180,117 @@ class ProductDREAnalyzer:
         
         return metrics
     
+    def calculate_all_product_metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Calculate key metrics for every product in one pass.
+        
+        Returns:
+            Dictionary with product -> metrics (see calculate_product_metrics)
+        """
+        metrics = self.store.metrics()
+        columns = {name: values.tolist() for name, values in metrics.items()}
+        return {
+            product: {name: values[i] for name, values in columns.items()}
+            for i, product in enumerate(self.store.names)
+        }
+    
+    def distribute_monthly_by_category(self, seasonality: Optional[List[float]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Distribute each category's annual revenue and CSV over the months.
+        
+        Args:
+            seasonality: Optional list of 12 seasonality weights
+                         (defaults to monthly_seasonality)
+            
+        Returns:
+            Dictionary with category -> {'revenue': 12 values, 'csv': 12 values}
+        """
+        if seasonality is None:
+            seasonality = self.assumptions.assumptions["monthly_seasonality"]
+        weights = np.asarray(seasonality, dtype=np.float64)
+        
+        aggregates = self.aggregate_by_category()
+        categories = list(aggregates)
+        annual = np.array([[aggregates[c][self.REVENUE_LINE], aggregates[c]['csv']] for c in categories])
+        monthly = annual.reshape(len(categories), 2, 1) * weights
+        
+        return {
+            category: {'revenue': monthly[i, 0], 'csv': monthly[i, 1]}
+            for i, category in enumerate(categories)
+        }
+    
+    def find_category_rows(self, dre_worksheet, month_row: int = 1) -> Dict[str, Dict[str, int]]:
+        """
+        Locate the revenue and CSV rows of each category in the main DRE.
+        
+        Args:
+            dre_worksheet: Main DRE worksheet or its SheetGrid
+            month_row: Row of the month headers (the scan starts below it)
+            
+        Returns:
+            Dictionary with category -> {'revenue': row, 'csv': row} for the rows found
+        """
+        rows: Dict[str, Dict[str, int]] = {}
+        for row, hits in self.label_detector.classify_column(
+                dre_worksheet, 2, month_row + 1, month_row + 50,
+                matcher=self.DRE_ROW_MATCHER, kinds=(EXACT, CONTAINED)):
+            line, category = self.DRE_ROW_KEYS[hits[0].key]
+            rows.setdefault(category, {}).setdefault(line, row)
+        return rows
+    
     def write_aggregated_to_dre(self, workbook_manager, dre_worksheet, month_row: int, month_cols: Dict[str, int]):
         """
         Write aggregated category data to main DRE sheet.
         
+        Each category's revenue and CSV are distributed over the months with
+        the seasonality weights and written in one range per block of
+        adjacent rows. Categories without product values are left untouched,
+        as are cells holding formulas.
+        
         Args:
             workbook_manager: ExcelWorkbookManager instance
             dre_worksheet: Main DRE worksheet
             month_row: Row number where months are
             month_cols: Dictionary of month names to columns
+            
+        Returns:
+            Dictionary with DRE row -> {column: value} of the cells written
+            (rows whose cells all hold formulas are left out)
         """
-        # For now, we'll write annual totals
-        # In a full implementation, this would distribute monthly
-        
-        category_aggregates = self.aggregate_by_category()
+        category_rows = self.find_category_rows(workbook_manager.get_grid(dre_worksheet), month_row)
+        print(f"Category rows: {category_rows}")
         
-        # Find category rows in DRE
-        category_rows = {
-            "Odonto e Estética": None,
-            "Cursos": None,
-            "Implante Capilar": None,
-        }
+        # Month columns in calendar order
+        columns = [col for _, col in sorted(month_cols.items(), key=lambda item: get_month_number(item[0]))]
         
-        csv_rows = {
-            "Odonto e Estética": None,
-            "Cursos": None,
-            "Implante Capilar": None,
-        }
+        values_by_row = {}
+        for category, lines in self.distribute_monthly_by_category().items():
+            if category not in category_rows:
+                print(f"Warning: No DRE rows for category {category}")
+                continue
+            if not any(lines[line].any() for line in lines):
+                continue
+            for line, row in category_rows[category].items():
+                values_by_row[row] = lines[line]
         
-        # Search for category rows
-        for row in range(1, min(50, dre_worksheet.max_row + 1)):
-            cell = dre_worksheet.cell(row=row, column=2)
-            if cell.value:
-                cell_text = str(cell.value).strip()
-                
-                if "Odonto e Est" in cell_text:
-                    category_rows["Odonto e Estética"] = row
-                elif "Cursos" == cell_text:
-                    category_rows["Cursos"] = row
-                elif "Implante Capilar" in cell_text:
-                    category_rows["Implante Capilar"] = row
-                
-                # CSV rows
-                if "CSV" in cell_text and "Odo" in cell_text:
-                    csv_rows["Odonto e Estética"] = row
-                elif "CSV" in cell_text and "Cur" in cell_text:
-                    csv_rows["Cursos"] = row
-                elif "CSV" in cell_text and "Imp" in cell_text:
-                    csv_rows["Implante Capilar"] = row
+        if not values_by_row:
+            print("No product values to write to the DRE")
+            return {}
         
-        print(f"Category rows: {category_rows}")
-        print(f"CSV rows: {csv_rows}")
+        # One range write per block of adjacent rows (and adjacent month columns)
+        target_rows = sorted(values_by_row)
+        written = {}
+        for first_row, n_rows in _runs(target_rows):
+            block = np.array([values_by_row[row] for row in range(first_row, first_row + n_rows)])
+            for first_col, n_cols in _runs(columns):
+                start = columns.index(first_col)
+                cells = workbook_manager.write_range(dre_worksheet, first_row, first_col,
+                                                     block[:, start:start + n_cols].tolist(),
+                                                     preserve_formulas=True)
+                for row, col in cells:
+                    written.setdefault(row, {})[col] = float(block[row - first_row, start + col - first_col])
         
-        # Write data (this is simplified - in full implementation, would distribute monthly)
-        # For now, just log what would be written
-        for category, data in category_aggregates.items():
-            print(f"\nCategory: {category}")
-            print(f"  Receita Líquida: {data['receita_liquida']:,.2f}")
-            print(f"  CSV: {data['csv']:,.2f}")
-            print(f"  Lucro Bruto: {data['lucro_bruto']:,.2f}")
+        return written
     
     def get_product_list(self) -> List[str]:
         """Get list of all products."""
@@ -232,3 +300,13 @@ class ProductDREAnalyzer:
         """Get summary by category with totals."""
         return self.aggregate_by_category()
 
+
+def _runs(values: List[int]) -> List[Tuple[int, int]]:
+    """Split sorted integers into (start, length) runs of consecutive values."""
+    runs = []
+    for value in values:
+        if runs and value == runs[-1][0] + runs[-1][1]:
+            runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+        else:
+            runs.append((value, 1))
+    return runs
@@ -0,0 +1,189 @@
+"""
+Scenario Cache Module
+
+Memoizes scenario results under a canonical hash of everything they depend
+on, with a bounded LRU store and optional persistence to disk.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import copy
+import hashlib
+import json
+import os
+import threading
+
+
+def canonical_key(*parts: Any) -> str:
+    """
+    Hash JSON-like values into a stable cache key.
+
+    Dictionaries are hashed with sorted keys and tuples as lists, so two
+    equal inputs always give the same key regardless of insertion order.
+
+    Args:
+        *parts: Values to hash (e.g. assumptions, deltas, data version)
+
+    Returns:
+        Hex sha256 digest
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'),
+                         ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    # NumPy scalars/arrays and other iterables (e.g. read-only mappings)
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'items'):
+        return dict(value.items())
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Cannot hash value of type {type(value).__name__}")
+
+
+class ScenarioCache:
+    """
+    Bounded LRU cache of scenario results.
+
+    Values are deep-copied on the way in and out so callers can never
+    mutate a cached result. Access is locked, so one cache can be shared
+    by threads (e.g. the sessions of the web dashboard).
+    """
+
+    # Bump when the stored format changes
+    CACHE_VERSION = 1
+
+    def __init__(self, max_entries: int = 256, cache_path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            cache_path: JSON file backing the cache (None keeps it in memory)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.max_entries = max_entries
+        self.cache_path = cache_path
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if cache_path and os.path.exists(cache_path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a cached value and mark it as recently used.
+
+        Args:
+            key: Cache key (see canonical_key)
+            default: Value returned on a miss
+
+        Returns:
+            Copy of the cached value, or default
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return copy.deepcopy(self._entries[key])
+
+    def put(self, key: str, value: Any):
+        """
+        Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key (see canonical_key)
+            value: Result to cache
+        """
+        with self._lock:
+            self._entries[key] = copy.deepcopy(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, computing and storing it on a miss.
+
+        Args:
+            key: Cache key (see canonical_key)
+            compute: Callable producing the value
+
+        Returns:
+            The cached or newly computed value
+        """
+        with self._lock:
+            if key in self._entries:
+                return self.get(key)
+            self.misses += 1
+
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get usage counters for sizing the cache.
+
+        Returns:
+            Dictionary with hits, misses, evictions, entries and hit_rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def load(self):
+        """Load entries from the cache file, ignoring unreadable or outdated files."""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read scenario cache: {e}")
+            return
+
+        if data.get('version') != self.CACHE_VERSION:
+            return
+
+        for key, value in data.get('entries', []):
+            self.put(key, value)
+
+    def save(self):
+        """Write entries to the cache file, least recently used first."""
+        if not self.cache_path:
+            return
+
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.CACHE_VERSION, 'entries': list(self._entries.items())},
+                      f, ensure_ascii=False, default=_json_default)
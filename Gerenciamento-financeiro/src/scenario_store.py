@@ -0,0 +1,338 @@
+"""
+Scenario Store Module
+
+Persists scenario definitions and computed results in a local SQLite file,
+with one indexed column per key metric so ranking and threshold queries
+stay fast over large numbers of stored runs.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import sqlite3
+
+
+class ScenarioStore:
+    """
+    SQLite repository of scenarios and their runs.
+
+    A run is one set of computed metrics. Runs of named scenarios point to
+    their definition; runs of a sweep only carry their deltas.
+    """
+
+    # Metrics stored in their own indexed column (the only ones usable in
+    # top() ordering and bounds); every metric is also kept in the JSON blob
+    INDEXED_METRICS = (
+        'revenue',
+        'lucro_bruto',
+        'lair',
+        'lucro_liquido',
+        'margem_bruta_pct',
+        'margem_lair_pct',
+        'ending_balance',
+        'min_balance',
+        'months_below_minimum',
+    )
+
+    # Result keys stored under another metric column
+    METRIC_ALIASES = {'faturamento': 'revenue'}
+
+    def __init__(self, db_path: str = ":memory:"):
+        """
+        Open (and create if needed) the store.
+
+        Args:
+            db_path: SQLite file path (":memory:" for a temporary store)
+        """
+        if db_path != ":memory:":
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        metric_columns = ",\n".join(f"    {metric} REAL" for metric in self.INDEXED_METRICS)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS scenarios (\n"
+                "    id INTEGER PRIMARY KEY,\n"
+                "    name TEXT NOT NULL UNIQUE,\n"
+                "    description TEXT,\n"
+                "    deltas TEXT NOT NULL,\n"
+                "    updated_at TEXT NOT NULL\n"
+                ")"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs (\n"
+                "    id INTEGER PRIMARY KEY,\n"
+                "    scenario_id INTEGER REFERENCES scenarios(id) ON DELETE CASCADE,\n"
+                "    label TEXT,\n"
+                "    data_version TEXT,\n"
+                "    created_at TEXT NOT NULL,\n"
+                "    deltas TEXT NOT NULL,\n"
+                "    metrics TEXT NOT NULL,\n"
+                f"{metric_columns}\n"
+                ")"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_scenario ON runs (scenario_id, id)")
+            for metric in self.INDEXED_METRICS:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_runs_{metric} ON runs ({metric})")
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    def __enter__(self) -> "ScenarioStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _column(self, metric: str) -> str:
+        """Whitelisted column of a metric (column names cannot be bound)."""
+        column = self.METRIC_ALIASES.get(metric, metric)
+        if column not in self.INDEXED_METRICS:
+            raise ValueError(f"Metric is not indexed: {metric}")
+        return column
+
+    def save_scenario(self, name: str, description: str, deltas: Dict[str, float]) -> int:
+        """
+        Add or update a scenario definition.
+
+        Args:
+            name: Scenario name
+            description: Scenario description
+            deltas: Dictionary of parameter deltas
+
+        Returns:
+            Scenario id
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO scenarios (name, description, deltas, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET description = excluded.description, "
+                "deltas = excluded.deltas, updated_at = excluded.updated_at",
+                (name, description, json.dumps(deltas, sort_keys=True), _now()),
+            )
+        return self._scenario_id(name)
+
+    def save_scenarios(self, scenario_manager):
+        """
+        Save every scenario of a ScenarioManager.
+
+        Args:
+            scenario_manager: ScenarioManager instance
+        """
+        for name, scenario in scenario_manager.scenarios.items():
+            self.save_scenario(name, scenario['description'], scenario['deltas'])
+
+    def seed_scenarios(self, scenario_manager) -> int:
+        """
+        Save the scenarios of a ScenarioManager that the store does not have yet.
+
+        Args:
+            scenario_manager: ScenarioManager instance
+
+        Returns:
+            Number of scenarios added
+        """
+        now = _now()
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT INTO scenarios (name, description, deltas, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(name) DO NOTHING",
+                [(name, scenario['description'], json.dumps(scenario['deltas'], sort_keys=True), now)
+                 for name, scenario in scenario_manager.scenarios.items()],
+            )
+        return cursor.rowcount
+
+    def load_scenarios(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load scenario definitions.
+
+        Returns:
+            Dictionary in the format of ScenarioManager.scenarios
+        """
+        rows = self.conn.execute("SELECT name, description, deltas FROM scenarios ORDER BY id")
+        return {
+            row['name']: {'description': row['description'], 'deltas': json.loads(row['deltas'])}
+            for row in rows
+        }
+
+    def delete_scenario(self, name: str):
+        """Delete a scenario and its runs."""
+        with self.conn:
+            scenario_id = self._scenario_id(name)
+            self.conn.execute("DELETE FROM runs WHERE scenario_id = ?", (scenario_id,))
+            self.conn.execute("DELETE FROM scenarios WHERE id = ?", (scenario_id,))
+
+    def _scenario_id(self, name: str) -> Optional[int]:
+        row = self.conn.execute("SELECT id FROM scenarios WHERE name = ?", (name,)).fetchone()
+        return row['id'] if row else None
+
+    def _run_row(self, scenario_id: Optional[int], label: Optional[str],
+                 data_version: Optional[str], created_at: str,
+                 deltas: Dict[str, float], metrics: Dict[str, float]) -> tuple:
+        indexed = {self.METRIC_ALIASES.get(key, key): value for key, value in metrics.items()}
+        return (
+            scenario_id, label, data_version, created_at,
+            json.dumps(deltas, sort_keys=True), json.dumps(metrics, sort_keys=True),
+            *[indexed.get(metric) for metric in self.INDEXED_METRICS],
+        )
+
+    def _insert_runs(self, rows: Iterable[tuple]) -> int:
+        columns = ("scenario_id, label, data_version, created_at, deltas, metrics, "
+                   + ", ".join(self.INDEXED_METRICS))
+        placeholders = ", ".join("?" * (6 + len(self.INDEXED_METRICS)))
+        with self.conn:
+            cursor = self.conn.executemany(
+                f"INSERT INTO runs ({columns}) VALUES ({placeholders})", rows
+            )
+        return cursor.rowcount
+
+    def record_runs(self, results: Dict[str, Dict[str, float]],
+                    data_version: Optional[str] = None,
+                    scenarios: Optional[Dict[str, Dict[str, Any]]] = None,
+                    skip_recorded: bool = False) -> int:
+        """
+        Record the results of named scenarios in one transaction.
+
+        Args:
+            results: Scenario name -> metrics (e.g. get_scenario_comparison
+                     or ScenarioPipeline.run)
+            data_version: Identifier of the input data the results came from
+            scenarios: Definitions to save first (e.g. ScenarioManager.scenarios);
+                       results of unknown scenarios are rejected otherwise
+            skip_recorded: Skip scenarios already recorded for this
+                           data_version with the same deltas
+
+        Returns:
+            Number of runs recorded
+        """
+        if scenarios:
+            for name in results:
+                if name in scenarios:
+                    scenario = scenarios[name]
+                    self.save_scenario(name, scenario['description'], scenario['deltas'])
+
+        created_at = _now()
+        definitions = self.load_scenarios()
+        rows = []
+        for name, metrics in results.items():
+            scenario_id = self._scenario_id(name)
+            if scenario_id is None:
+                raise ValueError(f"Unknown scenario: {name}")
+            deltas = json.dumps(definitions[name]['deltas'], sort_keys=True)
+            if skip_recorded and self.conn.execute(
+                    "SELECT 1 FROM runs WHERE scenario_id = ? AND data_version IS ? AND deltas = ? LIMIT 1",
+                    (scenario_id, data_version, deltas)).fetchone():
+                continue
+            rows.append(self._run_row(scenario_id, name, data_version, created_at,
+                                      definitions[name]['deltas'], metrics))
+        if not rows:
+            return 0
+        return self._insert_runs(rows)
+
+    def record_table(self, table, label: Optional[str] = None,
+                     data_version: Optional[str] = None) -> int:
+        """
+        Record every row of a sweep as an anonymous run.
+
+        Args:
+            table: ScenarioTable from ScenarioManager.sweep_scenarios
+            label: Label shared by the runs (e.g. the sweep name)
+            data_version: Identifier of the input data
+
+        Returns:
+            Number of runs recorded
+        """
+        created_at = _now()
+        parameters = list(table.axes)
+        columns = {name: table.column(name).tolist() for name in table.columns}
+
+        def rows():
+            for i in range(len(table)):
+                deltas = {name: columns[name][i] for name in parameters}
+                metrics = {name: columns[name][i] for name in table.metrics}
+                yield self._run_row(None, label, data_version, created_at, deltas, metrics)
+
+        return self._insert_runs(rows())
+
+    def top(self, metric: str, n: int = 20, ascending: bool = False,
+            label: Optional[str] = None, **bounds: Tuple[Optional[float], Optional[float]]
+            ) -> List[Dict[str, Any]]:
+        """
+        Rank stored runs by an indexed metric.
+
+        Args:
+            metric: Metric to rank by (see INDEXED_METRICS)
+            n: Number of runs to return
+            ascending: True for the lowest values first
+            label: Only runs with this label
+            **bounds: metric=(low, high) inclusive bounds (None for open ends)
+
+        Returns:
+            List of run dictionaries, best first
+        """
+        order = self._column(metric)
+        where = [f"{order} IS NOT NULL"]
+        params: List[Any] = []
+        for name, (low, high) in bounds.items():
+            column = self._column(name)
+            if low is not None:
+                where.append(f"{column} >= ?")
+                params.append(low)
+            if high is not None:
+                where.append(f"{column} <= ?")
+                params.append(high)
+        if label is not None:
+            where.append("runs.label = ?")
+            params.append(label)
+
+        rows = self.conn.execute(
+            "SELECT runs.id, scenarios.name, runs.label, runs.data_version, runs.created_at, "
+            "runs.deltas, runs.metrics FROM runs LEFT JOIN scenarios ON scenarios.id = runs.scenario_id "
+            f"WHERE {' AND '.join(where)} "
+            f"ORDER BY {order} {'ASC' if ascending else 'DESC'} LIMIT ?",
+            params + [n],
+        )
+        return [self._run_dict(row) for row in rows]
+
+    def latest_runs(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the most recent run of every named scenario.
+
+        Returns:
+            Dictionary with scenario name -> run dictionary
+        """
+        rows = self.conn.execute(
+            "SELECT runs.id, scenarios.name, runs.label, runs.data_version, runs.created_at, "
+            "runs.deltas, runs.metrics FROM scenarios JOIN runs ON runs.id = "
+            "(SELECT MAX(id) FROM runs WHERE runs.scenario_id = scenarios.id) ORDER BY scenarios.id"
+        )
+        return {row['name']: self._run_dict(row) for row in rows}
+
+    def count_runs(self) -> int:
+        """Number of stored runs."""
+        return self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    @staticmethod
+    def _run_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'run_id': row['id'],
+            'scenario': row['name'],
+            'label': row['label'],
+            'data_version': row['data_version'],
+            'created_at': row['created_at'],
+            'deltas': json.loads(row['deltas']),
+            'metrics': json.loads(row['metrics']),
+        }
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
@@ -4,8 +4,139 @@ Scenarios Module for Budget Scenario Analysis
 Allows creating and comparing different budget scenarios with parameter variations.
 """
 
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 import copy
+import numpy as np
+
+from .assumptions import LayeredAssumptions
+from .scenario_cache import ScenarioCache, canonical_key
+
+
+class ScenarioTable:
+    """
+    Flat result table of a scenario sweep.
+    
+    Metric columns are stored flattened over the parameter grid; parameter
+    columns are derived from the row index on demand, so the table stays small
+    for millions of combinations. Filtering returns a view over a subset of
+    rows.
+    """
+    
+    def __init__(self, axes: Dict[str, np.ndarray], metrics: Dict[str, np.ndarray],
+                 index: Optional[np.ndarray] = None):
+        """
+        Initialize the table.
+        
+        Args:
+            axes: Parameter name -> values along its grid axis
+            metrics: Metric name -> flattened values over the full grid
+            index: Flat grid positions of the rows (None for every combination)
+        """
+        self.axes = axes
+        self.metrics = metrics
+        self.shape = tuple(len(values) for values in axes.values())
+        self.index = index
+    
+    def __len__(self) -> int:
+        if self.index is None:
+            return int(np.prod(self.shape))
+        return len(self.index)
+    
+    @property
+    def columns(self) -> List[str]:
+        """Parameter and metric column names."""
+        return list(self.axes) + list(self.metrics)
+    
+    def _positions(self) -> np.ndarray:
+        if self.index is None:
+            return np.arange(len(self))
+        return self.index
+    
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a column for the rows of the table.
+        
+        Args:
+            name: Parameter or metric name
+            
+        Returns:
+            Array with one value per row
+        """
+        if name in self.metrics:
+            values = self.metrics[name]
+            return values if self.index is None else values[self.index]
+        
+        if name in self.axes:
+            axis = list(self.axes).index(name)
+            coords = np.unravel_index(self._positions(), self.shape)[axis]
+            return self.axes[name][coords]
+        
+        raise KeyError(f"Unknown column: {name}")
+    
+    def filter(self, mask: Optional[np.ndarray] = None, **bounds) -> "ScenarioTable":
+        """
+        Keep the rows matching a mask and/or column bounds.
+        
+        Args:
+            mask: Boolean array aligned with the rows
+            **bounds: column=(low, high) inclusive bounds (None for open ends)
+            
+        Returns:
+            ScenarioTable over the selected rows
+        """
+        keep = np.ones(len(self), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        for name, (low, high) in bounds.items():
+            values = self.column(name)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+        
+        return ScenarioTable(self.axes, self.metrics, self._positions()[keep])
+    
+    def top(self, metric: str, n: int = 10, ascending: bool = False) -> List[Dict[str, float]]:
+        """
+        Rank the rows by a metric.
+        
+        Args:
+            metric: Column to rank by
+            n: Number of rows to return
+            ascending: True for the lowest values first
+            
+        Returns:
+            List of row dictionaries, best first
+        """
+        values = self.column(metric)
+        n = min(n, len(values))
+        if n == 0:
+            return []
+        
+        keys = values if ascending else -values
+        best = np.argpartition(keys, n - 1)[:n]
+        best = best[np.argsort(keys[best], kind='stable')]
+        return self.rows(best)
+    
+    def rows(self, positions: Iterable[int]) -> List[Dict[str, float]]:
+        """
+        Get rows as dictionaries.
+        
+        Args:
+            positions: Row positions within this table
+            
+        Returns:
+            List of {column: value}
+        """
+        positions = np.asarray(list(positions), dtype=np.intp)
+        flat = self._positions()[positions]
+        coords = np.unravel_index(flat, self.shape)
+        
+        columns = {name: self.axes[name][coord] for name, coord in zip(self.axes, coords)}
+        columns.update({name: values[flat] for name, values in self.metrics.items()})
+        
+        return [
+            {name: float(values[i]) for name, values in columns.items()}
+            for i in range(len(positions))
+        ]
 
 
 class ScenarioManager:
@@ -13,14 +144,49 @@ class ScenarioManager:
     Manages budget scenarios with parameter deltas.
     """
     
-    def __init__(self, assumptions_manager):
+    # Parameters accepted by sweep_scenarios
+    SWEEP_PARAMETERS = (
+        'growth_rate_2025',
+        'price_adjustment',
+        'volume_adjustment',
+        'commission_pct',
+        'marketing_pct',
+        'csv_adjustment',
+        'fixed_cost_adjustment',
+    )
+    
+    # Assumption (and nested key) each delta overrides in get_scenario_assumptions
+    DELTA_ASSUMPTIONS = {
+        'growth_rate_2025': ('growth_rate_2025',),
+        'commission_pct': ('commission_defaults', 'sales_commission_pct'),
+        'marketing_pct': ('marketing_defaults', 'marketing_pct_revenue'),
+    }
+    
+    # Default search range of goal_seek
+    GOAL_SEEK_BOUNDS = {
+        'growth_rate_2025': (-0.5, 1.0),
+        'price_adjustment': (0.5, 2.0),
+        'volume_adjustment': (0.5, 2.0),
+        'commission_pct': (0.0, 0.5),
+        'marketing_pct': (0.0, 0.5),
+        'csv_adjustment': (0.5, 2.0),
+        'fixed_cost_adjustment': (0.5, 2.0),
+    }
+    
+    # Default size limit of a sweep grid
+    MAX_SWEEP_COMBINATIONS = 5_000_000
+    
+    def __init__(self, assumptions_manager, cache: Optional[ScenarioCache] = None):
         """
         Initialize scenario manager.
         
         Args:
             assumptions_manager: AssumptionsManager instance
+            cache: ScenarioCache for scenario results (a private in-memory
+                   cache by default)
         """
         self.base_assumptions = assumptions_manager
+        self.cache = cache if cache is not None else ScenarioCache()
         self.scenarios = {}
         self.create_default_scenarios()
     
@@ -84,23 +250,23 @@ class ScenarioManager:
             'deltas': deltas,
         }
     
-    def apply_scenario(self, scenario_name: str, base_values: Dict[str, float]) -> Dict[str, float]:
+    def apply_scenario(self, scenario_name: str, base_values: Mapping[str, float]) -> Dict[str, float]:
         """
         Apply scenario deltas to base values.
         
         Args:
             scenario_name: Name of scenario to apply
-            base_values: Base values dictionary
+            base_values: Base values (a dictionary or read-only assumptions)
             
         Returns:
             Adjusted values dictionary
         """
         if scenario_name not in self.scenarios:
             print(f"Warning: Scenario '{scenario_name}' not found")
-            return base_values.copy()
+            return dict(base_values)
         
         scenario = self.scenarios[scenario_name]
-        adjusted_values = base_values.copy()
+        adjusted_values = dict(base_values)
         
         # Apply deltas
         for key, delta_value in scenario['deltas'].items():
@@ -114,6 +280,37 @@ class ScenarioManager:
         
         return adjusted_values
     
+    def get_scenario_assumptions(self, scenario_name: str) -> LayeredAssumptions:
+        """
+        Get the assumptions of a scenario as an overlay of the base assumptions.
+        
+        Only the deltas listed in DELTA_ASSUMPTIONS change assumptions; the
+        other deltas adjust metrics (see get_scenario_comparison).
+        
+        Args:
+            scenario_name: Name of scenario
+            
+        Returns:
+            Read-only assumptions sharing every unchanged value with the base
+        """
+        base = self.base_assumptions.assumptions
+        scenario = self.scenarios.get(scenario_name)
+        if not scenario:
+            print(f"Warning: Scenario '{scenario_name}' not found")
+            return base
+        
+        overlay = {}
+        for key, value in scenario['deltas'].items():
+            path = self.DELTA_ASSUMPTIONS.get(key)
+            if path is None:
+                continue
+            if len(path) == 1:
+                overlay[path[0]] = value
+            else:
+                overlay.setdefault(path[0], {})[path[1]] = value
+        
+        return base.with_overlay(overlay)
+    
     def calculate_scenario_revenue(self, scenario_name: str, base_revenue: float) -> float:
         """
         Calculate revenue for a scenario.
@@ -215,6 +412,10 @@ class ScenarioManager:
         """
         Compare all scenarios against base metrics.
         
+        Results are memoized in the scenario cache under a hash of the base
+        assumptions, the scenario deltas and the base metrics, so unchanged
+        scenarios are not recomputed.
+        
         Args:
             base_metrics: Base case metrics
             
@@ -222,51 +423,374 @@ class ScenarioManager:
             Dictionary with scenario comparisons
         """
         comparison = {}
+        assumptions = self.base_assumptions.assumptions
         
-        for scenario_name in self.scenarios.keys():
-            comparison[scenario_name] = {}
-            
-            # Calculate key metrics with scenario adjustments
-            scenario = self.scenarios[scenario_name]
+        for scenario_name, scenario in self.scenarios.items():
             deltas = scenario['deltas']
+            key = canonical_key(assumptions, deltas, base_metrics)
+            comparison[scenario_name] = self.cache.get_or_compute(
+                key, lambda: self._evaluate_scenario(deltas, base_metrics)
+            )
+        
+        return comparison
+    
+    def _evaluate_scenario(self, deltas: Dict[str, float],
+                           base_metrics: Dict[str, float]) -> Dict[str, float]:
+        """Calculate the comparison metrics of one set of deltas."""
+        metrics = {}
+        
+        # Revenue
+        revenue = base_metrics.get('revenue', 0)
+        if 'growth_rate_2025' in deltas:
+            base_growth = self.base_assumptions.assumptions['growth_rate_2025']
+            revenue = revenue / (1 + base_growth) * (1 + deltas['growth_rate_2025'])
+        
+        if 'price_adjustment' in deltas:
+            revenue *= deltas['price_adjustment']
+        if 'volume_adjustment' in deltas:
+            revenue *= deltas['volume_adjustment']
+        metrics['revenue'] = revenue
+        
+        # Costs
+        csv = base_metrics.get('csv', 0)
+        if 'csv_adjustment' in deltas:
+            csv *= deltas['csv_adjustment']
+        metrics['csv'] = csv
+        
+        fixed = base_metrics.get('fixed_costs', 0)
+        if 'fixed_cost_adjustment' in deltas:
+            fixed *= deltas['fixed_cost_adjustment']
+        metrics['fixed_costs'] = fixed
+        
+        # Variable costs
+        marketing_pct = deltas.get('marketing_pct', 0.05)
+        commission_pct = deltas.get('commission_pct', 0.10)
+        variable = revenue * (marketing_pct + commission_pct)
+        metrics['variable_costs'] = variable
+        
+        # Margins
+        lb = revenue - csv
+        metrics['lucro_bruto'] = lb
+        metrics['margem_bruta_pct'] = (lb / revenue * 100) if revenue > 0 else 0
+        
+        lair = lb - fixed - variable
+        metrics['lair'] = lair
+        metrics['margem_lair_pct'] = (lair / revenue * 100) if revenue > 0 else 0
+        
+        return metrics
+    
+    def sweep_scenarios(
+        self,
+        base_metrics: Dict[str, float],
+        ranges: Dict[str, Iterable[float]],
+        max_combinations: Optional[int] = None
+    ) -> ScenarioTable:
+        """
+        Evaluate every combination of parameter values at once.
+        
+        Uses the same arithmetic as get_scenario_comparison, broadcast over
+        the grid. Parameters not swept keep their neutral value (base growth,
+        1.0 adjustments, 10% commission, 5% marketing).
+        
+        Args:
+            base_metrics: Base case metrics ('revenue', 'csv', 'fixed_costs')
+            ranges: Parameter name -> values to try (see SWEEP_PARAMETERS)
+            max_combinations: Grid size limit (defaults to MAX_SWEEP_COMBINATIONS)
             
-            # Revenue
-            revenue = base_metrics.get('revenue', 0)
-            if 'growth_rate_2025' in deltas:
-                base_growth = self.base_assumptions.assumptions['growth_rate_2025']
-                revenue = revenue / (1 + base_growth) * (1 + deltas['growth_rate_2025'])
+        Returns:
+            ScenarioTable with the swept parameters and the metrics of
+            get_scenario_comparison
+        """
+        if not ranges:
+            raise ValueError("Sweep needs at least one parameter range")
+        unknown = set(ranges) - set(self.SWEEP_PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+        
+        axes = {name: np.atleast_1d(np.asarray(list(values), dtype=np.float64))
+                for name, values in ranges.items()}
+        size = int(np.prod([len(values) for values in axes.values()]))
+        limit = max_combinations or self.MAX_SWEEP_COMBINATIONS
+        if size > limit:
+            raise ValueError(f"Sweep has {size:,} combinations (limit {limit:,})")
+        
+        # Each swept parameter gets its own axis of the grid
+        ndim = len(axes)
+        params = {}
+        for name, values in axes.items():
+            shape = [1] * ndim
+            shape[list(axes).index(name)] = -1
+            params[name] = values.reshape(shape)
+        
+        grid_shape = tuple(len(values) for values in axes.values())
+        
+        def flat(values):
+            return np.broadcast_to(values, grid_shape).ravel()
+        
+        metrics = {name: flat(values)
+                   for name, values in self._scenario_metrics(base_metrics, params).items()}
+        
+        return ScenarioTable(axes, metrics)
+    
+    def _neutral_parameters(self) -> Dict[str, float]:
+        """Parameter values that leave the base case unchanged."""
+        return {
+            'growth_rate_2025': self.base_assumptions.assumptions['growth_rate_2025'],
+            'price_adjustment': 1.0,
+            'volume_adjustment': 1.0,
+            'commission_pct': 0.10,
+            'marketing_pct': 0.05,
+            'csv_adjustment': 1.0,
+            'fixed_cost_adjustment': 1.0,
+        }
+    
+    def _scenario_metrics(self, base_metrics: Dict[str, float],
+                          params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Vectorized scenario arithmetic of get_scenario_comparison.
+        
+        Args:
+            base_metrics: Base case metrics
+            params: Parameter name -> scalar or array (missing ones are neutral)
             
-            revenue = self.calculate_scenario_revenue(scenario_name, revenue)
-            comparison[scenario_name]['revenue'] = revenue
+        Returns:
+            Metric name -> array broadcast over the parameter arrays
+        """
+        params = {**self._neutral_parameters(), **params}
+        base_growth = self.base_assumptions.assumptions['growth_rate_2025']
+        
+        revenue = (base_metrics.get('revenue', 0) / (1 + base_growth)
+                   * (1 + np.asarray(params['growth_rate_2025'], dtype=np.float64))
+                   * params['price_adjustment'] * params['volume_adjustment'])
+        csv = base_metrics.get('csv', 0) * np.asarray(params['csv_adjustment'], dtype=np.float64)
+        fixed = base_metrics.get('fixed_costs', 0) * np.asarray(params['fixed_cost_adjustment'],
+                                                                 dtype=np.float64)
+        variable = revenue * (np.asarray(params['marketing_pct']) + params['commission_pct'])
+        lb = revenue - csv
+        lair = lb - fixed - variable
+        
+        revenue, csv, fixed, variable, lb, lair = np.broadcast_arrays(
+            revenue, csv, fixed, variable, lb, lair)
+        has_revenue = revenue > 0
+        safe_revenue = np.where(has_revenue, revenue, 1.0)
+        
+        return {
+            'revenue': revenue,
+            'csv': csv,
+            'fixed_costs': fixed,
+            'variable_costs': variable,
+            'lucro_bruto': lb,
+            'margem_bruta_pct': np.where(has_revenue, lb / safe_revenue * 100, 0.0),
+            'lair': lair,
+            'margem_lair_pct': np.where(has_revenue, lair / safe_revenue * 100, 0.0),
+        }
+    
+    def cash_objective(self, cashflow_manager, dre_data: Dict[str, List[float]],
+                       statistic: str = 'min_balance') -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+        """
+        Build a goal-seek metric from the cash flow of scenario-adjusted DRE lines.
+        
+        The lines are scaled by line_factors.
+        
+        Args:
+            cashflow_manager: CashFlowManager used for the batched cash flow
+            dre_data: Dictionary with monthly DRE values (base case)
+            statistic: Key of get_cashflow_summary_batch (e.g. 'min_balance',
+                       'ending_balance')
             
-            # Costs
-            csv = base_metrics.get('csv', 0)
-            if 'csv_adjustment' in deltas:
-                csv *= deltas['csv_adjustment']
-            comparison[scenario_name]['csv'] = csv
+        Returns:
+            Callable mapping parameter arrays to the statistic, for goal_seek
+        """
+        base = {line: np.asarray(values, dtype=np.float64) for line, values in dre_data.items()}
+        
+        def evaluate(params: Dict[str, np.ndarray]) -> np.ndarray:
+            shape = np.broadcast(*[np.asarray(value) for value in params.values()]).shape
+            scaling = {line: np.broadcast_to(factor, shape).reshape(-1, 1)
+                       for line, factor in self.line_factors(params).items()}
+            batch = {line: values * scaling.get(line, 1.0) for line, values in base.items()}
             
-            fixed = base_metrics.get('fixed_costs', 0)
-            if 'fixed_cost_adjustment' in deltas:
-                fixed *= deltas['fixed_cost_adjustment']
-            comparison[scenario_name]['fixed_costs'] = fixed
+            result = cashflow_manager.calculate_cashflow_batch(batch)
+            summary = cashflow_manager.get_cashflow_summary_batch(result)
+            return summary[statistic].reshape(shape)
+        
+        return evaluate
+    
+    def line_factors(self, params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Multipliers of the DRE lines for a set of scenario parameters.
+        
+        Revenue scales with growth (relative to the base growth), price and
+        volume; CSV and fixed costs with their adjustments; variable costs
+        with revenue and the commission and marketing percentages (relative
+        to their neutral 15%).
+        
+        Args:
+            params: Parameter name -> scalar or array (missing ones are neutral)
             
-            # Variable costs
-            variable = base_metrics.get('variable_costs', 0)
-            marketing_pct = deltas.get('marketing_pct', 0.05)
-            commission_pct = deltas.get('commission_pct', 0.10)
-            variable = revenue * (marketing_pct + commission_pct)
-            comparison[scenario_name]['variable_costs'] = variable
+        Returns:
+            Dictionary with DRE line -> factor
+        """
+        neutral = self._neutral_parameters()
+        params = {**neutral, **params}
+        
+        revenue = ((1 + np.asarray(params['growth_rate_2025'], dtype=np.float64))
+                   / (1 + neutral['growth_rate_2025'])
+                   * params['price_adjustment'] * params['volume_adjustment'])
+        variable = ((np.asarray(params['commission_pct'], dtype=np.float64) + params['marketing_pct'])
+                    / (neutral['commission_pct'] + neutral['marketing_pct']))
+        
+        return {
+            'faturamento': revenue,
+            'csv': np.asarray(params['csv_adjustment'], dtype=np.float64),
+            'custos_fixos': np.asarray(params['fixed_cost_adjustment'], dtype=np.float64),
+            'custos_variaveis': revenue * variable,
+        }
+    
+    def goal_seek(
+        self,
+        base_metrics: Dict[str, float],
+        parameter,
+        metric,
+        target,
+        bounds: Optional[Tuple[float, float]] = None,
+        deltas: Optional[Dict[str, float]] = None,
+        samples: int = 64,
+        tol: float = 1e-9,
+        max_rounds: int = 8
+    ) -> Dict[str, Any]:
+        """
+        Solve for the parameter value at which a metric reaches a target.
+        
+        Each round evaluates the metric at `samples` points of the bracket at
+        once and narrows it to the first sign change; the answer is then
+        interpolated inside the final bracket (exact for linear metrics).
+        Several targets are solved together.
+        
+        Several deltas are solved together by giving a direction: each
+        parameter moves from its value in deltas (or its neutral value) by
+        its weight times one step, and the step is solved for.
+        
+        Args:
+            base_metrics: Base case metrics (as in get_scenario_comparison)
+            parameter: Parameter to solve for (see SWEEP_PARAMETERS), or a
+                       dictionary of parameter -> weight along one direction
+            metric: Metric name of get_scenario_comparison, or a callable
+                    mapping parameter arrays to metric values (see
+                    cash_objective)
+            target: Target value, or a list of targets
+            bounds: (low, high) search range of the parameter or step
+                    (defaults to GOAL_SEEK_BOUNDS, intersected over the
+                    parameters of a direction)
+            deltas: Fixed values of the other parameters
+            samples: Points evaluated per round
+            tol: Bracket width at which the search stops
+            max_rounds: Maximum number of narrowing rounds
             
-            # Margins
-            lb = revenue - csv
-            comparison[scenario_name]['lucro_bruto'] = lb
-            comparison[scenario_name]['margem_bruta_pct'] = (lb / revenue * 100) if revenue > 0 else 0
+        Returns:
+            Dictionary with 'value' (solution, or the closest value when the
+            target is out of reach; the step for a direction), 'values'
+            (parameter -> value at the solution), 'achieved' (metric at
+            'value'), 'converged', 'rounds' and 'evaluations'; arrays when
+            several targets were given
+        """
+        fixed = dict(deltas or {})
+        if isinstance(parameter, str):
+            direction = {parameter: 1.0}
+            origin = {parameter: 0.0}
+        else:
+            direction = {name: float(weight) for name, weight in parameter.items() if weight}
+            if not direction:
+                raise ValueError("Goal-seek direction needs a non-zero weight")
+            neutral = self._neutral_parameters()
+            origin = {name: float(fixed.get(name, neutral.get(name, 0.0))) for name in direction}
+        for name in direction:
+            if name not in self.SWEEP_PARAMETERS:
+                raise ValueError(f"Unknown goal-seek parameter: {name}")
+            fixed.pop(name, None)
+        if samples < 2:
+            raise ValueError("Goal seek needs at least 2 samples per round")
+        
+        def point(step):
+            return {name: origin[name] + weight * step for name, weight in direction.items()}
+        
+        if callable(metric):
+            evaluate = metric
+        else:
+            def evaluate(params):
+                return self._scenario_metrics(base_metrics, params)[metric]
+        
+        def gap(values):
+            return np.asarray(evaluate({**fixed, **point(values)}), dtype=np.float64) - targets[:, None]
+        
+        single = np.ndim(target) == 0
+        targets = np.atleast_1d(np.asarray(target, dtype=np.float64))
+        if bounds is not None:
+            low, high = bounds
+        else:
+            # Steps keeping every parameter inside its own bounds
+            low, high = -np.inf, np.inf
+            for name, weight in direction.items():
+                ends = [(limit - origin[name]) / weight for limit in self.GOAL_SEEK_BOUNDS[name]]
+                low, high = max(low, min(ends)), min(high, max(ends))
+            if low > high:
+                raise ValueError("Goal-seek direction leaves the parameter bounds")
+        lo = np.full(len(targets), float(low))
+        hi = np.full(len(targets), float(high))
+        steps = np.linspace(0.0, 1.0, samples)
+        
+        # First round: find which targets are bracketed at all
+        xs = lo[:, None] + (hi - lo)[:, None] * steps
+        ys = gap(xs)
+        evaluations = ys.size
+        crossing = self._crossings(ys)
+        converged = crossing.any(axis=1) | (ys[:, 0] == 0)
+        
+        rows = np.arange(len(targets))
+        closest = xs[rows, np.abs(ys).argmin(axis=1)]
+        
+        rounds = 1
+        while True:
+            first = crossing.argmax(axis=1)
+            lo = np.where(converged, xs[rows, first], closest)
+            hi = np.where(converged, xs[rows, first + 1], closest)
+            y_lo = ys[rows, first]
+            y_hi = ys[rows, first + 1]
+            if rounds >= max_rounds or ((hi - lo) <= tol * (1 + np.abs(lo))).all():
+                break
             
-            lair = lb - fixed - variable
-            comparison[scenario_name]['lair'] = lair
-            comparison[scenario_name]['margem_lair_pct'] = (lair / revenue * 100) if revenue > 0 else 0
+            xs = lo[:, None] + (hi - lo)[:, None] * steps
+            ys = gap(xs)
+            evaluations += ys.size
+            crossing = self._crossings(ys)
+            rounds += 1
         
-        return comparison
+        # Interpolate inside the final bracket
+        span = y_hi - y_lo
+        safe_span = np.where(span != 0, span, 1.0)
+        value = np.where(converged & (span != 0), lo - y_lo * (hi - lo) / safe_span, lo)
+        value = np.where(converged & (y_hi == 0), hi, value)
+        value = np.where(converged & (y_lo == 0), lo, value)
+        achieved = gap(value[:, None])[:, 0] + targets
+        
+        result = {
+            'parameter': parameter,
+            'target': targets,
+            'value': value,
+            'values': point(value),
+            'achieved': achieved,
+            'converged': converged,
+            'rounds': rounds,
+            'evaluations': evaluations + len(targets),
+        }
+        if single:
+            result.update({key: result[key][0].item() for key in ('target', 'value', 'achieved', 'converged')})
+            result['values'] = {name: values[0].item() for name, values in result['values'].items()}
+        return result
+    
+    @staticmethod
+    def _crossings(ys: np.ndarray) -> np.ndarray:
+        """Segments of each row where the gap changes sign or hits zero."""
+        return (np.signbit(ys[:, :-1]) != np.signbit(ys[:, 1:])) | (ys[:, 1:] == 0)
     
     def get_scenario_list(self) -> List[str]:
         """Get list of all scenario names."""
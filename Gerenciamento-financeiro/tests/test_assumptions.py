@@ -6,7 +6,9 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.assumptions import AssumptionsManager
+import pickle
+
+from src.assumptions import AssumptionsManager, LayeredAssumptions
 
 
 def test_default_assumptions():
@@ -62,6 +64,11 @@ def test_product_mapping():
     # Add new mapping
     mgr.add_product_mapping("Novo Produto", "Nova Categoria")
     assert mgr.get_category_for_product("Novo Produto") == "Nova Categoria"
+    
+    # Bulk load in one update
+    mgr.add_product_mappings({f"Produto {i}": "Cursos" for i in range(500)})
+    assert mgr.get_category_for_product("Produto 499") == "Cursos"
+    assert mgr.get_category_for_product("Novo Produto") == "Nova Categoria"
 
 
 def test_ar_ap_terms():
@@ -81,11 +88,71 @@ def test_ar_ap_terms():
     assert abs(sum(ap_terms['weights']) - 1.0) < 0.01
 
 
+def test_assumptions_are_immutable():
+    """Test that shared assumptions cannot be mutated in place."""
+    mgr = AssumptionsManager()
+    
+    for target, key in ((mgr.assumptions, 'growth_rate_2025'),
+                        (mgr.assumptions['ar_terms'], 'days'),
+                        (mgr.assumptions['product_to_category_map'], 'X')):
+        try:
+            target[key] = 0.5
+            assert False, "Assumptions should be read-only"
+        except TypeError:
+            pass
+    
+    # Lists are read back as copies
+    days = mgr.assumptions['ar_terms']['days']
+    assert isinstance(days, list)
+    days.append(120)
+    assert mgr.assumptions['ar_terms']['days'] == [0, 30, 60]
+    
+    # Setters replace one value and share the rest
+    ar_terms = mgr.assumptions['ar_terms']
+    mgr.set_growth_rate(0.30)
+    assert mgr.assumptions['ar_terms'] is ar_terms
+    assert mgr.assumptions.depth == 1
+
+
+def test_layered_overlays():
+    """Test overlay resolution, nested merges and isolation between variants."""
+    mgr = AssumptionsManager()
+    base = mgr.assumptions
+    
+    variant = base.with_overlay({'commission_defaults': {'sales_commission_pct': 0.12}},
+                                growth_rate_2025=0.20)
+    other = base.with_overlay(growth_rate_2025=0.05)
+    
+    assert variant['growth_rate_2025'] == 0.20
+    assert other['growth_rate_2025'] == 0.05
+    assert base['growth_rate_2025'] == 0.15
+    
+    # Nested overlays only change the keys they list
+    assert variant['commission_defaults']['sales_commission_pct'] == 0.12
+    assert variant['commission_defaults']['default_pct'] == 0.05
+    assert base['commission_defaults']['sales_commission_pct'] == 0.10
+    
+    # Untouched nested values are shared, not copied
+    assert variant['ar_terms'] is base['ar_terms']
+    assert variant.depth == 2
+    assert set(variant) == set(base)
+    
+    plain = variant.to_dict()
+    assert plain['ar_terms']['days'] == [0, 30, 60]
+    assert plain['commission_defaults'] == {'sales_commission_pct': 0.12, 'default_pct': 0.05}
+    
+    # Worker processes receive a plain copy
+    assert pickle.loads(pickle.dumps(variant)) == variant
+    assert isinstance(LayeredAssumptions(plain), LayeredAssumptions)
+
+
 if __name__ == "__main__":
     test_default_assumptions()
     test_set_growth_rate()
     test_set_seasonality()
     test_product_mapping()
     test_ar_ap_terms()
+    test_assumptions_are_immutable()
+    test_layered_overlays()
     print("✓ All assumptions tests passed!")
 
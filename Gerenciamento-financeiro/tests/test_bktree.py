@@ -0,0 +1,112 @@
+"""
+Tests for typo-tolerant matching module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+
+from src.bktree import BKTree, TypoMatcher, edit_distance, typo_budget
+from src.labeling import LabelDetector, compile_vocabulary
+from src.assumptions import AssumptionsManager
+
+
+def test_edit_distance():
+    """Test Levenshtein distance."""
+    assert edit_distance("", "") == 0
+    assert edit_distance("abc", "") == 3
+    assert edit_distance("periodotologia", "periodontologia") == 1
+    assert edit_distance("edondontia", "endodontia") == 2
+    assert typo_budget(3, 2) == 0  # Short labels only match exactly
+    assert typo_budget(10, 2) == 2
+
+
+def test_bktree_search_matches_brute_force():
+    """Test BK-tree search against a linear scan."""
+    rng = random.Random(7)
+    words = {''.join(rng.choice('abcde') for _ in range(rng.randint(1, 7)))
+             for _ in range(300)}
+    tree = BKTree(words)
+    assert len(tree) == len(words)
+    assert set(tree) == words
+
+    for _ in range(50):
+        query = ''.join(rng.choice('abcde') for _ in range(rng.randint(1, 7)))
+        for k in (0, 1, 2):
+            expected = sorted((edit_distance(query, w), w) for w in words
+                              if edit_distance(query, w) <= k)
+            assert tree.search(query, k) == expected
+
+
+def test_typo_matcher_ranking():
+    """Test ranked candidates and distance threshold."""
+    matcher = compile_vocabulary({
+        'periodontia': ['Periodontia'],
+        'periodontologia': ['Periodontologia'],
+        'ortodontia': ['Ortodontia'],
+    })
+    assert isinstance(matcher, TypoMatcher)
+
+    candidates = matcher.suggest('periodotologia')
+    assert candidates[0].key == 'periodontologia'
+    assert candidates[0].distance == 1
+
+    assert matcher.best('ortodontia') == 'ortodontia'
+    assert matcher.best('ortodontia', max_typos=0) == 'ortodontia'
+    assert matcher.best('xyz') is None
+
+
+def test_label_typos():
+    """Test typo fallback in label detection."""
+    import openpyxl
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.cell(5, 2).value = "Lucro Liqudo"
+
+    assert LabelDetector().find_label(ws, 'lucro_liquido') is None
+    assert LabelDetector(max_typos=2).find_label(ws, 'lucro_liquido') == (5, 2)
+
+    suggestions = LabelDetector().suggest_labels("Fatruamento")
+    assert suggestions[0].key == 'faturamento'
+
+
+def test_product_category_typos():
+    """Test category lookup for misspelled product names."""
+    assumptions = AssumptionsManager()
+    assert assumptions.get_category_for_product("Implant Capilar", fuzzy=True) == "Implante Capilar"
+    assert assumptions.get_category_for_product("Implant Capilar") == "Odonto e Estética"
+    assert assumptions.get_category_for_product("Cirurgia Oral", fuzzy=True) == "Odonto e Estética"
+    assert assumptions.match_product("Cirurgia Oral") == "Cirurigia Oral"
+    assert assumptions.match_product("Produto Novo") is None
+
+    assumptions.add_product_mapping("Mentoria Clínica", "Cursos")
+    assert assumptions.get_category_for_product("Mentoria Clinica", fuzzy=True) == "Cursos"
+    assert assumptions.get_category_for_product("Mentoria Clinica") == "Odonto e Estética"
+
+
+def test_sheet_typos():
+    """Test that typo-tolerant sheet lookup is opt-in."""
+    import openpyxl
+    from src.io import ExcelWorkbookManager
+    wbm = ExcelWorkbookManager('unused.xlsx')
+    wbm.workbook = openpyxl.Workbook()
+    wbm.workbook.active.title = 'DRE Grencial Instituto '
+
+    assert wbm.get_sheet("DRE Gerencial Instituto", fuzzy=True).title == 'DRE Grencial Instituto '
+    assert wbm.get_sheet("DRE Grencial Instituto").title == 'DRE Grencial Instituto '
+    try:
+        wbm.get_sheet("DRE Gerencial Instituto")
+        assert False
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_edit_distance()
+    test_bktree_search_matches_brute_force()
+    test_typo_matcher_ranking()
+    test_label_typos()
+    test_product_category_typos()
+    test_sheet_typos()
+    print("✓ All typo matching tests passed!")
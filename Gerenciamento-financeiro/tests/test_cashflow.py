@@ -6,7 +6,9 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.cashflow import CashFlowManager
+import numpy as np
+
+from src.cashflow import CashFlowManager, term_kernel, distribute_terms
 from src.assumptions import AssumptionsManager
 
 
@@ -109,10 +111,88 @@ def test_cashflow_summary():
     assert abs(summary['net_cashflow'] - expected_net) < 1
 
 
+def test_term_carryover():
+    """Test that amounts settling after the horizon are carried over."""
+    assumptions = AssumptionsManager()
+    cf = CashFlowManager(assumptions)
+    
+    # Terms settling in the same month are added up
+    assert term_kernel([0, 15, 60], [0.5, 0.3, 0.2]).tolist() == [0.8, 0.0, 0.2]
+    
+    cash_in, carryover = distribute_terms([10000] * 12, cf.get_term_kernel("ar_terms"))
+    assert len(cash_in) == 12
+    # December sales: 30% after year end; November sales: 10%
+    assert carryover.tolist() == [3000.0, 1000.0]
+    assert abs(cash_in.sum() + carryover.sum() - 120000) < 1e-6
+    
+    # Arbitrary horizon and batched series
+    batch_in, batch_carry = distribute_terms([[10000] * 24, [0] * 24], cf.get_term_kernel("ar_terms"))
+    assert batch_in.shape == (2, 24)
+    assert batch_carry[0].tolist() == [3000.0, 1000.0]
+
+
+def test_multi_year_cashflow():
+    """Test chaining two fiscal years through the carry-over."""
+    assumptions = AssumptionsManager()
+    cf = CashFlowManager(assumptions)
+    
+    dre_data = {'faturamento': [10000] * 12, 'custos_fixos': [5000] * 12}
+    year_1 = cf.calculate_monthly_cashflow(dre_data)
+    assert year_1['carryover_inflows'] == [3000.0, 1000.0]
+    assert year_1['carryover_outflows'] == [1000.0]
+    
+    cf.initial_balance = year_1['accumulated_balance'][-1]
+    year_2 = cf.calculate_monthly_cashflow(dre_data, carry_in=year_1)
+    
+    # January collects 70% of its own sales plus the carry-over
+    assert abs(year_2['cash_inflows'][0] - (7000 + 3000)) < 1e-6
+    assert abs(year_2['total_outflows'][0] - (4000 + 1000)) < 1e-6
+    
+    # Same as one 24-month run
+    cf.initial_balance = 100000.0
+    two_years = cf.calculate_monthly_cashflow({k: v * 2 for k, v in dre_data.items()})
+    assert abs(two_years['accumulated_balance'][-1] - year_2['accumulated_balance'][-1]) < 1e-6
+
+
+def test_cashflow_batch():
+    """Test batched cash flow against single-scenario calls."""
+    assumptions = AssumptionsManager()
+    cf = CashFlowManager(assumptions)
+    
+    revenue = np.array([[10000.0] * 12, [5000.0] * 12, [0.0] * 12])
+    batch = cf.calculate_cashflow_batch(
+        {'faturamento': revenue, 'custos_fixos': [6000.0] * 12},
+        ar_terms=[{'days': [0], 'weights': [1.0]},
+                  {'days': [0, 30, 60], 'weights': [0.7, 0.2, 0.1]},
+                  {'days': [90], 'weights': [1.0]}],
+        initial_balances=[0.0, 100000.0, 50000.0],
+    )
+    assert batch['accumulated_balance'].shape == (3, 12)
+    assert batch['carryover_inflows'].shape == (3, 3)
+    
+    # Scenario 1 uses the default terms: same as the single path
+    single = cf.calculate_monthly_cashflow({'faturamento': [5000.0] * 12,
+                                            'custos_fixos': [6000.0] * 12})
+    assert np.allclose(batch['accumulated_balance'][1], single['accumulated_balance'])
+    
+    summary = cf.get_cashflow_summary_batch(batch)
+    assert summary['ending_balance'].shape == (3,)
+    assert abs(summary['ending_balance'][1] - cf.get_cashflow_summary(single)['ending_balance']) < 1e-6
+    
+    risk = cf.check_liquidity_risk_batch(batch, minimum_balance=[-1.0, 50000.0, 0.0])
+    assert risk.shape == (3, 12)
+    assert not risk[0].any()
+    assert risk[2].sum() == len(cf.check_liquidity_risk(
+        {'accumulated_balance': batch['accumulated_balance'][2].tolist()}, minimum_balance=0.0))
+
+
 if __name__ == "__main__":
     test_apply_ar_terms()
     test_apply_ap_terms()
     test_calculate_monthly_cashflow()
     test_cashflow_summary()
+    test_term_carryover()
+    test_multi_year_cashflow()
+    test_cashflow_batch()
     print("✓ All cash flow tests passed!")
 
@@ -0,0 +1,86 @@
+"""
+Tests for daily cash flow module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import date
+
+import numpy as np
+
+from src.daily_cashflow import DailyCashFlowEngine
+from src.cashflow import CashFlowManager
+from src.assumptions import AssumptionsManager
+
+
+def test_daily_matches_monthly_keys():
+    """Test monthly roll-ups of the daily projection."""
+    assumptions = AssumptionsManager()
+    engine = DailyCashFlowEngine(assumptions)
+    
+    dre_data = {
+        'faturamento': [10000] * 12,
+        'csv': [3000] * 12,
+        'custos_fixos': [2000] * 12,
+        'impostos': [500] * 12,
+    }
+    daily = engine.calculate_daily_cashflow(dre_data)
+    monthly = CashFlowManager(assumptions).calculate_monthly_cashflow(dre_data)
+    
+    for key in monthly:
+        assert key in daily
+    assert len(daily['accumulated_balance']) == 12
+    assert len(daily['daily_balance']) == 365
+    
+    # Nothing is lost: what is not collected in the year is carried over
+    assert abs(sum(daily['cash_inflows']) + sum(daily['carryover_inflows']) - 120000) < 1e-6
+    assert abs(daily['accumulated_balance'][-1] -
+               (100000 + sum(daily['monthly_balance']))) < 1e-6
+    
+    # Taxes are paid on their due date, in full
+    assert daily['cash_outflows_taxes'] == [500.0] * 12
+
+
+def test_real_day_offsets():
+    """Test that 45-day terms are not rounded down to 30 days."""
+    assumptions = AssumptionsManager()
+    assumptions.set_ar_terms([45], [1.0])
+    engine = DailyCashFlowEngine(assumptions, start_date=date(2025, 1, 1))
+    
+    daily = engine.calculate_daily_cashflow({'faturamento': [3100] + [0] * 11})
+    inflow_days = np.flatnonzero(daily['daily_inflows'])
+    # January sales (days 0-30) are collected from day 45 to day 75
+    assert inflow_days[0] == 45
+    assert inflow_days[-1] == 75
+    assert daily['cash_inflows'][0] == 0.0
+
+
+def test_payment_calendar():
+    """Test fixed payment days, weekend roll and intra-month dips."""
+    assumptions = AssumptionsManager()
+    assumptions.set_ap_terms([0], [1.0])
+    engine = DailyCashFlowEngine(assumptions, start_date=date(2025, 1, 1),
+                                 initial_balance=1000.0,
+                                 payment_calendar={'aluguel': 4})
+    
+    daily = engine.calculate_daily_cashflow({
+        'faturamento': [3100] * 36,
+        'aluguel': [2000] * 36,
+    })
+    assert len(daily['daily_balance']) == 365 * 3  # 2025-2027 has no leap day
+    
+    # 2025-01-04 is a Saturday: rent is paid on Monday the 6th
+    rent_days = np.flatnonzero(daily['daily_outflows'])
+    assert str(daily['daily_dates'][rent_days[0]]) == '2025-01-06'
+    
+    # The dip before collections catch up is only visible day by day
+    assert daily['min_daily_balance'][0] < daily['accumulated_balance'][0]
+
+
+if __name__ == "__main__":
+    test_daily_matches_monthly_keys()
+    test_real_day_offsets()
+    test_payment_calendar()
+    print("✓ All daily cash flow tests passed!")
@@ -6,7 +6,12 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.dre import DREManager
+import math
+
+import numpy as np
+import openpyxl
+
+from src.dre import DREManager, DREMatrix
 from src.assumptions import AssumptionsManager
 
 
@@ -61,9 +66,67 @@ def test_distribute_monthly_custom():
     assert monthly_values[6] == max(monthly_values)
 
 
+def _make_dre_manager():
+    """Build a DRE manager over a two-month worksheet."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    rows = {'faturamento': 3, 'csv': 4, 'custos_fixos': 5, 'custos_variaveis': 6,
+            'lucro_bruto': 7, 'impostos': 8}
+    data = {
+        'faturamento': [1000, 0],
+        'csv': [300, 50],
+        'custos_fixos': [200, 200],
+        'custos_variaveis': [100, 0],
+        'lucro_bruto': [700, -50],
+        'impostos': [40, 0],
+    }
+    for label, values in data.items():
+        for col, value in zip((3, 4), values):
+            ws.cell(rows[label], col).value = value
+    
+    dre = DREManager(AssumptionsManager())
+    dre.dre_structure = rows
+    dre.month_cols = {'janeiro': 3, 'fevereiro': 4}
+    return dre, ws
+
+
+def test_dre_matrix():
+    """Test whole-array DRE results."""
+    dre, ws = _make_dre_manager()
+    matrix = dre.load_matrix(ws)
+    
+    assert matrix.values.shape == (6, 2)
+    assert matrix.lucro_bruto().tolist() == [700.0, -50.0]
+    assert matrix.lair().tolist() == [400.0, -250.0]
+    assert matrix.lucro_liquido().tolist() == [360.0, -250.0]
+    assert matrix.row('lair').tolist() == [0.0, 0.0]  # Missing line reads as zeros
+    
+    margins = matrix.margins()
+    assert margins['margem_bruta'][0] == 70.0
+    assert math.isnan(margins['margem_bruta'][1])  # No revenue
+    assert 'margem_lair' not in margins
+    
+    # Leading axes stack entities or years
+    stacked = DREMatrix(np.stack([matrix.values, matrix.values * 2]), matrix.rows, matrix.months)
+    assert stacked.lair().tolist() == [[400.0, -250.0], [800.0, -500.0]]
+
+
+def test_dre_calculations():
+    """Test DRE manager results built on the matrix."""
+    dre, ws = _make_dre_manager()
+    
+    assert dre.calculate_lucro_bruto(ws) == {'janeiro': 700.0, 'fevereiro': -50.0}
+    assert dre.calculate_lair(ws) == {'janeiro': 400.0, 'fevereiro': -250.0}
+    assert dre.calculate_lucro_liquido(ws) == {'janeiro': 360.0, 'fevereiro': -250.0}
+    assert dre.get_monthly_summary(ws)['janeiro']['csv'] == 300.0
+    assert dre.calculate_margins(ws) == {'janeiro': {'margem_bruta': 70.0}, 'fevereiro': {}}
+
+
 if __name__ == "__main__":
     test_calculate_2025_target()
     test_distribute_monthly_uniform()
     test_distribute_monthly_custom()
+    test_dre_matrix()
+    test_dre_calculations()
     print("✓ All DRE tests passed!")
 
@@ -0,0 +1,84 @@
+"""
+Tests for financing module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from src.cashflow import CashFlowManager
+from src.assumptions import AssumptionsManager
+from src.financing import FinancingSolver
+
+
+DRE_DATA = {
+    'faturamento': [10000] * 12,
+    'custos_fixos': [16000] * 12,
+}
+
+
+def test_minimum_initial_balance():
+    """Test the closed-form minimum initial balance."""
+    cf = CashFlowManager(AssumptionsManager())
+    cashflow_data = cf.calculate_monthly_cashflow(DRE_DATA)
+    
+    solver = FinancingSolver(floor=50000.0)
+    need = solver.minimum_initial_balance(cashflow_data)
+    
+    assert need['critical_month'] == 12
+    assert abs(need['additional_cash'] - (50000 - min(cashflow_data['accumulated_balance']))) < 1e-6
+    
+    # Starting with the required balance keeps the floor exactly
+    cf.initial_balance = need['required_initial_balance']
+    rerun = cf.calculate_monthly_cashflow(DRE_DATA)
+    assert abs(min(rerun['accumulated_balance']) - 50000) < 1e-6
+
+
+def test_credit_line():
+    """Test revolving draws, repayments and interest."""
+    cf = CashFlowManager(AssumptionsManager())
+    cashflow_data = cf.calculate_monthly_cashflow(DRE_DATA)
+    
+    # Without interest the peak debt equals the closed-form need
+    free = FinancingSolver(floor=50000.0, monthly_rate=0.0).solve_credit_line(cashflow_data)
+    closed_form = FinancingSolver(floor=50000.0).minimum_initial_balance(cashflow_data)
+    assert abs(free['peak_debt'] - closed_form['additional_cash']) < 1e-6
+    assert min(free['financed_balance']) >= 50000 - 1e-6
+    
+    # Interest adds to the draws and to the outflows
+    paid = FinancingSolver(floor=50000.0, monthly_rate=0.02).solve_credit_line(cashflow_data)
+    assert paid['peak_debt'] > free['peak_debt']
+    assert paid['total_interest'] > 0
+    assert np.allclose(np.subtract(paid['total_outflows_with_interest'], cashflow_data['total_outflows']),
+                       paid['interest'])
+    
+    # A credit limit leaves part of the gap uncovered
+    capped = FinancingSolver(floor=50000.0, credit_limit=5000.0).solve_credit_line(cashflow_data)
+    assert max(capped['debt']) <= 5000.0 + 1e-6
+    assert sum(capped['uncovered']) > 0
+
+
+def test_repayment_and_batch():
+    """Test that surplus cash repays the line, across a batch."""
+    cf = CashFlowManager(AssumptionsManager())
+    cf.initial_balance = 50000.0
+    batch = cf.calculate_cashflow_batch({
+        'faturamento': [[0.0] * 3 + [20000.0] * 9, [10000.0] * 12],
+        'custos_fixos': [10000.0] * 12,
+    }, ar_terms={'days': [0], 'weights': [1.0]}, ap_terms={'days': [0], 'weights': [1.0]})
+    
+    result = FinancingSolver(floor=50000.0, monthly_rate=0.01).solve_credit_line(batch)
+    assert result['debt'].shape == (2, 12)
+    assert result['peak_debt'][0] > 0
+    assert result['ending_debt'][0] == 0.0
+    assert result['peak_debt'][1] == 0.0
+    assert abs(result['repayments'][0].sum() - result['draws'][0].sum()) < 1e-6
+
+
+if __name__ == "__main__":
+    test_minimum_initial_balance()
+    test_credit_line()
+    test_repayment_and_batch()
+    print("✓ All financing tests passed!")
@@ -0,0 +1,80 @@
+"""
+Tests for sheet grid module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import openpyxl
+
+from src.grid import SheetGrid, as_grid
+from src.labeling import LabelDetector
+
+
+def _make_worksheet():
+    """Build a small DRE-like worksheet in memory."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "DRE"
+    ws.cell(2, 2).value = "Orçamento Empresarial "
+    months = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+              'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+    for i, month in enumerate(months):
+        ws.cell(2, 3 + i).value = month
+    ws.cell(3, 2).value = "Faturamento "
+    ws.cell(4, 2).value = "(-) Aluguel"
+    for i in range(12):
+        ws.cell(3, 3 + i).value = "=SUM(C5:C6)"
+        ws.cell(4, 3 + i).value = 3000
+    return ws
+
+
+def test_grid_planes():
+    """Test raw, numeric and text planes."""
+    ws = _make_worksheet()
+    grid = SheetGrid.from_worksheet(ws)
+
+    assert grid.max_row == ws.max_row
+    assert grid.max_column == ws.max_column
+    assert grid.cell(4, 3) == 3000
+    assert grid.number(4, 3) == 3000.0
+    assert grid.number(3, 3) == 0.0  # Formula is not numeric
+    assert grid.cell_text(3, 2) == "Faturamento"
+    assert grid.cell(100, 100) is None
+    assert grid.number(100, 100, default=-1.0) == -1.0
+
+
+def test_grid_bulk_reads():
+    """Test range and gathered reads."""
+    grid = as_grid(_make_worksheet())
+
+    assert as_grid(grid) is grid
+    assert grid.read_range(4, 2, 4, 3) == [["(-) Aluguel", 3000]]
+
+    values = grid.numbers_at([3, 4], [3, 4, 200])
+    assert values.shape == (2, 3)
+    assert values[1].tolist() == [3000.0, 3000.0, 0.0]
+
+    cells = list(grid.iter_text(2, 4, 2, 2))
+    assert [row for row, _, _ in cells] == [2, 3, 4]
+
+
+def test_detector_reads_grid():
+    """Test label detection on a grid snapshot."""
+    grid = as_grid(_make_worksheet())
+    detector = LabelDetector()
+
+    assert detector.find_label(grid, 'faturamento') == (3, 2)
+
+    month_row, month_cols = detector.find_month_row(grid)
+    assert month_row == 2
+    assert month_cols['janeiro'] == 3
+    assert month_cols['dezembro'] == 14
+
+
+if __name__ == "__main__":
+    test_grid_planes()
+    test_grid_bulk_reads()
+    test_detector_reads_grid()
+    print("✓ All grid tests passed!")
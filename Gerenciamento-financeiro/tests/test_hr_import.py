@@ -0,0 +1,203 @@
+"""
+Tests for HR import module
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from src.hr_import import HRExportImporter, coerce_number, parse_period, format_period
+from src.payroll import PayrollManager
+from src.payroll_table import PayrollTable
+
+
+CSV_EXPORT = (
+    "Matrícula;Nome;Cargo;Departamento;Filial;Competência;Salário Base;Encargos;Benefícios\n"
+    "001;Ana;Recepcionista;Atendimento;Lisboa;2025-01;2.000,00;400,00;300\n"
+    "002;Rui;Assessora Comercial;Comercial;Porto;2025-01;3.000,00;600,00;300\n"
+    "001;Ana;Recepcionista;Atendimento;Lisboa;2025-02;2.100,00;420,00;300\n"
+    "002;Rui;Assessora Comercial;Comercial;Porto;2025-02;3.000,00;600,00;300\n"
+    "003;Eva;Biomédica;Clínica;Lisboa;02/2025;R$ 6.500,00;;\n"
+    "004;;Recepcionista;Atendimento;Porto;2025-13;1.000,00;0;0\n"
+    "001;Ana;Recepcionista;Atendimento;Lisboa;2025-03;2.100,00;420,00;300\n"
+    "003;Eva;Biomédica;Clínica;Lisboa;2025-03;6.500,00;1.300,00;0\n"
+    ";Sem;Recepcionista;Atendimento;Porto;2025-03;1.000,00;0;0\n"
+    "005;Luís;Recepcionista;Atendimento;Porto;2025-03;-10;0;0\n"
+)
+
+
+def _write(tmp, name, text):
+    path = os.path.join(tmp, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+def test_field_coercion():
+    """Test amount and month parsing."""
+    assert coerce_number("R$ 1.234,56") == 1234.56
+    assert coerce_number("1234.56") == 1234.56
+    assert coerce_number("1,234.56") == 1234.56
+    assert coerce_number("1.234.567") == 1234567
+    assert coerce_number("3.500") == coerce_number("R$ 3.500") == 3500
+    assert coerce_number("3.5") == 3.5 and coerce_number("1234.500") == 1234.5
+    assert coerce_number(300) == 300.0
+    for bad in ("", "abc", None):
+        try:
+            coerce_number(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+    assert parse_period("2025-03") == parse_period("03/2025") == parse_period("2025-03-01")
+    assert parse_period("202503") == parse_period("01/03/2025")
+    assert format_period(parse_period("2025-03")) == "2025-03"
+    try:
+        parse_period("2025-13")
+        assert False
+    except ValueError:
+        pass
+
+
+def test_csv_import():
+    """Test validation, latest values and monthly totals from a CSV export."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write(tmp, 'rh.csv', CSV_EXPORT)
+        importer = HRExportImporter(chunk_size=3)
+        stats = importer.import_file(path)
+
+    assert stats['rows'] == 7 and stats['rejected'] == 3
+    assert stats['offset'] is None and stats['rows_per_second'] > 0
+    assert len(importer.errors) == 3 and 'line 7' in importer.errors[0]
+
+    employees = importer.employees()
+    assert employees['employee_id'].tolist() == ['001', '002', '003']
+    assert employees['salary'].tolist() == [2100, 3000, 6500]
+    assert employees['charges'].tolist() == [420, 600, 1300]
+    assert employees['role'].tolist() == ['Recepcionista', 'Assessora Comercial', 'Biomédica']
+    assert [format_period(p) for p in employees['first_period']] == ['2025-01', '2025-01', '2025-02']
+    assert [format_period(p) for p in employees['last_period']] == ['2025-03', '2025-02', '2025-03']
+
+    march = parse_period("2025-03")
+    assert importer.monthly_headcount[march] == 2
+    assert importer.monthly_cost[march] == 2100 + 420 + 300 + 6500 + 1300
+
+
+def test_resume_and_payroll_table():
+    """Test resuming from an offset (and a checkpoint) and loading the table."""
+    lines = [json.dumps({'ID': f'E{i % 50}', 'Cargo': 'Supervisor Comercial' if i % 50 == 0 else 'Apoio',
+                         'Unidade': 'Porto' if i % 2 else 'Lisboa', 'Mês': f'2025-{i // 50 + 1:02d}',
+                         'Salário': 1000 + i % 50, 'Encargos': '100,00'})
+             for i in range(600)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write(tmp, 'rh.jsonl', "\n".join(lines) + "\n")
+
+        whole = HRExportImporter()
+        whole.import_file(path)
+
+        first = HRExportImporter(chunk_size=64)
+        stats = first.import_file(path, max_rows=250)
+        assert stats['rows'] == 250 and stats['offset'] is not None
+        checkpoint = os.path.join(tmp, 'state.json')
+        first.save_state(checkpoint, {path: stats['offset']})
+
+        resumed = HRExportImporter(chunk_size=64)
+        offset = resumed.load_state(checkpoint)[path]
+        stats = resumed.import_file(path, offset=offset)
+        assert stats['offset'] is None and resumed.rows == 600
+
+    for key, values in whole.employees().items():
+        assert np.array_equal(values, resumed.employees()[key])
+    assert resumed.monthly_cost == whole.monthly_cost
+
+    table = PayrollTable()
+    resumed.to_table(table, variable_roles=['Supervisor Comercial'])
+    assert len(table) == 50
+    assert table.total() == sum(1100 + i for i in range(50))
+    assert table.variable_total() == 1100
+
+
+def test_payroll_manager_import():
+    """Test that PayrollManager reads an HR export into its table."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write(tmp, 'rh.csv', CSV_EXPORT)
+        payroll = PayrollManager()
+        stats = payroll.import_hr_export(path, start_period=parse_period("2025-01"))
+
+    assert stats['rows'] == 7
+    assert payroll.total_payroll == (2100 + 420 + 300) + (3000 + 600 + 300) + (6500 + 1300)
+    fixed, variable = payroll.classify_fixed_variable()
+    assert variable == 3900
+
+    # Rui left after February, Eva joined in February
+    assert payroll.table.column('end_month').tolist()[1] == 2
+    assert payroll.table.column('start_month').tolist()[2] == 2
+    assert payroll.get_cost_by_department({}) == {'Outros': payroll.total_payroll}
+    assert payroll.table.group_totals('branch') == {'Lisboa': 2820 + 7800, 'Porto': 3900}
+
+    # Rui is no longer on the March payroll
+    payroll = PayrollManager()
+    with tempfile.TemporaryDirectory() as tmp:
+        payroll.import_hr_export(_write(tmp, 'rh.csv', CSV_EXPORT), start_period=parse_period("2025-03"))
+    assert payroll.table.names == ['001', '003']
+    assert payroll.total_payroll == (2100 + 420 + 300) + (6500 + 1300)
+
+    # Projecting the next year keeps everyone still on the last export month
+    payroll = PayrollManager()
+    with tempfile.TemporaryDirectory() as tmp:
+        payroll.import_hr_export(_write(tmp, 'rh.csv', CSV_EXPORT), start_period=parse_period("2026-01"))
+    assert payroll.table.names == ['001', '003']
+    assert payroll.table.column('start_month').tolist() == [1, 1]
+    assert payroll.table.column('end_month').tolist() == [PayrollTable.OPEN_END] * 2
+
+
+def test_latin1_export():
+    """Test that a cp1252 export is read and undecodable lines are rejected."""
+    text = CSV_EXPORT.replace("2025-03;-10", "2025-03;10")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'rh.csv')
+        with open(path, 'wb') as f:
+            f.write(text.encode('cp1252'))
+        importer = HRExportImporter()
+        stats = importer.import_file(path)
+        assert stats['rows'] == 8 and stats['rejected'] == 2
+        assert importer.employees()['role'].tolist()[2] == 'Biomédica'
+
+        # A UTF-8 export with one broken line loses only that line
+        with open(path, 'wb') as f:
+            f.write(text.encode('utf-8').replace('Eva;Biomédica;Clínica;Lisboa;2025-03'.encode('utf-8'),
+                                                 'Eva;Biomédica;Clínica;Lisboa;2025-03'.encode('cp1252')))
+        importer = HRExportImporter()
+        stats = importer.import_file(path)
+        assert stats['rows'] == 7 and stats['rejected'] == 3
+        assert any(error.startswith('line 9: invalid utf-8 text') for error in importer.errors)
+
+
+def test_json_array_rejected():
+    """Test that a JSON array export fails up front instead of line by line."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write(tmp, 'rh.json', json.dumps([{'ID': '1', 'Mês': '2025-01', 'Salário': 1000}]))
+        importer = HRExportImporter()
+        try:
+            importer.import_file(path)
+            assert False
+        except ValueError as e:
+            assert 'JSON Lines' in str(e)
+        assert importer.rows == importer.rejected == 0
+
+        path = _write(tmp, 'rh.json', json.dumps({'ID': '1', 'Mês': '2025-01', 'Salário': 1000}) + "\n")
+        assert importer.import_file(path)['rows'] == 1
+
+
+if __name__ == "__main__":
+    test_field_coercion()
+    test_csv_import()
+    test_resume_and_payroll_table()
+    test_payroll_manager_import()
+    test_json_array_rejected()
+    test_latin1_export()
+    print("✓ All HR import tests passed!")
@@ -6,7 +6,13 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.labeling import LabelDetector, get_month_number, get_month_name_pt
+from src.labeling import (
+    LabelDetector, LabelIndex, normalize_text, get_month_number, get_month_name_pt,
+    NORMALIZED_MONTHS, NORMALIZED_VARIANTS,
+)
+from src.grid import SheetGrid
+from src.labeling import compile_labels
+from src.matcher import EXACT, CONTAINED, FRAGMENT, TOKEN_OVERLAP
 
 
 def test_normalize_text():
@@ -20,6 +26,32 @@ def test_normalize_text():
     assert detector.normalize_text("Março") == "marco"
 
 
+def test_normalization_tables():
+    """Test cached normalization and tables built at import."""
+    assert normalize_text("  Saídas   Totais ") == "saidas totais"
+    assert normalize_text("CUSTOS\tFIXOS") == "custos fixos"  # ASCII fast path
+    assert normalize_text(None) == ""
+    assert normalize_text(2024) == "2024"
+    
+    assert NORMALIZED_MONTHS[2] == "marco"
+    assert "receita liquida" in NORMALIZED_VARIANTS['receita_liquida']
+    # Accented duplicates collapse after normalization
+    assert len(NORMALIZED_VARIANTS['receita_liquida']) == 1
+
+
+def test_month_row_with_accents():
+    """Test that accented month headers (Março) are detected."""
+    months = ('Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+              'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro')
+    grid = SheetGrid([(None, 'Orçamento') + months])
+    
+    month_row, month_cols = LabelDetector().find_month_row(grid)
+    assert month_row == 1
+    assert len(month_cols) == 12
+    assert month_cols['março'] == 5
+    assert get_month_number('março') == 3
+
+
 def test_fuzzy_match():
     """Test fuzzy string matching."""
     detector = LabelDetector()
@@ -63,10 +95,102 @@ def test_label_variants():
     assert any('csv' in v.lower() for v in csv_variants)
 
 
+def test_label_index():
+    """Test resolving labels through the inverted index."""
+    grid = SheetGrid([
+        (None, 'Orçamento Empresarial ', 'Janeiro'),
+        (None, 'Faturamento ', 100),
+        (None, '(-) CSV (Custo do Serviço Vendido) - Cursos', 30),
+        (None, '(=) LAIR (Lucro Antes do Imposto)', 70),
+        (None, 'Lucro Liquido', 70),
+        (None, 'IR', 5),
+    ])
+    detector = LabelDetector()
+    index = LabelIndex.for_grid(grid)
+    
+    # Built once per grid
+    assert LabelIndex.for_grid(grid) is index
+    assert index.positions['faturamento'] == [(2, 2)]
+    
+    positions = detector.find_labels(grid, ['faturamento', 'csv', 'lair', 'lucro_liquido', 'aluguel'])
+    assert positions['faturamento'] == (2, 2)
+    assert positions['csv'] == (3, 2)
+    assert positions['lair'] == (4, 2)
+    assert positions['lucro_liquido'] == (5, 2)
+    assert 'aluguel' not in positions
+    
+    # Search area is honored
+    assert detector.find_label(grid, 'lair', search_area=(1, 3, 1, 3)) is None
+    assert detector.find_label(grid, 'lair', search_area=(4, 5, 2, 2)) == (4, 2)
+    
+    # Containment from the n-gram index agrees with a scan of every text
+    for variant in ['lucro', 'CSV', 'lb', 'Lucro Liquido do Exercicio', 'o', 'x', 'ir', 'Lair']:
+        norm = normalize_text(variant)
+        expected = {text for text in index.positions if norm in text or text in norm}
+        assert expected <= index.matching_texts(variant)
+        assert index._containing_texts(norm) == expected
+
+
+def test_label_matcher():
+    """Test multi-pattern classification with match kinds."""
+    matcher = compile_labels({
+        'lucro_bruto': ['Lucro Bruto', 'LB'],
+        'lucro_liquido': ['Lucro Líquido'],
+        'custos_fixos': ['Custos Fixos'],
+    })
+    
+    hits = matcher.match('lucro bruto')
+    assert hits[0].key == 'lucro_bruto' and hits[0].kind == EXACT
+    
+    # Several labels classified from one pass
+    keys = {(hit.key, hit.kind) for hit in matcher.match('(=) lb e lucro liquido')}
+    assert ('lucro_bruto', CONTAINED) in keys
+    assert ('lucro_liquido', CONTAINED) in keys
+    
+    assert matcher.match('custos')[0].kind == FRAGMENT
+    assert matcher.match('fixos custos')[0].kind == TOKEN_OVERLAP
+    assert matcher.match('receita') == ()
+    assert matcher.first_key('custos fixos mensais', kinds=(EXACT, CONTAINED)) == 'custos_fixos'
+    
+    # Fragments come from the sorted suffixes, one entry per character
+    assert len(matcher.suffixes) == sum(len(variant) for variant in matcher.variants)
+    for text in ['lucro', 'ucro l', 'o', 'ixos', 'lucro bruto', 'b', 'zz']:
+        expected = {vid for vid, variant in enumerate(matcher.variants)
+                    if text in variant and text != variant}
+        assert matcher._fragment_of(text) == expected
+
+
+def test_classify_column():
+    """Test classifying a label column in one scan."""
+    grid = SheetGrid([
+        (None, 'Receita com Venda de Serviços '),
+        (None, 'Custos Fixos '),
+        (None, 3000),
+        (None, 'Saldo Acumulado'),
+    ])
+    matcher = compile_labels({
+        'receita_vendas': ['Receita com Venda'],
+        'custos_fixos_saida': ['Custos Fixos'],
+        'saldo_acumulado': ['Saldo Acumulado'],
+    })
+    
+    classified = LabelDetector().classify_column(grid, 2, matcher=matcher)
+    assert [(row, hits[0].key) for row, hits in classified] == [
+        (1, 'receita_vendas'),
+        (2, 'custos_fixos_saida'),
+        (4, 'saldo_acumulado'),
+    ]
+
+
 if __name__ == "__main__":
     test_normalize_text()
+    test_normalization_tables()
+    test_month_row_with_accents()
     test_fuzzy_match()
     test_month_detection()
     test_label_variants()
+    test_label_index()
+    test_label_matcher()
+    test_classify_column()
     print("✓ All labeling tests passed!")
 
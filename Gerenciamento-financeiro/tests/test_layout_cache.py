@@ -0,0 +1,92 @@
+"""
+Tests for layout cache module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import tempfile
+
+import openpyxl
+
+from src.grid import SheetGrid
+from src.layout_cache import LayoutCache
+from src.assumptions import AssumptionsManager
+from src.dre import DREManager
+
+
+def _make_worksheet():
+    """Build a small DRE-like worksheet in memory."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "DRE"
+    months = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+              'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+    for i, month in enumerate(months):
+        ws.cell(2, 3 + i).value = month
+    ws.cell(3, 2).value = "Faturamento"
+    ws.cell(4, 2).value = "Lucro Bruto"
+    for i in range(12):
+        ws.cell(3, 3 + i).value = 1000
+    return ws
+
+
+def test_fingerprint():
+    """Test that only label text and dimensions change the fingerprint."""
+    ws = _make_worksheet()
+    base = LayoutCache.fingerprint(SheetGrid.from_worksheet(ws))
+
+    ws.cell(3, 3).value = 5000  # Numbers do not affect the layout
+    assert LayoutCache.fingerprint(SheetGrid.from_worksheet(ws)) == base
+
+    ws.cell(4, 2).value = "Lucro Operacional"
+    assert LayoutCache.fingerprint(SheetGrid.from_worksheet(ws)) != base
+
+
+def test_warm_run_skips_detection():
+    """Test DRE structure reuse and spot-check invalidation."""
+    ws = _make_worksheet()
+    cache = LayoutCache()
+
+    cold = DREManager(AssumptionsManager(), cache)
+    structure = cold.analyze_dre_structure(ws)
+    assert structure['faturamento'] == 3
+    assert cache.misses == 1
+
+    warm = DREManager(AssumptionsManager(), cache)
+    assert warm.analyze_dre_structure(SheetGrid.from_worksheet(ws)) == structure
+    assert warm.month_row == 2
+    assert warm.month_cols['dezembro'] == 14
+    assert cache.hits == 1
+
+    # A moved month header fails the spot check and triggers a full scan
+    ws.cell(2, 14).value = None
+    ws.cell(2, 15).value = 'Dezembro'
+    rescanned = DREManager(AssumptionsManager(), cache)
+    rescanned.analyze_dre_structure(ws)
+    assert cache.misses == 2
+    assert rescanned.month_cols['dezembro'] == 15
+
+
+def test_persistence():
+    """Test saving and reloading the cache file."""
+    ws = _make_worksheet()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache", "layout.json")
+        cache = LayoutCache(path)
+        cache.put(ws, 'dre', {'month_row': 2}, [(3, 2)])
+        cache.save()
+
+        reloaded = LayoutCache(path)
+        assert reloaded.get(ws, 'dre') == {'month_row': 2}
+
+        reloaded.invalidate('dre')
+        assert reloaded.get(ws, 'dre') is None
+
+
+if __name__ == "__main__":
+    test_fingerprint()
+    test_warm_run_skips_detection()
+    test_persistence()
+    print("✓ All layout cache tests passed!")
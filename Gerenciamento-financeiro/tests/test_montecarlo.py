@@ -0,0 +1,84 @@
+"""
+Tests for Monte Carlo liquidity risk module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from src.cashflow import CashFlowManager
+from src.assumptions import AssumptionsManager
+from src.montecarlo import LiquiditySimulator, draw_mix, summarize_paths
+
+
+DRE_DATA = {
+    'faturamento': [10000] * 12,
+    'csv': [3000] * 12,
+    'custos_fixos': [9000] * 12,
+    'impostos': [500] * 12,
+}
+
+
+def test_reproducible_runs():
+    """Test that a seed gives the same result for any number of workers."""
+    cf = CashFlowManager(AssumptionsManager())
+    
+    serial = cf.simulate_liquidity_risk(DRE_DATA, n_paths=6000, seed=7)
+    sharded = cf.simulate_liquidity_risk(DRE_DATA, n_paths=6000, seed=7, workers=2)
+    assert serial == sharded
+    assert serial['seed'] == 7
+    assert serial['n_paths'] == 6000
+    
+    other = cf.simulate_liquidity_risk(DRE_DATA, n_paths=6000, seed=8)
+    assert other['breach_probability'] != serial['breach_probability']
+
+
+def test_risk_outputs():
+    """Test breach probabilities, bands and shortfall."""
+    cf = CashFlowManager(AssumptionsManager())
+    result = cf.simulate_liquidity_risk(DRE_DATA, n_paths=2000, seed=1)
+    
+    breach = result['breach_probability']
+    assert len(breach) == 12
+    assert all(0.0 <= p <= 1.0 for p in breach)
+    # Losing money every month: risk grows over the year
+    assert breach[-1] > breach[0]
+    assert result['any_breach_probability'] >= max(breach)
+    
+    bands = result['percentiles']
+    assert all(bands[5][m] <= bands[50][m] <= bands[95][m] for m in range(12))
+    assert result['expected_shortfall'] <= bands[50][-1]
+
+
+def test_deterministic_distributions():
+    """Test that disabling every distribution reproduces the single path."""
+    cf = CashFlowManager(AssumptionsManager())
+    simulator = LiquiditySimulator(cf, {key: None for key in LiquiditySimulator.DEFAULT_DISTRIBUTIONS})
+    result = simulator.simulate(DRE_DATA, n_paths=10, seed=0)
+    
+    single = cf.calculate_monthly_cashflow(DRE_DATA)
+    assert np.allclose(result['percentiles'][50], single['accumulated_balance'])
+    assert np.allclose(result['percentiles'][5], result['percentiles'][95])
+
+
+def test_helpers():
+    """Test mix sampling and path summary."""
+    rng = np.random.default_rng(0)
+    mixes = draw_mix(rng, {'dist': 'dirichlet', 'concentration': 50}, [0.7, 0.0, 0.3], 100)
+    assert np.allclose(mixes.sum(axis=1), 1.0)
+    assert (mixes[:, 1] == 0).all()
+    
+    summary = summarize_paths(np.array([[10.0, -5.0], [20.0, 30.0]]), 0.0, tail=0.5)
+    assert summary['breach_probability'] == [0.0, 0.5]
+    assert summary['expected_shortfall'] == -5.0
+    assert summary['mean_deficit'] == 2.5
+
+
+if __name__ == "__main__":
+    test_reproducible_runs()
+    test_risk_outputs()
+    test_deterministic_distributions()
+    test_helpers()
+    print("✓ All Monte Carlo tests passed!")
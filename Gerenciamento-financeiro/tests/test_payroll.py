@@ -0,0 +1,164 @@
+"""
+Tests for payroll module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import openpyxl
+
+from src.io import ExcelWorkbookManager
+from src.payroll import PayrollManager
+from src.payroll_table import PayrollTable
+
+
+HEADER = ['Função ', 'Salário Fixo', 'Encargos', 'Benefícios', 'Custo por Função',
+          'Quantidade por Função', 'Custo Total por Função']
+
+
+def _make_payroll_sheet(n_roles, header_row=3, first_col=2, total=True):
+    """Build a Cargos e Salários-like sheet with n_roles roles."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Cargos e Salários '
+    ws.cell(header_row - 1, first_col).value = 'Quadro de Colaboradores'
+    for offset, label in enumerate(HEADER):
+        ws.cell(header_row, first_col + offset).value = label
+
+    for i in range(n_roles):
+        row = header_row + 1 + i
+        ws.cell(row, first_col).value = f'Cargo {i + 1}'
+        ws.cell(row, first_col + 1).value = 1000.0 * (i + 1)
+        ws.cell(row, first_col + 2).value = 100.0
+        ws.cell(row, first_col + 3).value = 50.0
+        ws.cell(row, first_col + 4).value = f'=SUM(C{row}:E{row})'
+        ws.cell(row, first_col + 5).value = 2
+
+    if total:
+        ws.cell(header_row + 1 + n_roles, first_col).value = 'Total '
+    return ws
+
+
+def test_detect_template_table():
+    """Test detection of the template layout (header in row 3, 13 roles)."""
+    ws = _make_payroll_sheet(13)
+    payroll = PayrollManager()
+    layout = payroll.detect_table(ws)
+
+    assert layout['header_row'] == 3
+    assert (layout['first_row'], layout['last_row'], layout['total_row']) == (4, 16, 17)
+    assert layout['columns'] == {'role': 2, 'salary': 3, 'charges': 4, 'benefits': 5,
+                                 'cost_per_role': 6, 'quantity': 7, 'total_cost': 8}
+
+
+def test_read_any_number_of_roles():
+    """Test that tables longer than the template are read in full."""
+    ws = _make_payroll_sheet(40, header_row=5)
+    payroll = PayrollManager()
+    roles = payroll.read_payroll_data(ws)
+
+    assert len(roles) == 40
+    assert roles['Cargo 40']['cost_per_role'] == 40000.0 + 150.0
+    assert roles['Cargo 40']['total_cost'] == 2 * 40150.0
+    assert payroll.total_payroll == sum(2 * (1000.0 * i + 150.0) for i in range(1, 41))
+
+
+def test_formulas_sized_to_table():
+    """Test formulas and total row sized to the detected table."""
+    wbm = ExcelWorkbookManager("unused.xlsx")
+
+    ws = _make_payroll_sheet(25)
+    payroll = PayrollManager()
+    payroll.read_payroll_data(ws)
+    payroll.update_payroll_sheet(wbm, ws)
+
+    assert ws.cell(28, 6).value == '=SUM(C28:E28)'
+    assert ws.cell(28, 8).value == '=F28*G28'
+    assert ws.cell(29, 3).value == '=SUM(C4:C28)'
+    assert ws.cell(29, 8).value == '=SUM(H4:H28)'
+
+    # Without a total row one is added below the last role
+    ws = _make_payroll_sheet(5, total=False)
+    payroll = PayrollManager()
+    payroll.read_payroll_data(ws)
+    payroll.update_payroll_sheet(wbm, ws)
+    assert ws.cell(9, 2).value == 'Total'
+    assert ws.cell(9, 7).value == '=SUM(G4:G8)'
+
+    # The DRE link follows the total row
+    dre_ws = openpyxl.Workbook().active
+    payroll.link_to_dre(wbm, dre_ws, 21, {'janeiro': 3})
+    assert dre_ws.cell(21, 3).value == "='Cargos e Salários '!$H$9"
+
+
+def test_incremental_totals():
+    """Test that totals follow every change without re-summing."""
+    payroll = PayrollManager()
+    payroll.add_or_update_role('Recepcionista', 2000, 800, 400, 3)
+    payroll.add_or_update_role('Assessora Comercial', 2500, 1000, 500, 2)
+    fixed, variable = payroll.classify_fixed_variable()
+    assert (fixed, variable) == (9600, 8000)
+
+    # Updates replace the old values; new roles follow the classification
+    payroll.add_or_update_role('Recepcionista', 2000, 800, 400, 1)
+    payroll.add_or_update_role('Supervisor Comercial', 4000, 1600, 800, 1)
+    summary = payroll.get_payroll_summary()
+    assert summary['fixed'] == 3200
+    assert summary['variable'] == 14400
+    assert summary['total'] == payroll.total_payroll == 17600
+    assert summary['headcount'] == 4
+    assert summary['average_cost_per_employee'] == 4400
+
+    assert payroll.get_role_details('Recepcionista')['quantity'] == 1
+    assert payroll.get_role_details('Gerente') is None
+    assert payroll.get_cost_by_department({'Recepcionista': 'Atendimento'}) == {
+        'Atendimento': 3200, 'Outros': 14400}
+
+    payroll.table.remove('Supervisor Comercial')
+    assert payroll.total_payroll == 11200
+    assert list(payroll.roles) == ['Recepcionista', 'Assessora Comercial']
+
+
+def test_grouped_rollups():
+    """Test department, branch and monthly roll-ups against plain loops."""
+    rng = np.random.default_rng(7)
+    n = 20000
+    names = [f'E{i:05d}' for i in range(n)]
+    departments = rng.choice(['Clínica', 'Comercial', 'Administrativo'], n).tolist()
+    branches = rng.choice(['Lisboa', 'Porto', 'Braga', 'Faro'], n).tolist()
+    salary = rng.uniform(1000, 9000, n).round(2)
+    starts = rng.integers(1, 13, n)
+    ends = np.where(rng.random(n) < 0.2, rng.integers(1, 13, n), PayrollTable.OPEN_END)
+
+    table = PayrollTable()
+    table.extend(names, salary, salary * 0.3, 500.0, department=departments,
+                 branch=branches, variable=[d == 'Comercial' for d in departments],
+                 start_month=starts, end_month=ends)
+    by_branch = table.group_totals('branch')
+    monthly = table.monthly_cost(12, by='department')
+    summary = table.summary()
+
+    cost = salary * 1.3 + 500.0
+    assert len(table) == n and summary['headcount'] == n
+    assert np.isclose(summary['total'], cost.sum())
+    assert np.isclose(summary['variable'], cost[np.array(departments) == 'Comercial'].sum())
+    for branch, total in by_branch.items():
+        assert np.isclose(total, cost[np.array(branches) == branch].sum())
+    assert list(table.group_totals('department')) == list(dict.fromkeys(departments))
+
+    for month in (1, 6, 12):
+        active = (starts <= month) & (month <= ends)
+        for department, values in monthly.items():
+            mask = active & (np.array(departments) == department)
+            assert np.isclose(values[month - 1], cost[mask].sum())
+
+
+if __name__ == "__main__":
+    test_detect_template_table()
+    test_read_any_number_of_roles()
+    test_formulas_sized_to_table()
+    test_incremental_totals()
+    test_grouped_rollups()
+    print("✓ All payroll tests passed!")
@@ -0,0 +1,116 @@
+"""
+Tests for payroll projection module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from src.dre import DREMatrix
+from src.payroll import PayrollManager
+from src.payroll_projection import PayrollProjection
+from src.payroll_table import PayrollTable
+
+
+def test_raises_hires_and_terminations():
+    """Test raises, hire and termination months on the accrual basis."""
+    table = PayrollTable()
+    table.upsert('Recepcionista', 2000, 400, 300, 2, department='Atendimento')
+    table.upsert('Biomédica', 6000, 1200, 500, 1, department='Clínica', start_month=4, end_month=9)
+
+    projection = PayrollProjection(table, thirteenth=False, vacation_bonus=False)
+    projection.add_raise(7, 0.10, department='Atendimento')
+    monthly = projection.project()
+
+    salary = monthly['salary']
+    assert salary[0].tolist() == [4000] * 6 + [4400] * 6
+    assert salary[1].tolist() == [0] * 3 + [6000] * 6 + [0] * 3
+
+    # Charges keep each role's ratio to salary; benefits are not raised
+    assert np.allclose(monthly['charges'][0], salary[0] * 0.2)
+    assert monthly['benefits'][0].tolist() == [600] * 12
+    assert np.allclose(monthly['total'].sum(axis=0), projection.monthly())
+
+    by_department = projection.monthly(by='department')
+    assert list(by_department) == ['Atendimento', 'Clínica']
+    assert by_department['Clínica'][3] == 6000 + 1200 + 500
+
+
+def test_statutory_extras():
+    """Test 13th salary and vacation bonus on accrual and cash bases."""
+    table = PayrollTable()
+    table.upsert('Gerente', 12000, 0, 0, 1)
+    table.upsert('Assistente', 3600, 0, 0, 1, end_month=5)
+
+    projection = PayrollProjection(table, months=24, charges_rates=0.25)
+    accrual = projection.project('accrual')
+    cash = projection.project('cash')
+
+    assert np.allclose(accrual['thirteenth'][0], 1000)
+    assert np.allclose(accrual['vacation_bonus'][0], 12000 / 36)
+    assert np.allclose(accrual['charges'][0], (12000 + 1000 + 12000 / 36) * 0.25)
+
+    # Half in November, the rest in December, every year
+    thirteenth = cash['thirteenth'][0]
+    assert thirteenth[10] == thirteenth[22] == 5500
+    assert thirteenth[11] == thirteenth[23] == 6500
+    assert thirteenth[:10].sum() == 0
+
+    # A termination settles the accrued 13th in its last month
+    assert np.isclose(cash['thirteenth'][1][4], 5 * 300)
+    assert cash['thirteenth'][1].sum() == cash['thirteenth'][1][4]
+
+    # Both bases cost the same over whole years
+    assert np.isclose(cash['total'].sum(), accrual['total'].sum())
+
+
+def test_yearly_raise_and_dre():
+    """Test yearly raises over a multi-year plan and the DRE hand-off."""
+    payroll = PayrollManager()
+    payroll.add_or_update_role('Recepcionista', 2000, 400, 0, 1)
+    projection = payroll.project(months=36, first_calendar_month=1)
+    projection.thirteenth = projection.vacation_bonus = False
+    projection.add_raise(5, 0.05, every_year=True)
+
+    salary = projection.monthly(component='salary')
+    assert salary[3] == 2000 and np.isclose(salary[4], 2100)
+    assert np.isclose(salary[16], 2205) and np.isclose(salary[28], 2000 * 1.05 ** 3)
+
+    # The static payroll carried in custos_fixos is replaced month by month
+    months = [f'm{i}' for i in range(36)]
+    dre = DREMatrix(np.tile([[10000.0], [5000.0]], 36), ['faturamento', 'custos_fixos'], months)
+    updated = projection.apply_to_dre(dre)
+    assert np.allclose(updated.row('custos_fixos'), 5000 - 2400 + projection.monthly())
+    assert np.array_equal(updated.row('faturamento'), dre.row('faturamento'))
+
+
+def test_large_headcount_plan():
+    """Test a multi-year plan for many employees."""
+    rng = np.random.default_rng(3)
+    n = 12000
+    table = PayrollTable()
+    table.extend([f'E{i}' for i in range(n)], rng.uniform(1500, 9000, n), 0, 400,
+                 department=rng.choice(['Clínica', 'Comercial', 'Apoio'], n).tolist(),
+                 branch=rng.choice(['Lisboa', 'Porto', 'Faro'], n).tolist(),
+                 start_month=rng.integers(1, 37, n),
+                 end_month=np.where(rng.random(n) < 0.1, rng.integers(1, 37, n), PayrollTable.OPEN_END))
+
+    projection = PayrollProjection(table, months=36, charges_rates=np.full(36, 0.358))
+    projection.add_raise(1, 0.06, every_year=True)
+    projection.add_raise(13, 0.02, branch='Porto')
+    total = projection.monthly('cash')
+    by_branch = projection.monthly('accrual', by='branch')
+
+    assert total.shape == (36,)
+    assert np.isclose(sum(values.sum() for values in by_branch.values()),
+                      projection.monthly('accrual').sum())
+
+
+if __name__ == "__main__":
+    test_raises_hires_and_terminations()
+    test_statutory_extras()
+    test_yearly_raise_and_dre()
+    test_large_headcount_plan()
+    print("✓ All payroll projection tests passed!")
@@ -0,0 +1,150 @@
+"""
+Tests for scenario pipeline module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from src.assumptions import AssumptionsManager
+from src.cashflow import CashFlowManager
+from src.dre import DREMatrix
+from src.payroll import PayrollManager
+from src.pipeline import ScenarioPipeline, SharedArrays
+from src.scenarios import ScenarioManager
+
+
+BASE_METRICS = {'revenue': 1200000.0, 'csv': 360000.0, 'fixed_costs': 480000.0}
+
+
+def make_pipeline():
+    manager = ScenarioManager(AssumptionsManager())
+    matrix = DREMatrix(
+        np.array([[100000.0] * 12, [30000.0] * 12, [40000.0] * 12, [15000.0] * 12]),
+        ['faturamento', 'csv', 'custos_fixos', 'custos_variaveis'],
+        [f"m{i}" for i in range(1, 13)],
+    )
+    products = {
+        'Implantologia': {'receita_liquida': 1000.0, 'csv': 300.0, 'despesas_variaveis': 100.0},
+        'Curso de Capacitação': {'receita_liquida': 500.0},
+    }
+    roles = {'Dentista': {'total_cost': 5000.0}, 'Assessora Comercial': {'total_cost': 2000.0}}
+    
+    pipeline = ScenarioPipeline(manager)
+    pipeline.load_inputs(matrix, products, roles)
+    return manager, pipeline
+
+
+def test_shared_arrays():
+    """Test packing arrays into shared memory and attaching to them."""
+    shared = SharedArrays({'a': np.arange(6.0).reshape(2, 3), 'b': [1.0, 2.0]})
+    try:
+        shm, views = SharedArrays.attach(shared.spec)
+        assert views['a'].tolist() == [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]
+        assert views['b'].tolist() == [1.0, 2.0]
+        assert not views['a'].flags.writeable
+        views = None
+        shm.close()
+    finally:
+        shared.close()
+
+
+def test_pipeline_matches_comparison():
+    """Test the full-model results against the aggregate scenario math."""
+    manager, pipeline = make_pipeline()
+    results = pipeline.run(workers=1)
+    comparison = manager.get_scenario_comparison(BASE_METRICS)
+    
+    assert list(results) == manager.get_scenario_list()
+    for name, metrics in results.items():
+        assert abs(metrics['faturamento'] - comparison[name]['revenue']) < 1e-6
+        assert abs(metrics['lucro_bruto'] - comparison[name]['lucro_bruto']) < 1e-6
+        assert abs(metrics['lair'] - comparison[name]['lair']) < 1e-6
+    
+    base = results['Base']
+    assert base['receita_liquida[Odonto e Estética]'] == 1000.0
+    assert base['receita_liquida[Cursos]'] == 500.0
+    assert base['margem_contribuicao_produtos'] == 1100.0
+    assert base['folha_fixa'] == 5000.0 and base['folha_variavel'] == 2000.0
+    
+    # Cash flow of the base scenario equals a direct calculation
+    cashflow = CashFlowManager(manager.base_assumptions)
+    single = cashflow.calculate_monthly_cashflow({
+        'faturamento': [100000.0] * 12, 'csv': [30000.0] * 12,
+        'custos_fixos': [40000.0] * 12, 'custos_variaveis': [15000.0] * 12,
+    })
+    assert abs(base['ending_balance'] - single['accumulated_balance'][-1]) < 1e-6
+
+
+def test_payroll_table_flags():
+    """Test that the payroll table's own fixed/variable classification is used."""
+    manager, pipeline = make_pipeline()
+    payroll = PayrollManager()
+    payroll.add_or_update_role('Dentista', 4000, 800, 200, 1)
+    payroll.add_or_update_role('Assessora Comercial', 1500, 300, 200, 1)
+    payroll.add_or_update_role('Consultor Externo', 1000, 0, 0, 2)
+    payroll.classify_fixed_variable(['Consultor'])
+    
+    pipeline.load_inputs(DREMatrix(pipeline.arrays['dre'], pipeline.meta['dre_rows'],
+                                   pipeline.meta['months']), None, payroll.table)
+    base = pipeline.run(workers=1)['Base']
+    assert base['folha_fixa'] == 7000.0 and base['folha_variavel'] == 2000.0
+
+
+def test_components_added_to_dre():
+    """Test that products and payroll feed the DRE and cash flow of a formula-only sheet."""
+    manager = ScenarioManager(AssumptionsManager())
+    months = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 'Julho',
+              'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+    # Totals are formulas in the sheet, so only the rent typed into custos_fixos reads
+    matrix = DREMatrix(np.array([[0.0] * 12, [0.0] * 12, [3000.0] * 12]),
+                       ['faturamento', 'csv', 'custos_fixos'], months)
+    products = {'Implantologia': {'receita_liquida': 600000.0, 'csv': 180000.0}}
+    payroll = PayrollManager()
+    payroll.add_or_update_role('Dentista', 8000, 2000, 0, 1)
+    payroll.add_or_update_role('Assessora Comercial', 3000, 1000, 0, 1)
+    payroll.classify_fixed_variable()
+    projection = payroll.project(months=12)
+
+    pipeline = ScenarioPipeline(manager)
+    pipeline.load_inputs(matrix, products, payroll.table, payroll_projection=projection,
+                         add_components=True)
+    base = pipeline.run(['Base'], workers=1)['Base']
+
+    fixed = projection.dre_lines(variable_line='custos_variaveis')
+    assert abs(base['faturamento'] - 600000.0) < 1e-6
+    assert abs(base['lair'] - (600000.0 - 180000.0 - 36000.0 - fixed['custos_fixos'].sum()
+                               - fixed['custos_variaveis'].sum())) < 1e-6
+
+    cashflow = CashFlowManager(manager.base_assumptions)
+    single = cashflow.calculate_monthly_cashflow({
+        'faturamento': [50000.0] * 12, 'csv': [15000.0] * 12,
+        'custos_fixos': (fixed['custos_fixos'] + 3000.0).tolist(),
+        'custos_variaveis': fixed['custos_variaveis'].tolist(),
+    })
+    assert abs(base['ending_balance'] - single['accumulated_balance'][-1]) < 1e-6
+
+    # Without the flag the DRE is taken as complete
+    pipeline.load_inputs(matrix, products, payroll.table, payroll_projection=projection)
+    assert pipeline.run(['Base'], workers=1)['Base']['lair'] == -36000.0
+
+
+def test_pipeline_parallel():
+    """Test that worker processes give the in-process results."""
+    _, pipeline = make_pipeline()
+    assert pipeline.run(workers=2) == pipeline.run(workers=1)
+    
+    subset = pipeline.run(['Otimista', 'Pessimista'], workers=2)
+    assert list(subset) == ['Otimista', 'Pessimista']
+    assert subset['Otimista']['lair'] > subset['Pessimista']['lair']
+
+
+if __name__ == "__main__":
+    test_shared_arrays()
+    test_pipeline_matches_comparison()
+    test_payroll_table_flags()
+    test_components_added_to_dre()
+    test_pipeline_parallel()
+    print("✓ All pipeline tests passed!")
@@ -0,0 +1,231 @@
+"""
+Tests for product store module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import openpyxl
+
+from src.assumptions import AssumptionsManager
+from src.io import ExcelWorkbookManager
+from src.product_store import ProductStore, ProductRanking
+from src.products import ProductDREAnalyzer
+
+
+LINES = ['receita_bruta', 'receita_liquida', 'csv', 'lucro_bruto', 'margem_contribuicao', 'lucro_operacional']
+
+
+def _make_product_sheet(products):
+    """Build a DRE por Produto-like sheet: products in row 3, labels in column B."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    labels = ['Receita Bruta', 'Receita Líquida', 'Custo dos Serviços Vendidos', 'Lucro Bruto']
+    for i, label in enumerate(labels):
+        ws.cell(5 + i, 2).value = label
+    for j, (name, revenue) in enumerate(products):
+        col = 4 + j
+        ws.cell(3, col).value = name
+        ws.cell(5, col).value = revenue * 1.1
+        ws.cell(6, col).value = revenue
+        ws.cell(7, col).value = revenue * 0.4
+        ws.cell(8, col).value = revenue * 0.6
+    return ws
+
+
+def test_store_aggregation():
+    """Test category roll-ups and vectorized metrics."""
+    store = ProductStore(capacity=2)
+    values = np.array([
+        [110, 100, 40, 60, 50, 20],
+        [220, 200, 120, 80, 60, 10],
+        [55, 0, 5, -5, -5, -10],
+    ], dtype=float)
+    store.set_products(['Botox', 'Curso A', 'Lentes'], LINES, values,
+                       categories=['Odonto e Estética', 'Cursos', 'Odonto e Estética'])
+
+    aggregates = store.aggregate(['receita_liquida', 'csv', 'despesas_variaveis'])
+    assert list(aggregates) == ['Odonto e Estética', 'Cursos']
+    assert aggregates['Odonto e Estética'] == {'receita_liquida': 100, 'csv': 45, 'despesas_variaveis': 0}
+
+    metrics = store.metrics()
+    assert metrics['margem_bruta_pct'].tolist() == [60, 40, 0]
+    assert metrics['margem_operacional_pct'].tolist() == [20, 5, 0]
+
+    # Overwriting a product keeps its row; the view only shows lines read
+    store.set_products(['Curso A'], ['csv'], [[100.0]])
+    assert store.names == ['Botox', 'Curso A', 'Lentes']
+    assert store.product_data['Curso A']['csv'] == 100
+    assert set(store.product_data['Botox']) == set(LINES)
+    assert 'rateio_fixos' not in store.product_data['Botox']
+
+
+def test_analyzer_uses_store():
+    """Test reading a sheet into the store and categorizing once per assumptions."""
+    assumptions = AssumptionsManager()
+    analyzer = ProductDREAnalyzer(assumptions)
+    data = analyzer.read_product_dre(_make_product_sheet([('Botox', 1000), ('Curso Avançado', 500)]))
+
+    assert list(data) == ['Botox', 'Curso Avançado']
+    assert data['Botox']['receita_liquida'] == 1000
+    assert data['Botox']['csv'] == 400
+
+    calls = []
+    classify = assumptions.get_category_for_product
+    assumptions.get_category_for_product = lambda name: calls.append(name) or classify(name)
+    first = analyzer.aggregate_by_category()
+    analyzer.aggregate_by_category()
+    assert len(calls) == 2
+    assert sum(category['receita_liquida'] for category in first.values()) == 1500
+
+    # A change to the assumptions recategorizes
+    assumptions.add_product_mapping('Botox', 'Cursos')
+    second = analyzer.aggregate_by_category()
+    assert len(calls) == 4
+    assert second['Cursos']['receita_liquida'] >= 1000
+
+    metrics = analyzer.calculate_all_product_metrics()
+    assert metrics['Botox'] == analyzer.calculate_product_metrics('Botox')
+
+
+def test_thousands_of_products():
+    """Test roll-ups over thousands of procedure codes."""
+    rng = np.random.default_rng(11)
+    n = 5000
+    store = ProductStore()
+    categories = rng.choice(['Odonto e Estética', 'Cursos', 'Implante Capilar'], n).tolist()
+    values = rng.uniform(0, 1000, (n, len(ProductStore.LINES)))
+    store.set_products([f'P{i:05d}' for i in range(n)], ProductStore.LINES, values, categories)
+    aggregates = store.aggregate()
+    metrics = store.metrics()
+
+    mask = np.array(categories) == 'Cursos'
+    assert np.isclose(aggregates['Cursos']['receita_liquida'], values[mask, 3].sum())
+    assert metrics['margem_bruta_pct'].shape == (n,)
+
+
+def _make_dre_sheet(ws):
+    """Lay out the category rows of the main DRE (months in C..N of row 6)."""
+    months = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 'Julho',
+              'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+    for j, month in enumerate(months):
+        ws.cell(6, 3 + j).value = month
+    ws.cell(7, 2).value = 'Faturamento'
+    ws.cell(7, 3).value = '=SUM(C8:C10)'
+    for row, label in ((8, 'Odonto e Estética'), (9, 'Cursos'), (10, 'Implante Capilar '),
+                       (12, '(-) CSV (Custo do Serviço Vendido) - Odonto e Estética'),
+                       (13, '(-) CSV (Custo do Serviço Vendido) - Cursos'),
+                       (14, '(-) CSV (Custo do Serviço Vendido) - Implante Capilar')):
+        ws.cell(row, 2).value = label
+        for col in range(3, 15):
+            ws.cell(row, col).value = 7.0
+    ws.cell(9, 5).value = '=D9'
+    return {month: 3 + j for j, month in enumerate(months)}
+
+
+def test_write_monthly_to_dre():
+    """Test distributing category totals over the DRE months in batched writes."""
+    assumptions = AssumptionsManager()
+    assumptions.set_seasonality([0.05] * 4 + [0.1] * 8)
+    assumptions.add_product_mapping('Curso Avançado', 'Cursos')
+    analyzer = ProductDREAnalyzer(assumptions)
+    analyzer.read_product_dre(_make_product_sheet([('Botox', 1000), ('Curso Avançado', 500), ('Lentes', 200)]))
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    month_cols = _make_dre_sheet(ws)
+    wbm = ExcelWorkbookManager('unused.xlsx')
+    calls = []
+    write_range = wbm.write_range
+    wbm.write_range = lambda *args, **kwargs: calls.append(args[1:3]) or write_range(*args, **kwargs)
+
+    assert analyzer.find_category_rows(wbm.get_grid(ws), 6) == {
+        'Odonto e Estética': {'revenue': 8, 'csv': 12},
+        'Cursos': {'revenue': 9, 'csv': 13},
+        'Implante Capilar': {'revenue': 10, 'csv': 14},
+    }
+    for col in month_cols.values():
+        ws.cell(13, col).value = '=0'
+    written = analyzer.write_aggregated_to_dre(wbm, ws, 6, month_cols)
+
+    # One range per block of adjacent rows, whatever the number of products
+    assert calls == [(8, 3), (12, 3)]
+    assert sorted(written) == [8, 9, 12]
+    assert np.allclose(list(written[8].values()), np.array(assumptions.assumptions['monthly_seasonality']) * 1200)
+
+    # Kept formulas are not reported as written (row 13 holds only formulas)
+    assert sorted(written[9]) == [3, 4] + list(range(6, 15))
+    assert np.isclose(ws.cell(8, 3).value, 60) and np.isclose(ws.cell(12, 14).value, 480 * 0.1)
+    assert np.isclose(ws.cell(9, 4).value, 25) and ws.cell(9, 5).value == '=D9'
+
+    # Categories without products keep their manual values
+    assert ws.cell(10, 3).value == 7.0 and ws.cell(14, 3).value == 7.0
+    assert wbm.get_grid(ws).cell(8, 3) == ws.cell(8, 3).value
+
+
+def _sorted_top(store, n, metric):
+    """Reference ranking: full stable sort, as the dashboard used to do."""
+    scores = ProductRanking(store).scores(metric)
+    return sorted(store.names, key=lambda name: scores[store.names.index(name)], reverse=True)[:n]
+
+
+def test_ranking_updates():
+    """Test top-N by several metrics while products change and are added."""
+    store = ProductStore()
+    store.set_products(['A', 'B', 'C', 'D'], ['receita_liquida', 'csv'],
+                       [[100, 40], [300, 270], [200, 50], [100, 10]])
+    ranking = store.ranking
+
+    assert ranking.top(3) == [('B', 300), ('C', 200), ('A', 100)]
+    assert [name for name, _ in ranking.top(2, 'margem_bruta')] == ['C', 'D']
+    assert ranking.top(1, 'margem_bruta_pct') == [('D', 90)]
+    assert ProductStore.from_product_data(store.product_data) is store
+
+    # A top product falling out, a new product entering, a tie in row order
+    store.set_products(['B'], ['receita_liquida'], [[50]])
+    assert [name for name, _ in ranking.top(3)] == ['C', 'A', 'D']
+    store.set_products(['E'], ['receita_liquida', 'csv'], [[250, 0]])
+    assert [name for name, _ in ranking.top(3)] == ['E', 'C', 'A']
+    assert ranking.top(2, 'margem_bruta') == [('E', 250), ('C', 150)]
+
+    plain = ProductStore.from_product_data({'X': {'receita_liquida': 5, 'csv': 1}, 'Y': {'receita_liquida': 7}})
+    assert plain.ranking.top(5) == [('Y', 7), ('X', 5)]
+
+    rng = np.random.default_rng(5)
+    store = ProductStore()
+    store.set_products([f'P{i}' for i in range(300)], ['receita_liquida', 'csv'],
+                       rng.integers(0, 20, (300, 2)).astype(float))
+    for _ in range(50):
+        for metric in ('receita_liquida', 'margem_bruta', 'margem_bruta_pct'):
+            assert [name for name, _ in store.ranking.top(10, metric)] == _sorted_top(store, 10, metric)
+        changed = rng.integers(0, 320, 3)
+        store.set_products([f'P{i}' for i in changed], ['receita_liquida'], rng.integers(0, 20, (3, 1)))
+
+
+def test_ranking_large_catalog():
+    """Test top-N over a large catalog with frequent updates."""
+    rng = np.random.default_rng(8)
+    n = 200000
+    store = ProductStore()
+    names = [f'P{i:06d}' for i in range(n)]
+    store.set_products(names, ['receita_liquida', 'csv'], rng.uniform(0, 1e6, (n, 2)))
+    ranking = store.ranking
+    ranking.top(10)
+    for i in range(200):
+        store.set_products([names[rng.integers(n)]], ['receita_liquida'], [[rng.uniform(0, 2e6)]])
+        top = ranking.top(10)
+
+    revenue = ranking.scores('receita_liquida')
+    assert [score for _, score in top] == np.sort(revenue)[::-1][:10].tolist()
+
+
+if __name__ == "__main__":
+    test_store_aggregation()
+    test_analyzer_uses_store()
+    test_thousands_of_products()
+    test_write_monthly_to_dre()
+    test_ranking_updates()
+    test_ranking_large_catalog()
+    print("✓ All product store tests passed!")
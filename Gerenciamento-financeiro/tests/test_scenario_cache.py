@@ -0,0 +1,125 @@
+"""
+Tests for scenario cache module
+"""
+
+import sys
+import os
+import tempfile
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.scenario_cache import ScenarioCache, canonical_key
+from src.scenarios import ScenarioManager
+from src.assumptions import AssumptionsManager
+
+
+BASE_METRICS = {'revenue': 1265000, 'csv': 400000, 'fixed_costs': 300000}
+
+
+def test_canonical_key():
+    """Test that keys ignore dictionary order and track every input."""
+    assert canonical_key({'a': 1, 'b': 2}, (0.1,)) == canonical_key({'b': 2, 'a': 1}, [0.1])
+    assert canonical_key({'a': 1}) != canonical_key({'a': 1.5})
+    assert canonical_key({'a': 1}, {}) != canonical_key({'a': 1}, {'x': 1})
+
+
+def test_lru_eviction():
+    """Test bounded size, recency order and counters."""
+    cache = ScenarioCache(max_entries=2)
+    cache.put('a', {'v': 1})
+    cache.put('b', {'v': 2})
+
+    # Touching 'a' makes 'b' the least recently used
+    assert cache.get('a') == {'v': 1}
+    cache.put('c', {'v': 3})
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert cache.get('b') is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 2
+
+    # Returned values are copies
+    value = cache.get('a')
+    value['v'] = 99
+    assert cache.get('a') == {'v': 1}
+
+
+def test_comparison_is_memoized():
+    """Test that repeated comparisons hit the cache with identical results."""
+    manager = ScenarioManager(AssumptionsManager())
+    scenarios = len(manager.get_scenario_list())
+
+    first = manager.get_scenario_comparison(BASE_METRICS)
+    assert manager.cache.misses == scenarios
+
+    second = manager.get_scenario_comparison(BASE_METRICS)
+    assert second == first
+    assert manager.cache.hits == scenarios
+
+    # Changed deltas, metrics or assumptions are recomputed
+    manager.add_scenario('Custom', 'Teste', {'price_adjustment': 1.2})
+    manager.get_scenario_comparison(BASE_METRICS)
+    assert manager.cache.misses == scenarios + 1
+
+    manager.get_scenario_comparison({**BASE_METRICS, 'revenue': 1000000})
+    manager.base_assumptions.set_growth_rate(0.30)
+    changed = manager.get_scenario_comparison(BASE_METRICS)
+    assert manager.cache.misses == 3 * (scenarios + 1)
+    assert changed['Otimista']['revenue'] != first['Otimista']['revenue']
+
+
+def test_cache_persistence():
+    """Test saving and reloading the cache file."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'scenario_cache.json')
+        cache = ScenarioCache(cache_path=path)
+        manager = ScenarioManager(AssumptionsManager(), cache)
+        expected = manager.get_scenario_comparison(BASE_METRICS)
+        cache.save()
+
+        reloaded = ScenarioCache(cache_path=path)
+        assert len(reloaded) == len(cache)
+        manager = ScenarioManager(AssumptionsManager(), reloaded)
+        assert manager.get_scenario_comparison(BASE_METRICS) == expected
+        assert reloaded.misses == 0
+
+
+def test_shared_cache():
+    """Test one cache shared by managers rebuilt on every request and by threads."""
+    cache = ScenarioCache(max_entries=8)
+    expected = ScenarioManager(AssumptionsManager(), cache).get_scenario_comparison(BASE_METRICS)
+    scenarios = len(expected)
+
+    # A new manager (as on each dashboard rerun) reuses the results
+    assert ScenarioManager(AssumptionsManager(), cache).get_scenario_comparison(BASE_METRICS) == expected
+    assert cache.hits == scenarios
+
+    errors = []
+
+    def rerun(i):
+        try:
+            metrics = {**BASE_METRICS, 'revenue': BASE_METRICS['revenue'] + i % 3}
+            ScenarioManager(AssumptionsManager(), cache).get_scenario_comparison(metrics)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=rerun, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(cache) <= 8
+
+
+if __name__ == "__main__":
+    test_canonical_key()
+    test_lru_eviction()
+    test_comparison_is_memoized()
+    test_cache_persistence()
+    test_shared_cache()
+    print("✓ All scenario cache tests passed!")
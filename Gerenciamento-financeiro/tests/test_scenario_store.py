@@ -0,0 +1,116 @@
+"""
+Tests for scenario store module
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from src.assumptions import AssumptionsManager
+from src.scenario_store import ScenarioStore
+from src.scenarios import ScenarioManager
+
+
+BASE_METRICS = {'revenue': 1265000, 'csv': 400000, 'fixed_costs': 300000}
+
+
+def test_scenario_definitions():
+    """Test saving, updating and reloading scenario definitions."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'scenarios.db')
+        manager = ScenarioManager(AssumptionsManager())
+        
+        with ScenarioStore(path) as store:
+            store.save_scenarios(manager)
+            store.save_scenario('Otimista', 'Revisado', {'growth_rate_2025': 0.25})
+        
+        with ScenarioStore(path) as store:
+            scenarios = store.load_scenarios()
+        
+        assert list(scenarios) == manager.get_scenario_list()
+        assert scenarios['Otimista'] == {'description': 'Revisado', 'deltas': {'growth_rate_2025': 0.25}}
+        assert scenarios['Conservador'] == manager.scenarios['Conservador']
+        
+        # Seeding only adds missing scenarios, never overwrites edits
+        manager.add_scenario('Expansão', 'Nova unidade', {'volume_adjustment': 1.3})
+        with ScenarioStore(path) as store:
+            assert store.seed_scenarios(manager) == 1
+            scenarios = store.load_scenarios()
+        assert scenarios['Otimista']['description'] == 'Revisado'
+        assert scenarios['Expansão']['deltas'] == {'volume_adjustment': 1.3}
+
+
+def test_record_and_rank_runs():
+    """Test recording results and querying them by indexed metrics."""
+    manager = ScenarioManager(AssumptionsManager())
+    store = ScenarioStore()
+    store.save_scenarios(manager)
+    
+    comparison = manager.get_scenario_comparison(BASE_METRICS)
+    assert store.record_runs(comparison, data_version='v1') == len(comparison)
+    
+    best = store.top('margem_lair_pct', n=1)[0]
+    expected = max(comparison, key=lambda name: comparison[name]['margem_lair_pct'])
+    assert best['scenario'] == expected
+    assert best['metrics'] == comparison[expected]
+    assert best['deltas'] == manager.scenarios[expected]['deltas']
+    
+    # Bounds and ascending order
+    low_revenue = store.top('lair', n=10, ascending=True, revenue=(None, 1300000))
+    assert [run['metrics']['lair'] for run in low_revenue] == sorted(
+        metrics['lair'] for metrics in comparison.values() if metrics['revenue'] <= 1300000)
+    
+    # The same data and deltas are not recorded twice
+    assert store.record_runs(comparison, data_version='v1', skip_recorded=True) == 0
+    manager.add_scenario('Base', 'Revisado', {'price_adjustment': 1.05})
+    assert store.record_runs(comparison, data_version='v1', scenarios=manager.scenarios,
+                             skip_recorded=True) == 1
+    assert store.count_runs() == len(comparison) + 1
+    
+    # Latest run per scenario
+    store.record_runs({'Base': {**comparison['Base'], 'lair': 1.0}}, data_version='v2')
+    latest = store.latest_runs()
+    assert latest['Base']['data_version'] == 'v2'
+    assert latest['Otimista']['data_version'] == 'v1'
+    
+    for bad in (lambda: store.top('lair; DROP TABLE runs'),
+                lambda: store.top('lair', csv=(0, None)),
+                lambda: store.record_runs({'Desconhecido': {}})):
+        try:
+            bad()
+            assert False, "Invalid query should be rejected"
+        except ValueError:
+            pass
+    store.close()
+
+
+def test_record_sweep():
+    """Test storing a sweep and filtering it by cash and margin."""
+    manager = ScenarioManager(AssumptionsManager())
+    table = manager.sweep_scenarios(BASE_METRICS, {
+        'price_adjustment': np.linspace(0.8, 1.2, 20),
+        'commission_pct': np.linspace(0.05, 0.15, 10),
+    })
+    
+    store = ScenarioStore()
+    assert store.record_table(table, label='sweep') == len(table)
+    assert store.count_runs() == len(table)
+    
+    top = store.top('margem_lair_pct', n=20, label='sweep', lair=(300000, None))
+    assert len(top) == 20
+    margins = [run['metrics']['margem_lair_pct'] for run in top]
+    assert margins == sorted(margins, reverse=True)
+    assert all(run['metrics']['lair'] >= 300000 for run in top)
+    assert top[0]['metrics']['margem_lair_pct'] == table.top('margem_lair_pct', n=1)[0]['margem_lair_pct']
+    assert set(top[0]['deltas']) == {'price_adjustment', 'commission_pct'}
+    store.close()
+
+
+if __name__ == "__main__":
+    test_scenario_definitions()
+    test_record_and_rank_runs()
+    test_record_sweep()
+    print("✓ All scenario store tests passed!")
@@ -0,0 +1,159 @@
+"""
+Tests for scenarios module
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from src.scenarios import ScenarioManager
+from src.assumptions import AssumptionsManager
+from src.cashflow import CashFlowManager
+
+
+BASE_METRICS = {'revenue': 1265000, 'csv': 400000, 'fixed_costs': 300000}
+
+
+def test_sweep_mirrors_comparison():
+    """Test that a one-point sweep reproduces get_scenario_comparison."""
+    manager = ScenarioManager(AssumptionsManager())
+    comparison = manager.get_scenario_comparison(BASE_METRICS)
+    
+    for name in ('Otimista', 'Pessimista', 'Conservador'):
+        deltas = manager.scenarios[name]['deltas']
+        table = manager.sweep_scenarios(BASE_METRICS, {k: [v] for k, v in deltas.items()})
+        row = table.rows([0])[0]
+        for metric, value in comparison[name].items():
+            assert abs(row[metric] - value) < 1e-6
+
+
+def test_sweep_grid():
+    """Test grid size, parameter columns and ranking."""
+    manager = ScenarioManager(AssumptionsManager())
+    table = manager.sweep_scenarios(BASE_METRICS, {
+        'price_adjustment': [0.9, 1.0, 1.1],
+        'commission_pct': [0.08, 0.10],
+        'fixed_cost_adjustment': np.linspace(1.0, 1.2, 5),
+    })
+    
+    assert len(table) == 30
+    assert table.columns[:3] == ['price_adjustment', 'commission_pct', 'fixed_cost_adjustment']
+    assert sorted(set(table.column('commission_pct').tolist())) == [0.08, 0.10]
+    
+    best = table.top('lair', n=1)[0]
+    assert best['price_adjustment'] == 1.1
+    assert best['commission_pct'] == 0.08
+    assert best['fixed_cost_adjustment'] == 1.0
+    assert best['lair'] == table.column('lair').max()
+    
+    worst = table.top('lair', n=2, ascending=True)
+    assert worst[0]['lair'] <= worst[1]['lair']
+
+
+def test_sweep_filter():
+    """Test filtering the result table."""
+    manager = ScenarioManager(AssumptionsManager())
+    table = manager.sweep_scenarios(BASE_METRICS, {
+        'growth_rate_2025': [0.05, 0.15, 0.25],
+        'marketing_pct': [0.03, 0.05, 0.07],
+    })
+    
+    profitable = table.filter(margem_lair_pct=(30.0, None))
+    assert len(profitable) < len(table)
+    assert (profitable.column('margem_lair_pct') >= 30.0).all()
+    
+    narrowed = profitable.filter(profitable.column('growth_rate_2025') == 0.25)
+    assert set(narrowed.column('growth_rate_2025').tolist()) == {0.25}
+    
+    try:
+        manager.sweep_scenarios(BASE_METRICS, {'discount_pct': [0.1]})
+        assert False, "Unknown parameter should be rejected"
+    except ValueError:
+        pass
+
+
+def test_scenario_overlays():
+    """Test scenario assumptions and applied values as overlays."""
+    assumptions = AssumptionsManager()
+    manager = ScenarioManager(assumptions)
+    
+    optimistic = manager.get_scenario_assumptions('Otimista')
+    assert optimistic['growth_rate_2025'] == 0.20
+    assert optimistic['commission_defaults']['sales_commission_pct'] == 0.12
+    assert optimistic['marketing_defaults']['marketing_pct_revenue'] == 0.04
+    assert optimistic['ar_terms'] is assumptions.assumptions['ar_terms']
+    assert assumptions.assumptions['growth_rate_2025'] == 0.15
+    
+    base_values = {'csv_adjustment': 2.0, 'commission_pct': 0.10, 'other': 1.0}
+    adjusted = manager.apply_scenario('Conservador', base_values)
+    assert abs(adjusted['csv_adjustment'] - 2.2) < 1e-9
+    assert adjusted['other'] == 1.0
+    assert base_values['csv_adjustment'] == 2.0
+    assert 'marketing_pct' not in adjusted
+    assert isinstance(adjusted, dict)
+
+
+def test_goal_seek_margin():
+    """Test solving a parameter for a comparison metric."""
+    manager = ScenarioManager(AssumptionsManager())
+    
+    result = manager.goal_seek(BASE_METRICS, 'price_adjustment', 'margem_lair_pct', 20.0)
+    assert result['converged']
+    assert abs(result['achieved'] - 20.0) < 1e-6
+    
+    # Same answer through the scenario arithmetic
+    manager.add_scenario('Meta', 'Margem LAIR de 20%', {'price_adjustment': result['value']})
+    comparison = manager.get_scenario_comparison(BASE_METRICS)
+    assert abs(comparison['Meta']['margem_lair_pct'] - 20.0) < 1e-6
+    
+    # Several targets at once; unreachable ones report the closest value
+    batch = manager.goal_seek(BASE_METRICS, 'price_adjustment', 'margem_lair_pct',
+                              [10.0, 20.0, 95.0], deltas={'commission_pct': 0.12})
+    assert batch['converged'].tolist() == [True, True, False]
+    assert np.allclose(batch['achieved'][:2], [10.0, 20.0])
+    assert batch['value'][2] == manager.GOAL_SEEK_BOUNDS['price_adjustment'][1]
+    assert batch['value'][1] > result['value']
+    
+    # Price and volume moved together, volume at half the price step
+    joint = manager.goal_seek(BASE_METRICS, {'price_adjustment': 1.0, 'volume_adjustment': 0.5},
+                              'lair', 200000.0, deltas={'volume_adjustment': 1.1})
+    assert joint['converged']
+    values = joint['values']
+    assert abs(values['volume_adjustment'] - 1.1 - 0.5 * (values['price_adjustment'] - 1.0)) < 1e-9
+    manager.add_scenario('Meta conjunta', 'LAIR de 200 mil', values)
+    comparison = manager.get_scenario_comparison(BASE_METRICS)
+    assert abs(comparison['Meta conjunta']['lair'] - 200000.0) < 1e-3
+
+
+def test_goal_seek_cash():
+    """Test solving growth for a minimum cash balance."""
+    assumptions = AssumptionsManager()
+    manager = ScenarioManager(assumptions)
+    cashflow = CashFlowManager(assumptions)
+    dre_data = {
+        'faturamento': [30000.0] * 12,
+        'csv': [10000.0] * 12,
+        'custos_fixos': [22000.0] * 12,
+        'custos_variaveis': [3000.0] * 12,
+    }
+    
+    objective = manager.cash_objective(cashflow, dre_data, 'min_balance')
+    base_min = cashflow.get_cashflow_summary(cashflow.calculate_monthly_cashflow(dre_data))['min_balance']
+    assert abs(objective({}) - base_min) < 1e-6
+    
+    result = manager.goal_seek(BASE_METRICS, 'growth_rate_2025', objective, 50000.0)
+    assert result['converged']
+    assert result['value'] > assumptions.assumptions['growth_rate_2025']
+    assert abs(objective({'growth_rate_2025': np.array(result['value'])}) - 50000.0) < 1e-3
+
+
+if __name__ == "__main__":
+    test_sweep_mirrors_comparison()
+    test_sweep_grid()
+    test_sweep_filter()
+    test_scenario_overlays()
+    test_goal_seek_margin()
+    test_goal_seek_cash()
+    print("✓ All scenario tests passed!")